@@ -0,0 +1 @@
+# Scripts de medición de desempeño; se ejecutan con: python -m benchmarks.<nombre>
@@ -0,0 +1,83 @@
+# Arranque en frío: cuánto tarda un proceso nuevo en importar lo que usa la app (y solo el
+# núcleo de análisis), qué módulos pesados terminan cargados y cuánto tarda el primer render
+# de prueba2.py en un proceso nuevo, en cada modo de gráficas:
+#   python -m benchmarks.bench_arranque --repeticiones 5
+#
+# Cada medición corre en su propio intérprete, así ningún import queda en caché entre ellas.
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+PESADOS = ["matplotlib", "seaborn", "fpdf", "PIL", "scipy"]
+
+IMPORTS = {
+    # Los imports de nivel superior de prueba2.py, tal como estén en esta versión
+    "app": "import ast\n"
+           "arbol = ast.parse(open('prueba2.py', encoding='utf-8').read())\n"
+           "exec(compile(ast.Module([n for n in arbol.body if isinstance(n, (ast.Import, ast.ImportFrom))], []),"
+           " 'prueba2.py', 'exec'))",
+    # Carga, filtros y estadísticas sin Streamlit (scripts, CLI, API)
+    "nucleo": "import calificaciones.carga, calificaciones.estadisticas, calificaciones.incremental, "
+              "calificaciones.indice, calificaciones.niveles, calificaciones.rangos",
+}
+
+_CODIGO_IMPORT = """
+import sys, time, json
+inicio = time.perf_counter()
+{imports}
+print(json.dumps({{"import_ms": (time.perf_counter() - inicio) * 1000,
+                  "pesados": [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+
+_CODIGO_RENDER = """
+import json, os, time
+os.environ["CALIFICACIONES_MODO_GRAFICAS"] = {modo!r}
+inicio = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("prueba2.py", default_timeout=300)
+antes = time.perf_counter()
+at.run()
+assert not at.exception, at.exception
+print(json.dumps({{"primer_render_ms": (time.perf_counter() - antes) * 1000,
+                  "hasta_render_ms": (time.perf_counter() - inicio) * 1000}}))
+"""
+
+
+def _proceso(codigo):
+    # Resultado del proceso hijo y el tiempo total de pared, arranque del intérprete incluido
+    inicio = time.perf_counter()
+    salida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True).stdout
+    resultado = json.loads(salida.strip().splitlines()[-1])
+    resultado["proceso_ms"] = (time.perf_counter() - inicio) * 1000
+    return resultado
+
+
+def _medianas(corridas):
+    resumen = {clave: statistics.median(corrida[clave] for corrida in corridas)
+               for clave, valor in corridas[0].items() if isinstance(valor, float)}
+    resumen.update({clave: valor for clave, valor in corridas[0].items() if not isinstance(valor, float)})
+    return resumen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo de arranque y de primer render")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--sin-render", action="store_true", help="Solo medir los imports")
+    args = parser.parse_args(argv)
+
+    resultado = {}
+    for nombre, imports in IMPORTS.items():
+        codigo = _CODIGO_IMPORT.format(imports=imports, pesados=PESADOS)
+        resultado[nombre] = _medianas([_proceso(codigo) for _ in range(args.repeticiones)])
+    if not args.sin_render:
+        for modo in ("servidor", "navegador"):
+            codigo = _CODIGO_RENDER.format(modo=modo)
+            resultado[f"render_{modo}"] = _medianas([_proceso(codigo) for _ in range(args.repeticiones)])
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# Tiempo de renderizar el boxplot (matplotlib, caché frío) según cuántas calificaciones
+# tiene la selección, con los puntos dibujados todos (stripplot) y con el cambio automático
+# al enjambre por casillas arriba de MAX_PUNTOS:
+#   python -m benchmarks.bench_boxplot --tamanos 30 300 3000 30000 300000
+#
+# El stripplot completo solo se mide hasta --strip-max (con cientos de miles de puntos
+# tarda minutos y es justo lo que se quiere evitar).
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from calificaciones.graficas import MAX_PUNTOS, figura_boxplot, renderizar
+
+
+def _seleccion(alumnos, parciales, semilla):
+    # Calificaciones de 5 a 10 en décimas, con la forma de las reales (cargadas hacia 8)
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({parcial: np.clip(np.round(rng.normal(7.8, 1.2, alumnos), 1), 5, 10).astype(np.float32)
+                         for parcial in parciales})
+
+
+def _medir(grupo_df, parciales, max_puntos, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        renderizar(lambda: figura_boxplot(grupo_df, parciales, max_puntos))
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo del boxplot con y sin el enjambre por casillas")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[30, 300, 3000, 30000, 300000])
+    parser.add_argument("--parciales", type=int, default=2)
+    parser.add_argument("--strip-max", type=int, default=30000, help="Tamaño máximo para medir el stripplot completo")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    parciales = [f"P{i}" for i in range(1, args.parciales + 1)]
+    renderizar(lambda: figura_boxplot(_seleccion(30, parciales, args.semilla), parciales))  # imports y fuentes
+
+    resultados = []
+    for alumnos in args.tamanos:
+        grupo_df = _seleccion(alumnos, parciales, args.semilla)
+        fila = {"alumnos": alumnos, "automatico_ms": _medir(grupo_df, parciales, MAX_PUNTOS, args.repeticiones),
+                "modo": "stripplot" if alumnos <= MAX_PUNTOS else "enjambre"}
+        if alumnos <= args.strip_max:
+            fila["stripplot_ms"] = _medir(grupo_df, parciales, float("inf"), args.repeticiones)
+        resultados.append(fila)
+        print(json.dumps(fila), flush=True)
+
+    print(json.dumps({"max_puntos": MAX_PUNTOS, "parciales": len(parciales), "resultados": resultados}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
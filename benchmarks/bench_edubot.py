@@ -0,0 +1,45 @@
+# Latencia de EduBot por pregunta (sin Streamlit), con preguntas limpias, con acentos
+# y con errores de dedo, usando las estadísticas reales de los grupos:
+#   python -m benchmarks.bench_edubot --grupos 40
+import argparse
+import json
+import statistics
+
+from calificaciones.carga import RUTA_EXCEL
+from calificaciones.edubot import responder
+from calificaciones.nucleo import abrir, analizar
+
+PREGUNTAS = [
+    "media", "mediana", "moda", "varianza", "boxplot", "pdf",
+    "¿Qué es la media?", "¿Qué significa boxplot?", "¿Para qué sirve la varianza?",
+    "¿CUÁL ES LA MEDIANA?", "primer cuartil", "cuartil 3", "¿cuántos alumnos hay?",
+    "promedo", "medaina", "varinza", "desviacion", "¿cómo descargo el reporte?", "hola",
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide cuánto tarda EduBot en armar cada respuesta")
+    parser.add_argument("--excel", default=RUTA_EXCEL)
+    parser.add_argument("--grupos", type=int, default=40, help="Cuántos grupos recorrer")
+    args = parser.parse_args(argv)
+
+    datos = abrir(args.excel)
+
+    tiempos = []
+    for clave in sorted(datos.indice.filas)[:args.grupos]:
+        estadisticas_dict = analizar(datos, clave).estadisticas
+        for pregunta in PREGUNTAS:
+            tiempos.append(responder(pregunta, estadisticas_dict, list(estadisticas_dict)).segundos)
+
+    ordenados = sorted(tiempos)
+    print(json.dumps({
+        "respuestas": len(tiempos),
+        "media_ms": statistics.fmean(tiempos) * 1000,
+        "p50_ms": ordenados[len(ordenados) // 2] * 1000,
+        "p99_ms": ordenados[min(len(ordenados) - 1, int(len(ordenados) * 0.99))] * 1000,
+        "max_ms": ordenados[-1] * 1000,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
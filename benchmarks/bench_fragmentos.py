@@ -0,0 +1,70 @@
+# Latencia por interacción del bot y del botón de PDF: rerun completo del script (lo que
+# costaba cada clic antes de los fragmentos) contra solo la sección del fragmento (lo que
+# se vuelve a ejecutar ahora):
+#   python -m benchmarks.bench_fragmentos --repeticiones 5
+#
+# AppTest siempre vuelve a correr el script completo; el tiempo del fragmento se toma de lo
+# que la propia app registra en st.session_state["latencias"].
+import argparse
+import json
+import os
+import statistics
+import time
+
+from streamlit.testing.v1 import AppTest
+
+# Sin caché de PDFs: cada repetición vuelve a encargar el reporte en lugar de encontrarlo listo
+os.environ.setdefault("CALIFICACIONES_MAX_PDFS", "0")
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prueba2.py")
+
+
+def _interacciones(at):
+    # (nombre, sección del fragmento, acción sobre la app)
+    def boton(en_sidebar, texto):
+        # El árbol de elementos cambia en cada rerun: el botón se busca al momento del clic
+        return lambda: next(b for b in (at.sidebar if en_sidebar else at).button if texto in b.label).click()
+
+    return [
+        ("mostrar_bot", "edubot", lambda: at.sidebar.checkbox[0].check()),
+        ("pregunta_escrita", "edubot", lambda: at.sidebar.text_input[0].set_value("¿Qué es la mediana?")),
+        ("sugerencia_moda", "edubot", boton(True, "Moda")),
+        ("generar_pdf", "pdf", boton(False, "Generar reporte PDF")),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara rerun completo contra rerun del fragmento")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    tiempos = {}
+    for _ in range(args.repeticiones):
+        at = AppTest.from_file(APP, default_timeout=300)
+        at.run()  # Primera carga: llena los cachés del proceso
+        for nombre, seccion, accion in _interacciones(at):
+            accion()
+            inicio = time.perf_counter()
+            at.run()
+            completo = time.perf_counter() - inicio
+            if at.exception:
+                raise RuntimeError(f"{nombre}: {at.exception}")
+            fragmento = at.session_state["latencias"][seccion]
+            tiempos.setdefault(nombre, {"script_completo": [], "fragmento": []})
+            tiempos[nombre]["script_completo"].append(completo)
+            tiempos[nombre]["fragmento"].append(fragmento)
+
+    resultado = {}
+    for nombre, medidas in tiempos.items():
+        completo_ms = statistics.median(medidas["script_completo"]) * 1000
+        fragmento_ms = statistics.median(medidas["fragmento"]) * 1000
+        resultado[nombre] = {
+            "script_completo_ms": completo_ms,
+            "fragmento_ms": fragmento_ms,
+            "reduccion": 1 - fragmento_ms / completo_ms,
+        }
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
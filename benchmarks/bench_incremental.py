@@ -0,0 +1,85 @@
+# Costo de refrescar después de una captura: recalcular todo (lo de antes: volver a leer el
+# Excel y reconstruir los acumuladores desde cero) contra aplicar solo la captura a ellos:
+#   python -m benchmarks.bench_incremental --factor 20 --capturas 10 100 1000
+#
+# --factor replica el archivo (con números de control distintos) para ver cómo escala
+# cada camino con el tamaño de los datos.
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from calificaciones.carga import RUTA_EXCEL, descubrir_parciales
+from calificaciones.incremental import COLUMNAS_FILA, aplicar_captura, estado_inicial
+from calificaciones.indice import COLUMNA_ALUMNO
+
+
+def _replicar(df, factor):
+    copias = []
+    for i in range(factor):
+        copia = df.copy()
+        copia[COLUMNA_ALUMNO] = copia[COLUMNA_ALUMNO] + i * 10**15
+        copias.append(copia)
+    return pd.concat(copias, ignore_index=True)
+
+
+def _captura(df, parciales, filas, semilla):
+    # Correcciones al azar sobre filas existentes, en décimas dentro de 5-10
+    rng = np.random.default_rng(semilla)
+    captura = df.iloc[rng.choice(len(df), size=filas, replace=False)][COLUMNAS_FILA].copy()
+    for parcial in parciales:
+        captura[parcial] = rng.integers(50, 101, size=filas) / 10
+    return captura
+
+
+def _tiempo(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresco completo contra captura incremental")
+    parser.add_argument("--excel", default=RUTA_EXCEL)
+    parser.add_argument("--factor", type=int, default=1, help="Veces que se replica el archivo")
+    parser.add_argument("--capturas", type=int, nargs="+", default=[10, 100, 1000], help="Filas por captura")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    df = pd.read_excel(args.excel)
+    lectura_ms = (time.perf_counter() - inicio) * 1000
+    parciales = descubrir_parciales(df.columns)
+    df = _replicar(df, args.factor)
+
+    # Lo de antes: cada refresco vuelve a leer el Excel completo y a recalcular todos los grupos
+    # (la lectura del archivo replicado se estima escalando la del original)
+    recalculo_ms = _tiempo(lambda: estado_inicial(df, None, parciales), args.repeticiones)
+    resultado = {
+        "filas": len(df),
+        "refresco_completo_ms": lectura_ms * args.factor + recalculo_ms,
+        "lectura_excel_ms": lectura_ms * args.factor,
+        "recalculo_ms": recalculo_ms,
+        "capturas": {},
+    }
+
+    estado = estado_inicial(df, None, parciales)
+    for filas in args.capturas:
+        capturas = [_captura(df, parciales, filas, semilla) for semilla in range(args.repeticiones)]
+        tiempos = []
+        for captura in capturas:
+            estado, resumen = aplicar_captura(estado, captura)
+            tiempos.append(resumen["segundos"])
+        resultado["capturas"][filas] = {"aplicar_ms": statistics.median(tiempos) * 1000}
+
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# Tiempo de servidor por rerun de las tres secciones de gráficas (histograma, pastel y
+# boxplot) en cada modo, recorriendo los grupos del archivo de calificaciones:
+#   python -m benchmarks.bench_modos_graficas --grupos 40
+#
+# - servidor:  construir las figuras de matplotlib y renderizarlas a PNG (caché frío,
+#              es lo que paga cada grupo la primera vez que se visita)
+# - navegador: armar las especificaciones Vega-Lite y serializarlas a JSON (lo que
+#              Streamlit manda al navegador)
+import argparse
+import json
+import statistics
+import time
+
+from calificaciones.carga import RUTA_EXCEL
+from calificaciones.graficas import figura_boxplot, figura_histograma, figura_pastel, renderizar
+from calificaciones.incremental import filas_actuales
+from calificaciones.nucleo import abrir, analizar
+from calificaciones.rangos import definir_rangos
+from calificaciones.vega import spec_boxplot, spec_histograma, spec_pastel
+
+
+def _modo_servidor(conteos_dict, rangos, grupo_df, parciales):
+    renderizar(lambda: figura_histograma(conteos_dict, rangos))
+    renderizar(lambda: figura_pastel(conteos_dict, rangos))
+    renderizar(lambda: figura_boxplot(grupo_df, parciales))
+
+
+def _modo_navegador(conteos_dict, rangos, grupo_df, parciales):
+    for spec in (spec_histograma(conteos_dict, rangos), spec_pastel(conteos_dict, rangos),
+                 spec_boxplot(grupo_df, parciales)):
+        json.dumps(spec)
+
+
+def _resumen(tiempos):
+    ordenados = sorted(tiempos)
+    return {
+        "reruns": len(tiempos),
+        "media_ms": statistics.fmean(tiempos) * 1000,
+        "p50_ms": ordenados[len(ordenados) // 2] * 1000,
+        "p95_ms": ordenados[min(len(ordenados) - 1, int(len(ordenados) * 0.95))] * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara el tiempo de servidor de los dos modos de gráficas")
+    parser.add_argument("--excel", default=RUTA_EXCEL)
+    parser.add_argument("--grupos", type=int, default=40, help="Cuántos grupos recorrer")
+    args = parser.parse_args(argv)
+
+    datos = abrir(args.excel)
+    parciales = datos.parciales
+    claves = sorted(datos.indice.filas)[:args.grupos]
+    rangos = definir_rangos()
+
+    tiempos = {"servidor": [], "navegador": []}
+    for clave in claves:
+        grupo_df = filas_actuales(datos.estado, datos.indice, clave)
+        conteos_dict = analizar(datos, clave, rangos).conteos
+        for modo, funcion in (("servidor", _modo_servidor), ("navegador", _modo_navegador)):
+            inicio = time.perf_counter()
+            funcion(conteos_dict, rangos, grupo_df, parciales)
+            tiempos[modo].append(time.perf_counter() - inicio)
+
+    resultado = {modo: _resumen(valores) for modo, valores in tiempos.items()}
+    resultado["aceleracion"] = resultado["servidor"]["media_ms"] / resultado["navegador"]["media_ms"]
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# Prueba de carga del servicio HTTP (calificaciones/servicio.py): levanta el servicio en otro
+# proceso y le manda peticiones desde varios clientes a la vez, midiendo p50/p99 y peticiones
+# por segundo con el caché frío (cada consulta por primera vez) y caliente (consultas repetidas):
+#   python -m benchmarks.bench_servicio --clientes 8 --peticiones 2000 --hilos 8
+import argparse
+import http.client
+import json
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlencode
+
+from calificaciones.carga import RUTA_EXCEL
+from calificaciones.niveles import NIVELES
+from calificaciones.nucleo import abrir
+from calificaciones.servicio import PARAMETROS
+
+
+def _consultas(ruta):
+    # Todas las selecciones posibles de la cascada: grupos completos y cada nivel de la app
+    claves = set()
+    for clave in abrir(ruta).indice.filas:
+        claves.update(clave[:largo] for largo in NIVELES.values())
+    return ["/stats?" + urlencode(dict(zip(PARAMETROS, map(str, clave)))) for clave in sorted(claves, key=str)]
+
+
+def _levantar(ruta, hilos):
+    proceso = subprocess.Popen([sys.executable, "-m", "calificaciones.servicio", "--excel", ruta, "--puerto", "0",
+                                "--hilos", str(hilos)], stderr=subprocess.PIPE, text=True)
+    linea = proceso.stderr.readline()   # "Escuchando en http://127.0.0.1:PUERTO/stats"
+    puerto = int(linea.rsplit(":", 1)[1].split("/")[0])
+    return proceso, puerto
+
+
+def _ronda(puerto, rutas, clientes):
+    # Reparte las rutas entre los clientes; cada cliente usa una conexión nueva por petición
+    # (como las herramientas que lo van a consumir) y guarda la latencia de cada una
+    latencias, errores = [], []
+    candado = threading.Lock()
+
+    def cliente(mias):
+        propias = []
+        for ruta in mias:
+            inicio = time.perf_counter()
+            conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=30)
+            conexion.request("GET", ruta)
+            respuesta = conexion.getresponse()
+            respuesta.read()
+            conexion.close()
+            propias.append(time.perf_counter() - inicio)
+            if respuesta.status != 200:
+                errores.append((ruta, respuesta.status))
+        with candado:
+            latencias.extend(propias)
+
+    hilos = [threading.Thread(target=cliente, args=(rutas[i::clientes],)) for i in range(clientes)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    segundos = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        "peticiones": len(latencias),
+        "errores": len(errores),
+        "p50_ms": statistics.median(latencias) * 1000,
+        "p99_ms": latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))] * 1000,
+        "peticiones_por_segundo": len(latencias) / segundos,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio de estadísticas")
+    parser.add_argument("--excel", default=RUTA_EXCEL)
+    parser.add_argument("--clientes", type=int, default=8, help="Clientes concurrentes")
+    parser.add_argument("--peticiones", type=int, default=2000, help="Peticiones de la ronda con caché caliente")
+    parser.add_argument("--hilos", type=int, default=8, help="Hilos del servicio")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rutas = _consultas(args.excel)
+    proceso, puerto = _levantar(args.excel, args.hilos)
+    try:
+        frio = _ronda(puerto, rutas, args.clientes)
+        rng = random.Random(args.semilla)
+        caliente = _ronda(puerto, [rng.choice(rutas) for _ in range(args.peticiones)], args.clientes)
+        conexion = http.client.HTTPConnection("127.0.0.1", puerto)
+        conexion.request("GET", "/metricas")
+        metricas = json.loads(conexion.getresponse().read())
+    finally:
+        proceso.terminate()
+        proceso.wait()
+
+    print(json.dumps({"consultas_distintas": len(rutas), "clientes": args.clientes, "hilos": args.hilos,
+                      "frio": frio, "caliente": caliente, "servicio": metricas}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# Suite de rendimiento por tamaño de archivo: cada etapa de la app medida por separado sobre
+# libros sintéticos (benchmarks/sinteticos.py), con memoria pico y salida JSON para comparar
+# entre versiones:
+#   python -m benchmarks.bench_suite --filas 10000 100000 1000000 --salida bench.json
+#   python -m benchmarks.bench_suite --filas 10000000 --memoria-por-etapa
+#
+# Cada tamaño corre en su propio proceso, así la memoria pico (ru_maxrss) es la de ese tamaño.
+# Con --memoria-por-etapa además se mide el pico de cada etapa con tracemalloc (hace más
+# lentas las etapas, no conviene comparar tiempos de corridas con y sin esa opción).
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.sinteticos import generar
+from calificaciones.carga import cargar_calificaciones, descubrir_parciales, escribir_sidecar, limpiar_cache
+from calificaciones.graficas import figura_boxplot, figura_histograma, figura_pastel, renderizar
+from calificaciones.incremental import conteos_acumulados, estadisticas_acumuladas, estado_inicial, filas_actuales
+from calificaciones.indice import construir_indice, opciones
+from calificaciones.niveles import acumuladores_nivel
+from calificaciones.rangos import datos_pastel, definir_rangos
+from calificaciones.reporte import generar_pdf
+
+# Más filas que esto no caben en una hoja de Excel (1,048,576) o tardan demasiado en escribirse
+XLSX_MAX = 200_000
+
+
+class _Etapas:
+    def __init__(self, memoria):
+        self.memoria = memoria
+        self.resultados = {}
+
+    def medir(self, nombre, funcion):
+        # Milisegundos de la etapa y, si se pidió, su pico de memoria en MB
+        if self.memoria:
+            tracemalloc.start()
+        inicio = time.perf_counter()
+        valor = funcion()
+        resultado = {"ms": (time.perf_counter() - inicio) * 1000}
+        if self.memoria:
+            resultado["pico_mb"] = tracemalloc.get_traced_memory()[1] / 1e6
+            tracemalloc.stop()
+        self.resultados[nombre] = resultado
+        return valor
+
+
+def _muestra_grupos(indice, cantidad, semilla):
+    claves = sorted(indice.filas)
+    rng = np.random.default_rng(semilla)
+    return [claves[i] for i in rng.choice(len(claves), size=min(cantidad, len(claves)), replace=False)]
+
+
+def correr_tamano(filas, args):
+    carpeta = tempfile.mkdtemp(prefix="bench_calificaciones_")
+    try:
+        df = generar(filas, args.semestres, args.carreras, None, args.asignaturas, args.parciales,
+                     faltantes=args.faltantes, semilla=args.semilla)
+        ruta = os.path.join(carpeta, "Calificaciones sintético Plantel Bench.xlsx")
+        etapas = _Etapas(args.memoria_por_etapa)
+
+        # Carga: parseo del Excel (si cabe) y lectura del sidecar Parquet, los dos en frío
+        if len(df) <= args.xlsx_max:
+            df.to_excel(ruta, index=False)
+            limpiar_cache()
+            etapas.medir("carga_xlsx", lambda: cargar_calificaciones(ruta))
+        else:
+            # Libro de relleno: el sidecar queda ligado a él y lo que se mide es leer el Parquet,
+            # que es lo que paga la app en cada arranque
+            df.iloc[:1].to_excel(ruta, index=False)
+            escribir_sidecar(df, ruta)
+        limpiar_cache()
+        carga = etapas.medir("carga_parquet", lambda: cargar_calificaciones(ruta))
+        df = carga.df
+        parciales = descubrir_parciales(df.columns)
+
+        # Cascada del sidebar: índice (una vez por versión) y cada selección de grupo
+        indice = etapas.medir("indice", lambda: construir_indice(df))
+        estado = etapas.medir("acumuladores", lambda: estado_inicial(df, carga.version, parciales))
+        muestra = _muestra_grupos(indice, args.grupos, args.semilla)
+
+        def seleccionar():
+            for clave in muestra:
+                for nivel in range(len(clave)):
+                    opciones(indice, *clave[:nivel])
+                filas_actuales(estado, indice, clave)
+        etapas.medir("seleccion_por_grupo", seleccionar)
+        etapas.resultados["seleccion_por_grupo"]["ms"] /= len(muestra)
+
+        # Bloque de estadísticas y rangos de un grupo (y del plantel completo)
+        rangos = definir_rangos()
+        etapas.medir("estadisticas_por_grupo",
+                     lambda: [estadisticas_acumuladas(estado.acumuladores, clave) for clave in muestra])
+        etapas.resultados["estadisticas_por_grupo"]["ms"] /= len(muestra)
+        etapas.medir("rangos_por_grupo",
+                     lambda: [conteos_acumulados(estado.acumuladores, clave, rangos) for clave in muestra])
+        etapas.resultados["rangos_por_grupo"]["ms"] /= len(muestra)
+        etapas.medir("estadisticas_plantel",
+                     lambda: estadisticas_acumuladas(acumuladores_nivel(estado.acumuladores, ()), ()))
+
+        # Gráficas y PDF del grupo de tamaño mediano
+        tamanos = sorted((len(indice.filas[clave]), clave) for clave in muestra)
+        clave = tamanos[len(tamanos) // 2][1]
+        grupo_df = filas_actuales(estado, indice, clave)
+        conteos_dict = conteos_acumulados(estado.acumuladores, clave, rangos)
+        imagenes = [
+            etapas.medir("grafica_histograma", lambda: renderizar(lambda: figura_histograma(conteos_dict, rangos))),
+            etapas.medir("grafica_pastel", lambda: renderizar(lambda: figura_pastel(conteos_dict, rangos))),
+            etapas.medir("grafica_boxplot", lambda: renderizar(lambda: figura_boxplot(grupo_df, parciales))),
+        ]
+        pies = [datos_pastel(conteo, rangos) if conteo is not None else ([], [], []) for conteo in conteos_dict.values()]
+        semestre, carrera, grupo, asignatura = clave
+        etapas.medir("pdf", lambda: generar_pdf(
+            estadisticas_acumuladas(estado.acumuladores, clave), carrera, grupo, asignatura, semestre,
+            [imagen for imagen in imagenes if imagen is not None],
+            [pie[0] for pie in pies], [pie[1] for pie in pies], [pie[2] for pie in pies],
+        ))
+
+        return {
+            "filas": len(df),
+            "grupos": len(indice.filas),
+            "parciales": parciales,
+            "etapas": etapas.resultados,
+            "memoria_pico_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        }
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide cada etapa de la app sobre libros sintéticos")
+    parser.add_argument("--filas", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--semestres", type=int, default=3)
+    parser.add_argument("--carreras", type=int, default=4)
+    parser.add_argument("--asignaturas", type=int, default=8)
+    parser.add_argument("--parciales", type=int, default=2)
+    parser.add_argument("--faltantes", type=float, default=0.02)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--grupos", type=int, default=50, help="Grupos de muestra para las etapas por grupo")
+    parser.add_argument("--xlsx-max", type=int, default=XLSX_MAX, help="Hasta cuántas filas se mide también el Excel")
+    parser.add_argument("--memoria-por-etapa", action="store_true", help="Pico de memoria de cada etapa (tracemalloc)")
+    parser.add_argument("--salida", help="Archivo JSON (por omisión, a la salida estándar)")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    for filas in args.filas:
+        # Un proceso nuevo por tamaño (spawn: no hereda la memoria del anterior)
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            resultados.append(pool.submit(correr_tamano, filas, args).result())
+
+    reporte = {
+        "meta": {
+            "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "nucleos": os.cpu_count(),
+        },
+        "parametros": {clave: valor for clave, valor in vars(args).items() if clave != "salida"},
+        "resultados": resultados,
+    }
+    texto = json.dumps(reporte, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            archivo.write(texto)
+    print(texto)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# Generador de libros de calificaciones sintéticos con la misma forma que el real
+# (Semestre, Clave Carrera, Carrera, Grupo, Asignatura, Número de control, P1, P2, ...):
+#   python -m benchmarks.sinteticos --filas 100000 --salida sintetico.parquet
+#
+# Determinista con la semilla. Cada alumno tiene un nivel propio y cada parcial le suma
+# ruido, así que las calificaciones de un alumno se parecen entre parciales; todo se
+# recorta a 5-10 y se redondea a décimas como en el libro real.
+import argparse
+import math
+
+import numpy as np
+import pandas as pd
+
+CARRERAS = [
+    "Diseño Gráfico Digital", "Programación", "Contabilidad", "Electricidad", "Enfermería General",
+    "Mecatrónica", "Administración", "Turismo", "Gastronomía", "Logística",
+]
+ASIGNATURAS = [
+    "Inglés", "Matemáticas", "Ciencias Sociales", "Química", "Física", "Lectura y Redacción",
+    "Informática", "Biología", "Historia", "Filosofía", "Ética", "Economía",
+]
+
+
+def _nombre_grupo(i):
+    # 0 -> "A", 25 -> "Z", 26 -> "AA", ...
+    nombre = ""
+    i += 1
+    while i:
+        i, resto = divmod(i - 1, 26)
+        nombre = chr(ord("A") + resto) + nombre
+    return nombre
+
+
+def generar(filas=10_000, semestres=3, carreras=4, grupos=None, asignaturas=8, parciales=2,
+            alumnos=(30, 45), faltantes=0.02, semilla=0):
+    # grupos=None: los que hagan falta por carrera para llegar a ~filas
+    rng = np.random.default_rng(semilla)
+    carreras = [CARRERAS[i % len(CARRERAS)] + (f" {i // len(CARRERAS) + 1}" if i >= len(CARRERAS) else "")
+                for i in range(carreras)]
+    asignaturas = [f"{ASIGNATURAS[i % len(ASIGNATURAS)]} {i // len(ASIGNATURAS) + 1}" for i in range(asignaturas)]
+    if grupos is None:
+        por_grupo = len(asignaturas) * sum(alumnos) / 2
+        grupos = max(1, math.ceil(filas / (semestres * len(carreras) * por_grupo)))
+
+    # Un grupo de alumnos por (semestre, carrera, grupo); cursan todas las asignaturas
+    bloques = []
+    control = 24_000_000_000_000
+    for semestre in range(2, 2 * semestres + 1, 2):
+        for c, carrera in enumerate(carreras):
+            for g in range(grupos):
+                n = int(rng.integers(alumnos[0], alumnos[1] + 1))
+                bloques.append((semestre, c, carrera, _nombre_grupo(g), np.arange(control, control + n)))
+                control += n
+
+    n_asig = len(asignaturas)
+    semestre = np.concatenate([np.full(len(b[4]) * n_asig, b[0]) for b in bloques])
+    codigo_carrera = np.concatenate([np.full(len(b[4]) * n_asig, b[1]) for b in bloques])
+    grupo = np.concatenate([np.full(len(b[4]) * n_asig, b[3], dtype=object) for b in bloques])
+    alumno = np.concatenate([np.tile(b[4], n_asig) for b in bloques])
+    asignatura = np.concatenate([np.repeat(np.arange(n_asig), len(b[4])) for b in bloques])
+
+    # Nivel del alumno + dificultad de la asignatura + ruido por parcial
+    _, por_alumno = np.unique(alumno, return_inverse=True)
+    nivel = rng.normal(7.8, 1.0, size=por_alumno.max() + 1)[por_alumno]
+    dificultad = rng.normal(0, 0.4, size=n_asig)[asignatura]
+    df = pd.DataFrame({
+        "Semestre": semestre.astype(np.int64),
+        "Clave Carrera": pd.Categorical.from_codes(codigo_carrera, [f"C{i:03d}" for i in range(len(carreras))]).astype(str),
+        "Carrera": pd.Categorical.from_codes(codigo_carrera, carreras).astype(str),
+        "Grupo": grupo.astype(str),
+        "Asignatura": pd.Categorical.from_codes(asignatura, asignaturas).astype(str),
+        "Número de control": alumno.astype(np.int64),
+    })
+    for p in range(1, parciales + 1):
+        calificacion = np.clip(nivel - dificultad + rng.normal(0, 0.8, size=len(df)), 5, 10).round(1)
+        calificacion[rng.random(len(df)) < faltantes] = np.nan
+        df[f"P{p}"] = calificacion
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera un libro de calificaciones sintético")
+    parser.add_argument("--filas", type=int, default=10_000)
+    parser.add_argument("--semestres", type=int, default=3)
+    parser.add_argument("--carreras", type=int, default=4)
+    parser.add_argument("--grupos", type=int, default=None, help="Grupos por carrera (por omisión, los que den --filas)")
+    parser.add_argument("--asignaturas", type=int, default=8)
+    parser.add_argument("--parciales", type=int, default=2)
+    parser.add_argument("--faltantes", type=float, default=0.02, help="Proporción de calificaciones vacías")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", required=True, help=".xlsx, .parquet o .csv")
+    args = parser.parse_args(argv)
+
+    df = generar(args.filas, args.semestres, args.carreras, args.grupos, args.asignaturas, args.parciales,
+                 faltantes=args.faltantes, semilla=args.semilla)
+    if args.salida.endswith(".xlsx"):
+        df.to_excel(args.salida, index=False)
+    elif args.salida.endswith(".csv"):
+        df.to_csv(args.salida, index=False)
+    else:
+        df.to_parquet(args.salida, index=False)
+    print(f"{len(df)} filas -> {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
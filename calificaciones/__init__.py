@@ -0,0 +1,23 @@
+# Lógica de análisis de calificaciones reutilizable fuera de la app de Streamlit (prueba2.py).
+# Aquí solo se exporta el núcleo (carga, cascada, estadísticas, rangos), que depende de
+# pandas y numpy; las gráficas (calificaciones.graficas, calificaciones.vega) y el PDF
+# (calificaciones.reporte) se importan aparte y cargan matplotlib/fpdf solo al usarse.
+from calificaciones.alumnos import alumnos_prefijo, tabla_alumnos
+from calificaciones.carga import RUTA_EXCEL, cargar_calificaciones, descubrir_parciales, version_archivo
+from calificaciones.estadisticas import MEDIDAS, comparar_parciales
+from calificaciones.incremental import filas_actuales, revision_grupo
+from calificaciones.indice import opciones
+from calificaciones.niveles import NIVELES, clave_nivel
+from calificaciones.nucleo import Analisis, Datos, abrir, analizar, comparacion, trayectorias
+from calificaciones.rangos import datos_pastel, definir_rangos
+
+__all__ = [
+    "alumnos_prefijo", "tabla_alumnos",
+    "RUTA_EXCEL", "cargar_calificaciones", "descubrir_parciales", "version_archivo",
+    "MEDIDAS", "comparar_parciales",
+    "filas_actuales", "revision_grupo",
+    "opciones",
+    "NIVELES", "clave_nivel",
+    "Analisis", "Datos", "abrir", "analizar", "comparacion", "trayectorias",
+    "datos_pastel", "definir_rangos",
+]
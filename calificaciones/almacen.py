@@ -0,0 +1,179 @@
+# Almacén de varios planteles: cada plantel manda su "Calificaciones ... Plantel X.xlsx";
+# aquí se descubren todos los libros de una carpeta, se parsean en paralelo (un proceso por
+# libro) y se escriben en un solo almacén Parquet particionado por plantel y semestre:
+#   almacen/Plantel=Xonacatlán/Semestre=2/part-0.parquet
+#   python -m calificaciones.almacen --carpeta . --destino almacen --procesos 8
+#
+# Cada plantel se reescribe completo en una carpeta temporal y se cambia de lugar al final,
+# así que nadie lee un plantel a medio escribir. Los libros que no cambiaron se saltan.
+import argparse
+import glob
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+try:                         # pyarrow es opcional para la app, pero el almacén lo necesita
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = ds = pq = None
+
+from calificaciones.carga import columnas_app, descubrir_parciales, version_archivo
+from calificaciones.esquema import aplicar_esquema, diccionario
+
+COLUMNA_PLANTEL = "Plantel"
+CARPETA_LIBROS = os.environ.get("CALIFICACIONES_CARPETA", ".")
+CARPETA_ALMACEN = os.environ.get("CALIFICACIONES_ALMACEN", "almacen")
+
+# "Calificaciones 1 y 2 parcial Plantel Xonacatlán.xlsx" -> "Xonacatlán"
+_PATRON_PLANTEL = re.compile(r"Plantel\s+(.+?)\.xlsx$", re.IGNORECASE)
+_ORIGEN = "_origen.json"     # Empieza con "_": pyarrow lo ignora al descubrir el dataset
+
+
+def nombre_plantel(ruta):
+    encontrado = _PATRON_PLANTEL.search(os.path.basename(ruta))
+    return encontrado.group(1).strip() if encontrado else os.path.splitext(os.path.basename(ruta))[0]
+
+
+def descubrir_libros(carpeta=CARPETA_LIBROS):
+    # {plantel: ruta del libro}, en orden de plantel; los temporales de Excel (~$...) no cuentan
+    rutas = [ruta for ruta in glob.glob(os.path.join(carpeta, "*.xlsx"))
+             if not os.path.basename(ruta).startswith("~$")]
+    return dict(sorted((nombre_plantel(ruta), ruta) for ruta in rutas))
+
+
+def carpeta_plantel(destino, plantel):
+    return os.path.join(destino, f"{COLUMNA_PLANTEL}={plantel}")
+
+
+def _origen_vigente(destino, plantel, ruta):
+    try:
+        with open(os.path.join(carpeta_plantel(destino, plantel), _ORIGEN), encoding="utf-8") as archivo:
+            origen = json.load(archivo)
+    except (OSError, ValueError):
+        return False
+    _, mtime_ns, tamano = version_archivo(ruta)
+    return origen.get("mtime_ns") == mtime_ns and origen.get("tamano") == tamano
+
+
+def ingerir_libro(plantel, ruta, destino):
+    # Trabajo de un proceso: parsear un libro y escribir sus particiones por semestre
+    # Solo las columnas que usa la app, ya con el esquema compacto: las claves de texto se
+    # guardan como diccionario en el Parquet y las calificaciones como float32
+    inicio = time.perf_counter()
+    df = pd.read_excel(ruta)
+    df = aplicar_esquema(df[columnas_app(df.columns)], descubrir_parciales(df.columns))
+    df["Semestre"] = df["Semestre"].astype("int64")   # Columna de partición: va en el nombre de la carpeta
+    _, mtime_ns, tamano = version_archivo(ruta)
+
+    final = carpeta_plantel(destino, plantel)
+    temporal = f"{final}.{os.getpid()}.tmp"
+    shutil.rmtree(temporal, ignore_errors=True)
+    pq.write_to_dataset(pa.Table.from_pandas(df, preserve_index=False), temporal,
+                        partition_cols=["Semestre"], basename_template="part-{i}.parquet")
+    with open(os.path.join(temporal, _ORIGEN), "w", encoding="utf-8") as archivo:
+        json.dump({"archivo": os.path.basename(ruta), "mtime_ns": mtime_ns, "tamano": tamano,
+                   "filas": len(df)}, archivo, ensure_ascii=False)
+
+    # Cambio de lugar: la versión vieja se aparta, entra la nueva y la vieja se borra
+    viejo = f"{final}.{os.getpid()}.viejo"
+    if os.path.exists(final):
+        os.replace(final, viejo)
+    os.replace(temporal, final)
+    shutil.rmtree(viejo, ignore_errors=True)
+    return plantel, len(df), time.perf_counter() - inicio
+
+
+def ingerir(carpeta=CARPETA_LIBROS, destino=CARPETA_ALMACEN, procesos=None, forzar=False):
+    # El paralelismo es por libro: con N núcleos se parsean N libros a la vez
+    if pq is None:
+        raise RuntimeError("Se necesita pyarrow para construir el almacén")
+    os.makedirs(destino, exist_ok=True)
+    libros = descubrir_libros(carpeta)
+    pendientes = {plantel: ruta for plantel, ruta in libros.items()
+                  if forzar or not _origen_vigente(destino, plantel, ruta)}
+
+    inicio = time.perf_counter()
+    ingeridos, fallidos, filas = [], [], 0
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        futuros = {pool.submit(ingerir_libro, plantel, ruta, destino): plantel
+                   for plantel, ruta in pendientes.items()}
+        for futuro in as_completed(futuros):
+            try:
+                plantel, n, _ = futuro.result()
+            except Exception as error:  # Un libro dañado no detiene a los demás
+                fallidos.append((futuros[futuro], f"{type(error).__name__}: {error}"))
+                continue
+            ingeridos.append(plantel)
+            filas += n
+
+    return {
+        "libros": len(libros),
+        "ingeridos": sorted(ingeridos),
+        "sin_cambios": sorted(set(libros) - set(pendientes)),
+        "fallidos": fallidos,
+        "filas": filas,
+        "segundos": time.perf_counter() - inicio,
+    }
+
+
+def planteles(destino=CARPETA_ALMACEN):
+    prefijo = f"{COLUMNA_PLANTEL}="
+    if not os.path.isdir(destino):
+        return []
+    return sorted(nombre[len(prefijo):] for nombre in os.listdir(destino)
+                  if nombre.startswith(prefijo) and os.path.isdir(os.path.join(destino, nombre))
+                  and not nombre.endswith((".tmp", ".viejo")))
+
+
+def semestres_plantel(plantel, destino=CARPETA_ALMACEN):
+    # Semestres con partición escrita, en orden; sirve para recorrer un plantel de a uno
+    prefijo = "Semestre="
+    carpeta = carpeta_plantel(destino, plantel)
+    return sorted(int(nombre[len(prefijo):]) for nombre in os.listdir(carpeta)
+                  if nombre.startswith(prefijo) and os.path.isdir(os.path.join(carpeta, nombre)))
+
+
+def leer_plantel(plantel, semestre=None, columnas=None, destino=CARPETA_ALMACEN):
+    # Solo se abre la carpeta del plantel; con semestre, además solo esa partición
+    dataset = ds.dataset(carpeta_plantel(destino, plantel), format="parquet", partitioning="hive")
+    filtro = ds.field("Semestre") == semestre if semestre is not None else None
+    df = dataset.to_table(columns=columnas, filter=filtro).to_pandas()
+    if "Semestre" in df.columns:
+        # La partición llega al final y como int32; se deja como en el libro original
+        df.insert(0, "Semestre", df.pop("Semestre").astype("int64"))
+    # Mismo esquema que carga.py: claves con los diccionarios compartidos del proceso (entre
+    # planteles también) y el plantel como categórica de un solo código
+    df = aplicar_esquema(df, descubrir_parciales(df.columns))
+    categorias = diccionario(COLUMNA_PLANTEL, [plantel])
+    df.insert(0, COLUMNA_PLANTEL, pd.Categorical.from_codes(
+        np.full(len(df), categorias.get_loc(plantel)), dtype=pd.CategoricalDtype(categorias)))
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingiere todos los libros de calificaciones a un almacén Parquet")
+    parser.add_argument("--carpeta", default=CARPETA_LIBROS, help="Carpeta con los .xlsx de cada plantel")
+    parser.add_argument("--destino", default=CARPETA_ALMACEN, help="Carpeta del almacén particionado")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos en paralelo (por defecto, uno por núcleo)")
+    parser.add_argument("--forzar", action="store_true", help="Reescribir también los libros sin cambios")
+    args = parser.parse_args(argv)
+
+    resumen = ingerir(args.carpeta, args.destino, args.procesos, args.forzar)
+    print(f"{len(resumen['ingeridos'])} de {resumen['libros']} libros ({resumen['filas']} filas) "
+          f"en {resumen['segundos']:.1f} s -> {args.destino}; sin cambios: {len(resumen['sin_cambios'])}")
+    for plantel, error in resumen["fallidos"]:
+        print(f"❌ {plantel}: {error}", file=sys.stderr)
+    return 1 if resumen["fallidos"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
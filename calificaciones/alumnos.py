@@ -0,0 +1,146 @@
+# Seguimiento por alumno: todo el plantel se acomoda una vez en un arreglo
+# alumno × asignatura × parcial y de ahí salen, con operaciones sobre el arreglo completo (sin
+# recorrer alumno por alumno), su promedio por parcial, cuántas asignaturas reprueba, cuántas
+# bajaron de un parcial al siguiente y si está en riesgo:
+#   python -m calificaciones.alumnos                  (alumnos en riesgo del plantel)
+#
+# El eje de asignaturas es por alumno: cada alumno ocupa tantas casillas como asignaturas
+# cursa (las del plantel completo serían cientos de casillas vacías por alumno), y
+# `asignaturas` guarda el código de la asignatura de cada casilla (-1 = casilla vacía).
+import os
+import sys
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from calificaciones.indice import COLUMNA_ALUMNO, COLUMNAS_CLAVE, filas_prefijo
+
+CALIFICACION_APROBATORIA = 6
+# En riesgo: en su último parcial con calificaciones reprueba al menos RIESGO_REPROBADAS
+# asignaturas o su promedio (en las asignaturas que tienen los dos parciales) bajó al menos
+# RIESGO_CAIDA puntos respecto al anterior
+RIESGO_REPROBADAS = int(os.environ.get("CALIFICACIONES_RIESGO_REPROBADAS", "2"))
+RIESGO_CAIDA = float(os.environ.get("CALIFICACIONES_RIESGO_CAIDA", "1"))
+
+# alumnos:        número de control de cada alumno (eje 0 de todo lo demás)
+# asignaturas:    (alumnos, casillas) código de asignatura de cada casilla; -1 si está vacía
+# catalogo:       nombres de las asignaturas (los códigos de arriba)
+# calificaciones: (alumnos, casillas, parciales) float32; NaN = sin calificación
+# alumno_fila:    alumno de cada fila del DataFrame del estado (para filtrar por grupo)
+# promedios:      (alumnos, parciales) promedio de cada parcial; NaN si no tiene calificaciones
+# deltas:         (alumnos, parciales - 1) cambio promedio entre parciales consecutivos,
+#                 solo en las asignaturas con calificación en los dos
+# reprobadas:     (alumnos, parciales) asignaturas con menos de CALIFICACION_APROBATORIA
+# a_la_baja:      (alumnos, parciales - 1) asignaturas que bajaron entre parciales consecutivos
+# ultimo:         último parcial con calificaciones de cada alumno (-1 si no tiene ninguna)
+# en_riesgo:      (alumnos,) bool
+Trayectorias = namedtuple("Trayectorias", [
+    "parciales", "alumnos", "asignaturas", "catalogo", "calificaciones", "alumno_fila",
+    "promedios", "deltas", "reprobadas", "a_la_baja", "ultimo", "en_riesgo",
+])
+
+
+def _media(valores, eje):
+    # nanmean sin el aviso de "Mean of empty slice" para los alumnos sin calificaciones
+    validos = ~np.isnan(valores)
+    cuantos = validos.sum(axis=eje)
+    suma = np.where(validos, valores, 0).sum(axis=eje, dtype=np.float64)
+    return np.divide(suma, cuantos, out=np.full(cuantos.shape, np.nan), where=cuantos > 0)
+
+
+def construir_trayectorias(df, valores, parciales):
+    # df: filas del estado (claves y número de control); valores: (filas, parciales) vigentes
+    alumno_fila, alumnos = pd.factorize(df[COLUMNA_ALUMNO], sort=True)
+    if isinstance(df["Asignatura"].dtype, pd.CategoricalDtype):
+        asignatura_fila, catalogo = df["Asignatura"].cat.codes.to_numpy(), df["Asignatura"].cat.categories
+    else:
+        asignatura_fila, catalogo = pd.factorize(df["Asignatura"], sort=True)
+    validas = np.flatnonzero((alumno_fila >= 0) & (asignatura_fila >= 0))
+
+    # Filas ordenadas por alumno y asignatura; la casilla de cada fila es su posición dentro
+    # de las filas de su alumno
+    orden = validas[np.lexsort((asignatura_fila[validas], alumno_fila[validas]))]
+    alumno_orden = alumno_fila[orden]
+    inicios = np.flatnonzero(np.r_[True, alumno_orden[1:] != alumno_orden[:-1]]) if len(orden) else orden
+    casilla = np.arange(len(orden)) - np.repeat(inicios, np.diff(np.r_[inicios, len(orden)]))
+    casillas = int(casilla.max()) + 1 if len(orden) else 0
+
+    asignaturas = np.full((len(alumnos), casillas), -1, dtype=np.int32)
+    asignaturas[alumno_orden, casilla] = asignatura_fila[orden]
+    calificaciones = np.full((len(alumnos), casillas, len(parciales)), np.nan, dtype=valores.dtype)
+    calificaciones[alumno_orden, casilla] = valores[orden]
+
+    # Todo lo demás es sobre el arreglo completo
+    promedios = _media(calificaciones, 1)
+    cambios = calificaciones[:, :, 1:] - calificaciones[:, :, :-1]    # NaN si falta alguno de los dos
+    deltas = _media(cambios, 1)
+    reprobadas = (calificaciones < CALIFICACION_APROBATORIA).sum(axis=1)
+    a_la_baja = (cambios < 0).sum(axis=1)
+
+    con_datos = ~np.isnan(promedios)
+    ultimo = np.where(con_datos.any(axis=1), len(parciales) - 1 - np.argmax(con_datos[:, ::-1], axis=1), -1)
+    filas = np.arange(len(alumnos))
+    reprobadas_ultimo = np.where(ultimo >= 0, reprobadas[filas, np.maximum(ultimo, 0)], 0)
+    delta_ultimo = deltas[filas, np.maximum(ultimo - 1, 0)] if deltas.shape[1] else np.full(len(alumnos), np.nan)
+    delta_ultimo = np.where(ultimo >= 1, delta_ultimo, np.nan)
+    en_riesgo = (reprobadas_ultimo >= RIESGO_REPROBADAS) | (delta_ultimo <= -RIESGO_CAIDA)
+
+    return Trayectorias(list(parciales), alumnos, asignaturas, catalogo, calificaciones, alumno_fila,
+                        promedios, deltas, reprobadas, a_la_baja, ultimo, en_riesgo)
+
+
+def trayectorias_estado(estado):
+    return construir_trayectorias(estado.df, estado.valores, estado.acumuladores.parciales)
+
+
+def alumnos_prefijo(trayectorias, indice, prefijo):
+    # Alumnos con alguna fila en el grupo o nivel (prefijo de la cascada); en grupo y
+    # asignatura se toma el grupo completo, el seguimiento es por alumno y no por asignatura
+    posiciones = filas_prefijo(indice, tuple(prefijo)[:len(COLUMNAS_CLAVE) - 1])
+    alumnos = trayectorias.alumno_fila[posiciones]
+    return np.unique(alumnos[alumnos >= 0])
+
+
+def tabla_alumnos(trayectorias, seleccion):
+    # Una fila por alumno de la selección, lista para ordenar: en riesgo primero y, dentro,
+    # los que más bajaron
+    parciales = trayectorias.parciales
+    tabla = pd.DataFrame({
+        COLUMNA_ALUMNO: trayectorias.alumnos[seleccion],
+        "Asignaturas": (trayectorias.asignaturas[seleccion] >= 0).sum(axis=1),
+    })
+    for j, parcial in enumerate(parciales):
+        tabla[f"Promedio {parcial}"] = trayectorias.promedios[seleccion, j]
+    for j, (anterior, siguiente) in enumerate(zip(parciales[:-1], parciales[1:])):
+        tabla[f"Δ {anterior}→{siguiente}"] = trayectorias.deltas[seleccion, j]
+        tabla[f"A la baja {anterior}→{siguiente}"] = trayectorias.a_la_baja[seleccion, j]
+    for j, parcial in enumerate(parciales):
+        tabla[f"Reprobadas {parcial}"] = trayectorias.reprobadas[seleccion, j]
+    tabla["En riesgo"] = trayectorias.en_riesgo[seleccion]
+
+    if len(parciales) >= 2:
+        ultimo = trayectorias.ultimo[seleccion]
+        tabla["_delta"] = np.where(ultimo >= 1, trayectorias.deltas[seleccion, np.maximum(ultimo - 1, 0)], np.nan)
+        tabla = tabla.sort_values(["En riesgo", "_delta"], ascending=[False, True], na_position="last",
+                                  kind="stable").drop(columns="_delta")
+    return tabla.reset_index(drop=True)
+
+
+def asignaturas_alumno(trayectorias, alumno):
+    # Detalle de un alumno: una fila por asignatura con su calificación en cada parcial
+    i = trayectorias.alumnos.get_loc(alumno)
+    ocupadas = trayectorias.asignaturas[i] >= 0
+    tabla = pd.DataFrame(trayectorias.calificaciones[i, ocupadas], columns=trayectorias.parciales)
+    tabla.insert(0, "Asignatura", trayectorias.catalogo[trayectorias.asignaturas[i, ocupadas]])
+    return tabla
+
+
+if __name__ == "__main__":
+    from calificaciones.carga import RUTA_EXCEL
+    from calificaciones.incremental import estado_incremental
+
+    trayectorias = trayectorias_estado(estado_incremental(sys.argv[1] if len(sys.argv) > 1 else RUTA_EXCEL))
+    tabla = tabla_alumnos(trayectorias, np.flatnonzero(trayectorias.en_riesgo))
+    print(f"{len(tabla)} de {len(trayectorias.alumnos)} alumnos en riesgo")
+    print(tabla.head(20).to_string(index=False))
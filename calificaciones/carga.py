@@ -0,0 +1,186 @@
+import os                    # Rutas y metadatos del archivo (mtime, tamaño)
+import re                    # Reconocer las columnas de parciales (P1, P2, ...)
+import sys                   # Argumentos del paso de ingesta por línea de comandos
+import threading             # Candados para que varias sesiones no parseen el mismo archivo a la vez
+import time                  # Medir cuánto tarda el parseo
+from collections import namedtuple
+
+import pandas as pd
+
+try:                         # pyarrow es opcional: sin él se lee siempre el Excel
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+from calificaciones.esquema import aplicar_esquema
+from calificaciones.indice import COLUMNA_ALUMNO, COLUMNAS_CLAVE
+
+# Libro por omisión; con varios planteles la app los descubre en CALIFICACIONES_CARPETA (almacen.py)
+RUTA_EXCEL = os.environ.get("CALIFICACIONES_EXCEL", "Calificaciones 1 y 2 parcial Plantel Xonacatlán.xlsx")
+
+# Columnas de calificación: P1, P2, P3... en orden numérico y al final la calificación final
+# si el archivo la trae. Se pueden fijar con CALIFICACIONES_PARCIALES="P1,P2,P3,Final"
+_PATRON_PARCIAL = re.compile(r"^P(\d+)$")
+NOMBRES_FINAL = ("Final", "CF", "Calificación final", "Calificacion final")
+
+# Metadatos que se guardan en el Parquet para saber de qué versión del Excel salió
+_META_MTIME = b"calificaciones.origen_mtime_ns"
+_META_TAMANO = b"calificaciones.origen_tamano"
+
+# Resultado de una carga: el DataFrame (compartido, no se debe modificar), la versión del
+# archivo del que salió, los segundos que tardó la lectura original, si vino del caché y
+# de dónde se leyó ("parquet" o "xlsx")
+Carga = namedtuple("Carga", ["df", "version", "segundos", "desde_cache", "origen"])
+
+# Caché a nivel de proceso: Streamlit importa este módulo una sola vez, así que todas las
+# sesiones (y todos los reruns) comparten el mismo DataFrame ya parseado
+_cache = {}                        # (ruta absoluta, columnas) -> Carga de la versión más reciente
+_candados = {}                     # ruta absoluta -> Lock
+_candado_global = threading.Lock()
+_metricas = {"aciertos": 0, "fallos": 0, "segundos_parseo": 0.0}
+
+
+def version_archivo(ruta):
+    # La versión de un archivo es (ruta, mtime, tamaño): si cambia cualquiera, se vuelve a parsear
+    info = os.stat(ruta)
+    return (os.path.abspath(ruta), info.st_mtime_ns, info.st_size)
+
+
+def descubrir_parciales(columnas):
+    columnas = list(columnas)
+    configuradas = os.environ.get("CALIFICACIONES_PARCIALES")
+    if configuradas:
+        return [c.strip() for c in configuradas.split(",") if c.strip() in columnas]
+
+    parciales = sorted((c for c in columnas if _PATRON_PARCIAL.match(str(c))),
+                       key=lambda c: int(_PATRON_PARCIAL.match(c).group(1)))
+    parciales += [c for c in columnas if c in NOMBRES_FINAL]
+    return parciales
+
+
+def columnas_app(columnas):
+    # Lo que la app realmente usa: las 4 claves de la cascada, el número de control y los
+    # parciales; las demás columnas ni se leen del sidecar
+    columnas = list(columnas)
+    alumno = [COLUMNA_ALUMNO] if COLUMNA_ALUMNO in columnas else []
+    return COLUMNAS_CLAVE + alumno + descubrir_parciales(columnas)
+
+
+def ruta_sidecar(ruta_excel):
+    # "Calificaciones ... .xlsx" -> "Calificaciones ... .parquet" en la misma carpeta
+    return os.path.splitext(ruta_excel)[0] + ".parquet"
+
+
+def sidecar_vigente(ruta_excel):
+    # El sidecar sirve solo si se construyó a partir de esta misma versión del Excel
+    ruta_pq = ruta_sidecar(ruta_excel)
+    if pq is None or not os.path.exists(ruta_pq):
+        return False
+    try:
+        meta = pq.read_schema(ruta_pq, memory_map=True).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return False
+    _, mtime_ns, tamano = version_archivo(ruta_excel)
+    return meta.get(_META_MTIME) == str(mtime_ns).encode() and meta.get(_META_TAMANO) == str(tamano).encode()
+
+
+def escribir_sidecar(df, ruta_excel):
+    # Convierte el DataFrame completo a Parquet una sola vez; se escribe a un archivo temporal
+    # y luego se renombra para que ningún lector vea un Parquet a medio escribir
+    _, mtime_ns, tamano = version_archivo(ruta_excel)
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    meta = dict(tabla.schema.metadata or {})
+    meta[_META_MTIME] = str(mtime_ns).encode()
+    meta[_META_TAMANO] = str(tamano).encode()
+    tabla = tabla.replace_schema_metadata(meta)
+
+    ruta_pq = ruta_sidecar(ruta_excel)
+    ruta_tmp = f"{ruta_pq}.{os.getpid()}.tmp"
+    pq.write_table(tabla, ruta_tmp)
+    os.replace(ruta_tmp, ruta_pq)
+    return ruta_pq
+
+
+def construir_sidecar(ruta_excel=RUTA_EXCEL):
+    # Paso de ingesta explícito: python -m calificaciones.carga "archivo.xlsx"
+    if pq is None:
+        raise RuntimeError("Se necesita pyarrow para construir el sidecar Parquet")
+    return escribir_sidecar(pd.read_excel(ruta_excel), ruta_excel)
+
+
+def _leer_datos(ruta_excel, columnas):
+    # Los dos caminos regresan el esquema compacto (esquema.py): claves categóricas con los
+    # diccionarios compartidos del proceso y calificaciones float32
+    # Camino rápido: Parquet mapeado en memoria leyendo solo las columnas pedidas; las claves
+    # de texto se leen como diccionario, así nunca se crea una cadena por fila
+    if sidecar_vigente(ruta_excel):
+        ruta_pq = ruta_sidecar(ruta_excel)
+        if columnas is None:
+            columnas = columnas_app(pq.read_schema(ruta_pq).names)
+        tabla = pq.read_table(ruta_pq, columns=columnas, memory_map=True,
+                              read_dictionary=[c for c in COLUMNAS_CLAVE if c != "Semestre" and c in columnas])
+        df = tabla.to_pandas()
+        return aplicar_esquema(df, descubrir_parciales(df.columns)), "parquet"
+
+    # Camino lento: el Excel es más nuevo (o no hay sidecar), se parsea y se reconstruye el sidecar
+    df = pd.read_excel(ruta_excel)
+    if pq is not None:
+        try:
+            escribir_sidecar(df, ruta_excel)
+        except (OSError, pa.ArrowException):
+            pass  # Carpeta de solo lectura o similar: seguimos con el Excel
+    df = df[columnas if columnas is not None else columnas_app(df.columns)]
+    return aplicar_esquema(df, descubrir_parciales(df.columns)), "xlsx"
+
+
+def _candado_de(ruta_abs):
+    with _candado_global:
+        return _candados.setdefault(ruta_abs, threading.Lock())
+
+
+def cargar_calificaciones(ruta=RUTA_EXCEL, columnas=None):
+    # columnas=None: claves de la cascada + parciales encontrados en el archivo
+    version = version_archivo(ruta)
+    ruta_abs = version[0]
+    clave = (ruta_abs, tuple(columnas) if columnas is not None else None)
+
+    # Un candado por archivo: si dos sesiones piden la misma versión al mismo tiempo,
+    # la segunda espera y se lleva el resultado de la primera en lugar de parsear otra vez
+    with _candado_de(ruta_abs):
+        anterior = _cache.get(clave)
+        if anterior is not None and anterior.version == version:
+            with _candado_global:
+                _metricas["aciertos"] += 1
+            return anterior._replace(desde_cache=True)
+
+        inicio = time.perf_counter()
+        df, origen = _leer_datos(ruta, columnas)
+        segundos = time.perf_counter() - inicio
+
+        # Reemplazar la entrada suelta la versión vieja del archivo
+        carga = Carga(df, version, segundos, False, origen)
+        _cache[clave] = carga
+
+    with _candado_global:
+        _metricas["fallos"] += 1
+        _metricas["segundos_parseo"] += segundos
+    return carga
+
+
+def metricas_cache():
+    # Copia de los contadores para mostrarlos sin exponer el diccionario interno
+    with _candado_global:
+        return dict(_metricas, archivos_en_cache=len(_cache))
+
+
+def limpiar_cache():
+    with _candado_global:
+        _cache.clear()
+
+
+if __name__ == "__main__":
+    for ruta in sys.argv[1:] or [RUTA_EXCEL]:
+        inicio = time.perf_counter()
+        destino = construir_sidecar(ruta)
+        print(f"{ruta} -> {destino} ({time.perf_counter() - inicio:.2f} s)")
@@ -0,0 +1,133 @@
+# Diagnóstico opcional de cada rerun: cuánto tarda cada etapa del script (carga, filtros,
+# estadísticas, gráficas, PDF, EduBot), cuánta memoria asigna y si sus cachés acertaron.
+# Se activa con CALIFICACIONES_DIAGNOSTICO=1 o abriendo la app con ?diagnostico=1; cada
+# etapa sale además como una línea JSON en el log "calificaciones.diagnostico".
+#
+# Apagado, cada marca es una sola comparación contra None: no se mide nada, no se arranca
+# tracemalloc y no se importa cProfile.
+import itertools
+import json
+import logging
+import os
+import time
+import tracemalloc
+from collections import namedtuple
+
+from calificaciones.carga import metricas_cache
+from calificaciones.graficas import metricas_imagenes
+from calificaciones.memo import metricas_memo
+
+ACTIVO = os.environ.get("CALIFICACIONES_DIAGNOSTICO", "") == "1"
+
+log = logging.getLogger("calificaciones.diagnostico")
+
+# Una etapa medida: milisegundos, memoria asignada (neta y pico, en KB) y cuántas búsquedas
+# en caché (datos, estructuras por versión e imágenes) acertaron o fallaron durante ella
+Etapa = namedtuple("Etapa", ["nombre", "ms", "kb_netos", "kb_pico", "aciertos", "fallos"])
+
+_reruns = itertools.count(1)
+
+
+def _contadores():
+    # Los contadores son del proceso: con varias sesiones a la vez pueden colarse búsquedas
+    # de otra sesión, pero en una sola sesión el conteo es exacto
+    aciertos = fallos = 0
+    for metricas in (metricas_cache(), metricas_imagenes(), metricas_memo()):
+        aciertos += metricas["aciertos"]
+        fallos += metricas["fallos"]
+    return aciertos, fallos
+
+
+def _preparar_log():
+    # Streamlit solo configura su propio logger; sin esto las líneas INFO no saldrían
+    if not log.handlers:
+        manejador = logging.StreamHandler()
+        manejador.setFormatter(logging.Formatter("%(message)s"))
+        log.addHandler(manejador)
+        log.setLevel(logging.INFO)
+        log.propagate = False
+
+
+def iniciar_rerun(activo, perfilar=False):
+    # None si el diagnóstico está apagado; todas las demás funciones aceptan ese None
+    if not activo:
+        return None
+    _preparar_log()
+    registro = {
+        "rerun": next(_reruns),
+        "inicio": time.perf_counter(),
+        "etapas": [],
+        "actual": None,
+        "tracemalloc_propio": not tracemalloc.is_tracing(),
+        "perfil": None,
+    }
+    if registro["tracemalloc_propio"]:
+        tracemalloc.start()
+    if perfilar:
+        import cProfile   # Solo cuando se pide un perfil
+        registro["perfil"] = cProfile.Profile()
+        registro["perfil"].enable()
+    return registro
+
+
+def marcar(registro, nombre):
+    # Cierra la etapa en curso y abre `nombre` (None: solo cerrar). El script es lineal, así
+    # que cada sección marca su inicio y la anterior termina ahí. Los fragmentos marcan al
+    # entrar y cierran al salir; cuando se vuelven a ejecutar solos, su etapa se registra en
+    # el último rerun completo de la sesión
+    if registro is None:
+        return
+    ahora = time.perf_counter()
+    actual = registro["actual"]
+    if actual is not None:
+        _cerrar(registro, actual, ahora)
+    if nombre is None:
+        registro["actual"] = None
+        return
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    registro["actual"] = (nombre, ahora, tracemalloc.get_traced_memory()[0], _contadores())
+
+
+def _cerrar(registro, actual, ahora):
+    nombre, inicio, memoria_inicio, (aciertos_inicio, fallos_inicio) = actual
+    memoria, pico = tracemalloc.get_traced_memory()
+    aciertos, fallos = _contadores()
+    etapa = Etapa(nombre, (ahora - inicio) * 1000, (memoria - memoria_inicio) / 1024,
+                  max(pico - memoria_inicio, 0) / 1024, aciertos - aciertos_inicio, fallos - fallos_inicio)
+    registro["etapas"].append(etapa)
+    log.info(json.dumps({"evento": "etapa", "rerun": registro["rerun"], **etapa._asdict()}, ensure_ascii=False))
+
+
+def terminar_rerun(registro):
+    # Cierra la última etapa, detiene tracemalloc (si lo arrancamos aquí) y el perfil
+    if registro is None:
+        return
+    marcar(registro, None)
+    if registro["perfil"] is not None:
+        registro["perfil"].disable()
+    if registro["tracemalloc_propio"]:
+        tracemalloc.stop()
+    registro["total_ms"] = (time.perf_counter() - registro["inicio"]) * 1000
+    log.info(json.dumps({"evento": "rerun", "rerun": registro["rerun"], "ms": registro["total_ms"],
+                         "etapas": len(registro["etapas"]), "perfil": registro["perfil"] is not None}))
+
+
+def tabla_etapas(registro):
+    # Filas para mostrar en el panel, en el orden en que corrieron
+    return [etapa._asdict() for etapa in registro["etapas"]]
+
+
+def perfil_pstats(registro):
+    # El perfil en el formato de pstats/snakeviz (archivo .prof) y las 25 funciones más
+    # costosas en texto; None si este rerun no se perfiló
+    perfil = registro["perfil"] if registro is not None else None
+    if perfil is None:
+        return None
+    import io
+    import marshal
+    import pstats
+    perfil.create_stats()
+    texto = io.StringIO()
+    pstats.Stats(perfil, stream=texto).sort_stats("cumulative").print_stats(25)
+    return marshal.dumps(perfil.stats), texto.getvalue()
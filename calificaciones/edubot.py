@@ -0,0 +1,233 @@
+# Motor de EduBot: entiende la pregunta con un índice de palabras clave y sinónimos
+# (sin acentos y tolerante a errores de dedo) y arma la respuesta con plantillas y las
+# estadísticas ya calculadas del grupo. Todo es local, no hay llamadas a servicios.
+import difflib
+import re
+import threading
+import time
+import unicodedata
+from collections import namedtuple
+from functools import lru_cache
+
+# medida:     llave en estadisticas_dict (None = respuesta fija, sin comparar parciales)
+# claves:     palabras o frases que activan la intención (se normalizan al compilar el índice)
+# subio/bajo/igual: plantillas de conclusión; pueden usar {anterior} y {ultimo}
+Intencion = namedtuple("Intencion", ["nombre", "medida", "claves", "titulo", "explicacion",
+                                     "formato", "negritas", "subio", "bajo", "igual"])
+
+# titulo/explicacion/valores/conclusion ya en markdown (None si no aplica);
+# aviso se muestra solo, en lugar de la respuesta; segundos es lo que tardó en armarse
+Respuesta = namedtuple("Respuesta", ["intencion", "titulo", "explicacion", "valores", "conclusion",
+                                     "aviso", "segundos"])
+
+INTENCIONES = [
+    Intencion(
+        "media", "media", ["media", "promedio"],
+        "📊 **Media**",
+        "La media es el promedio de todas las calificaciones. Nos ayuda a identificar el rendimiento general.",
+        "{:.2f}", False,
+        "📈 **Conclusión:** La media subió, los valores más frecuentes fueron más altos en {ultimo}.",
+        "📉 **Conclusión:** La media bajó, los valores más repetidos fueron más bajos en {ultimo}.",
+        "➖ **Conclusión:** La media se mantuvo igual entre {anterior} y {ultimo}.",
+    ),
+    Intencion(
+        "moda", "moda", ["moda", "más frecuente", "más repetida", "repite"],
+        "📌 **Moda**",
+        "La moda es el valor que más se repite. Si cambia entre parciales, indica un cambio en las calificaciones más comunes.",
+        "{:.2f}", True,
+        "📈 **Conclusión:** La moda subió, los valores más frecuentes fueron más altos en {ultimo}.",
+        "📉 **Conclusión:** La moda bajó, los valores más repetidos fueron más bajos en {ultimo}.",
+        "➖ **Conclusión:** La moda se mantuvo igual entre {anterior} y {ultimo}.",
+    ),
+    Intencion(
+        "mediana", "mediana", ["mediana"],
+        "📈 **Mediana**",
+        "Divide los datos ordenados por la mitad. Menos sensible a extremos que la media.",
+        "{:.2f}", False,
+        "📈 **Conclusión:** La mediana subió, los valores más frecuentes fueron más altos en {ultimo}.",
+        "📉 **Conclusión:** La mediana bajó, los valores más repetidos fueron más bajos en {ultimo}.",
+        "➖ **Conclusión:** La mediana se mantuvo igual entre {anterior} y {ultimo}.",
+    ),
+    Intencion(
+        "varianza", "varianza", ["varianza", "dispersión", "desviación"],
+        "📉 **Varianza**",
+        "Mide qué tanto se alejan los datos de la media. Alta varianza = calificaciones más dispersas.",
+        "{:.2f}", False,
+        "📈 **Conclusión:** La varianza aumentó en {ultimo}, lo que indica mayor variación entre las calificaciones del grupo.",
+        "📉 **Conclusión:** La varianza disminuyó, lo que sugiere que las calificaciones estuvieron más agrupadas en {ultimo}.",
+        "➖ **Conclusión:** La varianza se mantuvo igual, no hubo cambio en la dispersión del rendimiento entre {anterior} y {ultimo}.",
+    ),
+    Intencion(
+        "rango", "rango", ["rango", "máximo", "mínimo"],
+        "📏 **Rango (Máx - Mín)**",
+        "El rango muestra qué tan dispersas están las calificaciones, comparando la más alta con la más baja.",
+        "{:.2f}", False,
+        "📈 **Conclusión:** Aumentó el rango en {ultimo}, lo que indica mayor variabilidad entre los alumnos.",
+        "📉 **Conclusión:** Disminuyó el rango en {ultimo}, lo que sugiere que las calificaciones fueron más homogéneas.",
+        "➖ **Conclusión:** El rango se mantuvo igual, la dispersión fue la misma entre {anterior} y {ultimo}.",
+    ),
+    Intencion(
+        "q1", "q1", ["q1", "q 1", "cuartil 1", "primer cuartil"],
+        "🟪 **Q1 (Primer Cuartil - 25%)**",
+        "Indica que el 25% de las calificaciones están por debajo de este valor. Es útil para ver cómo está el rendimiento más bajo.",
+        "{:.2f}", False,
+        "📈 **Conclusión:** El Q1 subió en {ultimo}, los alumnos con menor rendimiento mejoraron.",
+        "📉 **Conclusión:** El Q1 bajó, indicando un desempeño más bajo en el 25% inferior.",
+        "➖ **Conclusión:** No hubo cambio en el Q1, el rendimiento inferior se mantuvo igual.",
+    ),
+    Intencion(
+        "q2", "q2", ["q2", "q 2", "cuartil 2", "segundo cuartil"],
+        "🔵 **Q2 (Mediana 50%)**",
+        "Mitad de alumnos sacó menos y mitad más que este valor.",
+        "{:.2f}", False,
+        "📈 **Conclusión:** El Q2 subió en {ultimo}, los alumnos con menor rendimiento mejoraron.",
+        "📉 **Conclusión:** El Q2 bajó, indicando un desempeño más bajo en el 50% inferior.",
+        "➖ **Conclusión:** No hubo cambio en el Q2, el rendimiento inferior se mantuvo igual.",
+    ),
+    Intencion(
+        "q3", "q3", ["q3", "q 3", "cuartil 3", "tercer cuartil"],
+        "🟥 **Q3 (75%)**",
+        "El 75% de los alumnos sacó menos o igual que este valor.",
+        "{:.2f}", False,
+        "📈 **Conclusión:** El Q3 subió en {ultimo}, los alumnos con menor rendimiento mejoraron.",
+        "📉 **Conclusión:** El Q3 bajó, indicando un desempeño más bajo en el 75% inferior.",
+        "➖ **Conclusión:** No hubo cambio en el Q3, el rendimiento inferior se mantuvo igual.",
+    ),
+    Intencion(
+        "total", "total", ["total", "alumnos", "estudiantes", "evaluados"],
+        "👥 **Total de alumnos con calificación registrada**",
+        "Refleja cuántos estudiantes fueron evaluados en cada parcial. Las diferencias pueden deberse a inasistencias, faltas de entrega o errores en captura de datos.",
+        "{}", False,
+        "📈 **Conclusión:** Más alumnos fueron evaluados en {ultimo} que en {anterior}.",
+        "📉 **Conclusión:** Menos alumnos tienen calificación en {ultimo}. Puede indicar ausencias o datos faltantes.",
+        "➖ **Conclusión:** El número de alumnos evaluados se mantuvo igual entre {anterior} y {ultimo}.",
+    ),
+    Intencion(
+        "boxplot", None, ["boxplot", "caja", "bigotes"],
+        "📦 **Boxplot**",
+        "El boxplot resume la distribución: la caja va de Q1 a Q3 (el 50% central), la línea es la mediana "
+        "y los bigotes llegan hasta los valores no atípicos más lejanos.",
+        None, False, None, None, None,
+    ),
+    Intencion(
+        "pdf", None, ["pdf", "descargar", "reporte"],
+        None,
+        "📄 Puedes generar un PDF con las gráficas y estadísticas actuales usando el botón en la parte del final de las graficas.",
+        None, False, None, None, None,
+    ),
+]
+
+AVISO_SIN_RESPUESTA = "❓ No encontré una respuesta. Intenta con: media, varianza, PDF, boxplot, etc."
+AVISO_SIN_COMPARACION = "❓ Se necesitan al menos dos parciales con calificaciones para comparar."
+
+EMOJIS_PARCIALES = ["🟢", "🔵", "🟣", "🟠", "🟡"]
+
+# Palabras de menos letras no se corrigen: "q1" no debe volverse "q3" ni "la" volverse algo
+_MIN_LETRAS_CORRECCION = 4
+_SIMILITUD_MINIMA = 0.8
+
+
+def normalizar(texto):
+    # "¿Qué es la MEDIANA?" -> ["que", "es", "la", "mediana"]
+    texto = unicodedata.normalize("NFKD", str(texto).lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return re.findall(r"[a-z0-9]+", texto)
+
+
+def _compilar(intenciones):
+    # frase normalizada (tupla de 1 o 2 palabras) -> índice de la intención
+    frases = {}
+    for i, intencion in enumerate(intenciones):
+        for clave in intencion.claves:
+            frases[tuple(normalizar(clave))] = i
+    vocabulario = sorted({palabra for frase in frases for palabra in frase})
+    return frases, vocabulario
+
+
+_FRASES, _VOCABULARIO = _compilar(INTENCIONES)
+_PALABRAS = frozenset(_VOCABULARIO)
+
+
+@lru_cache(maxsize=4096)
+def _corregir(palabra):
+    # Errores de dedo: "medaina" -> "mediana", "varianza" se queda igual
+    if palabra in _PALABRAS or len(palabra) < _MIN_LETRAS_CORRECCION or palabra.isdigit():
+        return palabra
+    parecidas = difflib.get_close_matches(palabra, _VOCABULARIO, n=1, cutoff=_SIMILITUD_MINIMA)
+    return parecidas[0] if parecidas else palabra
+
+
+def detectar_intencion(pregunta):
+    # Cada frase encontrada vota por su intención con un punto por palabra exacta y medio por
+    # palabra corregida; gana la de más votos y, en empate, la que aparece primero en la
+    # pregunta. Se compara palabra por palabra, así "mediana" ya no cae en "media".
+    originales = normalizar(pregunta)
+    palabras = [_corregir(palabra) for palabra in originales]
+    pesos = [1.0 if p == o else 0.5 for p, o in zip(palabras, originales)]
+    votos, primera = {}, {}
+    for posicion in range(len(palabras)):
+        for largo in (1, 2):
+            frase = tuple(palabras[posicion:posicion + largo])
+            if len(frase) == largo and frase in _FRASES:
+                i = _FRASES[frase]
+                votos[i] = votos.get(i, 0) + sum(pesos[posicion:posicion + largo])
+                primera.setdefault(i, posicion)
+    if not votos:
+        return None
+    return INTENCIONES[max(votos, key=lambda i: (votos[i], -primera[i]))]
+
+
+def valores_por_parcial(estadisticas_dict, parciales, medida, formato="{:.2f}", negritas=False):
+    # "🟢 P1: 7.85  \n🔵 P2: 7.91 ..." para los mensajes del bot
+    lineas = []
+    for i, parcial in enumerate(parciales):
+        etiqueta = f"**{parcial}:**" if negritas else f"{parcial}:"
+        valor = formato.format(estadisticas_dict[parcial][medida])
+        lineas.append(f"{EMOJIS_PARCIALES[i % len(EMOJIS_PARCIALES)]} {etiqueta} {valor}")
+    return "  \n".join(lineas)
+
+
+def _armar(intencion, estadisticas_dict, parciales):
+    if intencion is None:
+        return None, None, None, None, AVISO_SIN_RESPUESTA
+    if intencion.medida is None:
+        return intencion.titulo, intencion.explicacion, None, None, None
+    if len(parciales) < 2:
+        return None, None, None, None, AVISO_SIN_COMPARACION
+
+    anterior, ultimo = parciales[-2:]
+    p1 = estadisticas_dict[anterior][intencion.medida]
+    p2 = estadisticas_dict[ultimo][intencion.medida]
+    plantilla = intencion.subio if p2 > p1 else intencion.bajo if p2 < p1 else intencion.igual
+    valores = valores_por_parcial(estadisticas_dict, parciales, intencion.medida,
+                                  intencion.formato, intencion.negritas)
+    return (intencion.titulo, intencion.explicacion, valores,
+            plantilla.format(anterior=anterior, ultimo=ultimo), None)
+
+
+# Latencia de las respuestas del proceso (todas las sesiones)
+_candado = threading.Lock()
+_metricas = {"respuestas": 0, "segundos_total": 0.0, "segundos_max": 0.0}
+
+
+def responder(pregunta, estadisticas_dict, parciales):
+    # parciales: los que tienen datos, en orden; se compara el último contra el anterior
+    inicio = time.perf_counter()
+    intencion = detectar_intencion(pregunta)
+    titulo, explicacion, valores, conclusion, aviso = _armar(intencion, estadisticas_dict, list(parciales))
+    segundos = time.perf_counter() - inicio
+
+    with _candado:
+        _metricas["respuestas"] += 1
+        _metricas["segundos_total"] += segundos
+        _metricas["segundos_max"] = max(_metricas["segundos_max"], segundos)
+
+    return Respuesta(intencion.nombre if intencion else None, titulo, explicacion, valores,
+                     conclusion, aviso, segundos)
+
+
+def metricas_bot():
+    with _candado:
+        respuestas = _metricas["respuestas"]
+        promedio = _metricas["segundos_total"] / respuestas if respuestas else 0.0
+        return dict(_metricas, segundos_promedio=promedio)
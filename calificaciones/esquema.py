@@ -0,0 +1,104 @@
+# Esquema compacto en memoria: las 4 claves de la cascada como categóricas con diccionarios
+# compartidos por todo el proceso, las calificaciones en float32 y solo las columnas que la
+# app lee (carga.columnas_app). Con varios planteles cargados en la misma réplica, cada
+# carrera o asignatura se guarda una vez en el diccionario y las filas solo guardan su código:
+#   python -m calificaciones.esquema "Calificaciones ... .xlsx"    (reporte de bytes por fila)
+#
+# Las calificaciones vacías quedan como NaN (float32 no tiene otro "vacío" y todo el código
+# ya trata NaN como faltante). Los diccionarios solo crecen: un valor nuevo se agrega al
+# final, así que el código de un valor ya visto nunca cambia.
+import math
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+from calificaciones.indice import COLUMNAS_CLAVE
+
+TIPO_CALIFICACION = np.float32
+DECIMALES = 4     # float32 guarda ~7 cifras: de sobra para calificaciones con 1 o 2 decimales
+
+_diccionarios = {}                 # columna -> pd.Index con las categorías del proceso
+_candado = threading.Lock()
+
+
+def diccionario(columna, valores=()):
+    # Categorías compartidas de columna, agregando (ordenados) los valores que no estaban
+    nuevos = pd.Index(valores).dropna().unique()
+    with _candado:
+        actual = _diccionarios.get(columna)
+        if actual is not None:
+            nuevos = nuevos.difference(actual, sort=False)
+        if actual is None or len(nuevos):
+            actual = nuevos.sort_values() if actual is None else actual.append(nuevos.sort_values())
+            _diccionarios[columna] = actual
+        return actual
+
+
+def categorizar(serie, columna):
+    # La serie como categórica con el diccionario compartido de columna. Si ya es categórica
+    # (p. ej. leída del Parquet como diccionario) solo se recodifican sus categorías
+    existente = _diccionarios.get(columna)
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        if existente is None or serie.cat.categories.dtype == existente.dtype:
+            return serie.cat.set_categories(diccionario(columna, serie.cat.categories))
+        serie = serie.astype(serie.cat.categories.dtype)
+    if existente is not None and serie.dtype != existente.dtype:
+        serie = serie.astype(existente.dtype)   # Semestre "2" en una captura CSV -> 2
+    return serie.astype(pd.CategoricalDtype(diccionario(columna, serie.unique())))
+
+
+def aplicar_esquema(df, parciales):
+    # Claves categóricas compartidas y calificaciones float32; las demás columnas se dejan
+    tipado = df.copy(deep=False)
+    for columna in COLUMNAS_CLAVE:
+        if columna in tipado.columns:
+            tipado[columna] = categorizar(tipado[columna], columna)
+    for parcial in parciales:
+        tipado[parcial] = pd.to_numeric(tipado[parcial], errors="coerce").astype(TIPO_CALIFICACION)
+    return tipado
+
+
+def a_decimal(valores):
+    # float64 para calcular: float32 se redondea a DECIMALES para recuperar el decimal que se
+    # capturó (7.9 y no 7.900000095), así los bordes de rango y los cuantiles salen igual
+    # que con los datos originales en float64
+    valores = np.asarray(valores)
+    if valores.dtype == np.float32:
+        return np.round(valores.astype(np.float64), DECIMALES)
+    return valores.astype(np.float64, copy=False)
+
+
+def a_python(valor):
+    # Tipos de numpy a tipos de Python para JSON y CSV; NaN (varianza con un solo alumno) no es
+    # JSON válido, queda None
+    valor = valor.item() if isinstance(valor, np.generic) else valor
+    return None if isinstance(valor, float) and math.isnan(valor) else valor
+
+
+def memoria(df):
+    # Bytes de cada columna (contando las cadenas de verdad) y por fila
+    por_columna = df.memory_usage(deep=True, index=False)
+    total = int(por_columna.sum())
+    return {
+        "filas": len(df),
+        "bytes": total,
+        "bytes_por_fila": total / len(df) if len(df) else 0.0,
+        "columnas": {columna: int(bytes_) for columna, bytes_ in por_columna.items()},
+    }
+
+
+if __name__ == "__main__":
+    from calificaciones.carga import RUTA_EXCEL, columnas_app, descubrir_parciales
+
+    for ruta in sys.argv[1:] or [RUTA_EXCEL]:
+        crudo = pd.read_excel(ruta)
+        parciales = descubrir_parciales(crudo.columns)
+        compacto = aplicar_esquema(crudo[columnas_app(crudo.columns)], parciales)
+        antes, despues = memoria(crudo), memoria(compacto)
+        print(f"{ruta}: {antes['filas']} filas")
+        print(f"  read_excel: {antes['bytes_por_fila']:.1f} bytes/fila ({antes['bytes'] / 1e6:.2f} MB)")
+        print(f"  esquema:    {despues['bytes_por_fila']:.1f} bytes/fila ({despues['bytes'] / 1e6:.2f} MB)")
+        for columna, bytes_ in despues["columnas"].items():
+            print(f"    {columna}: {antes['columnas'][columna] / antes['filas']:.1f} -> {bytes_ / despues['filas']:.1f}")
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from calificaciones.esquema import a_decimal
+
+# Parciales por omisión; la app usa los que encuentra en el archivo (carga.descubrir_parciales)
+PARCIALES = ["P1", "P2"]
+
+# Las mismas medidas (y nombres) que usa estadisticas_dict en la app
+MEDIDAS = ["media", "mediana", "moda", "varianza", "q1", "q2", "q3", "max", "min", "rango", "total"]
+
+
+def cuantil(acumulado, dominio, q):
+    # Cuantil q con interpolación lineal entre estadísticos de orden, igual que
+    # Series.quantile(), de una o muchas distribuciones a la vez: acumulado (..., casillas) es
+    # la suma acumulada de cuántas calificaciones hay en cada valor de dominio (ordenado)
+    n = acumulado[..., -1]
+
+    def orden(k):
+        # k-ésimo valor (desde 0): acumulado es creciente, así que contar las casillas con
+        # acumulado <= k es un searchsorted por distribución
+        return dominio[np.minimum((acumulado <= k[..., None]).sum(axis=-1), len(dominio) - 1)]
+
+    pos = np.maximum(n - 1, 0) * q
+    abajo = np.floor(pos)
+    a, b = orden(abajo), orden(np.minimum(abajo + 1, np.maximum(n - 1, 0)))
+    return a + (b - a) * (pos - abajo)
+
+
+def cajas(pesos, dominio):
+    # Caja y bigotes de una o muchas distribuciones (pesos: (..., casillas), cuántas
+    # calificaciones hay en cada valor de dominio): cuartiles como cuantil() y bigotes hasta la
+    # calificación más extrema dentro de 1.5 * IQR, como los dibuja seaborn. Cuesta lo mismo
+    # con 10 alumnos que con 10,000; donde no hay calificaciones todo queda NaN
+    pesos = np.asarray(pesos)
+    acumulado = np.cumsum(pesos, axis=-1)
+    n = acumulado[..., -1]
+    q1, q2, q3 = (cuantil(acumulado, dominio, q) for q in (0.25, 0.50, 0.75))
+    iqr = q3 - q1
+    dentro = (pesos > 0) & (dominio >= (q1 - 1.5 * iqr)[..., None]) & (dominio <= (q3 + 1.5 * iqr)[..., None])
+    bigote_inf = dominio[np.argmax(dentro, axis=-1)]
+    bigote_sup = dominio[pesos.shape[-1] - 1 - np.argmax(dentro[..., ::-1], axis=-1)]
+    vacio = n == 0
+    resultado = {"q1": q1, "mediana": q2, "q3": q3, "bigote_inf": bigote_inf, "bigote_sup": bigote_sup}
+    resultado = {medida: np.where(vacio, np.nan, valores) for medida, valores in resultado.items()}
+    resultado["total"] = n
+    resultado["atipicos"] = n - np.where(dentro, pesos, 0).sum(axis=-1)
+    return resultado
+
+
+def resumen_boxplot(valores):
+    # Caja y bigotes de unas calificaciones sueltas (las filas de una selección). None si no
+    # hay datos.
+    x = a_decimal(valores)
+    x = x[~np.isnan(x)]
+    if len(x) == 0:
+        return None
+    dominio, pesos = np.unique(x, return_counts=True)
+    resumen = cajas(pesos, dominio)
+    return {
+        "q1": float(resumen["q1"]),
+        "mediana": float(resumen["mediana"]),
+        "q3": float(resumen["q3"]),
+        "bigote_inf": float(resumen["bigote_inf"]),
+        "bigote_sup": float(resumen["bigote_sup"]),
+        "total": int(len(x)),
+    }
+
+
+def comparar_parciales(estadisticas_dict, parciales=PARCIALES):
+    # Matriz parciales x medidas de un grupo y los cambios entre parciales consecutivos,
+    # todo de una vez con NumPy en lugar de una comparación por medida y por par de parciales
+    presentes = [parcial for parcial in parciales if parcial in estadisticas_dict]
+    matriz = np.array([[estadisticas_dict[parcial][medida] for medida in MEDIDAS] for parcial in presentes],
+                      dtype=float).reshape(len(presentes), len(MEDIDAS))
+    tabla = pd.DataFrame(matriz, index=presentes, columns=MEDIDAS)
+    deltas = pd.DataFrame(np.diff(matriz, axis=0), columns=MEDIDAS,
+                          index=[f"{a}→{b}" for a, b in zip(presentes, presentes[1:])])
+    return tabla, deltas
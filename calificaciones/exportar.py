@@ -0,0 +1,130 @@
+# Estadísticas sin Streamlit para los procesos nocturnos: las mismas medidas de las tablas
+# de la app (total, media, mediana, moda, varianza, rango, Q1-Q3, mínimo y máximo) por
+# parcial, como JSON Lines o CSV, a la salida estándar o a un archivo:
+#   python -m calificaciones.exportar --formato csv --salida estadisticas.csv
+#   python -m calificaciones.exportar --almacen almacen --nivel carrera --semestre 2
+#
+# Con --almacen se lee el almacén particionado de a una partición (plantel y semestre) a la
+# vez: en memoria solo hay esa partición y los acumuladores de sus grupos, así que el total
+# de datos puede ser más grande que la memoria. Cada partición se escribe en cuanto termina.
+import argparse
+import csv
+import json
+import os
+import sys
+
+import numpy as np
+
+from calificaciones.almacen import leer_plantel, nombre_plantel, planteles, semestres_plantel
+from calificaciones.carga import RUTA_EXCEL, descubrir_parciales
+from calificaciones.esquema import a_python
+from calificaciones.incremental import construir_acumuladores, estadisticas_acumuladas, estado_incremental
+from calificaciones.indice import COLUMNAS_CLAVE
+from calificaciones.niveles import NIVELES, combinar, sumar
+
+CAMPOS_CLAVE = ["plantel", "nivel", "semestre", "carrera", "grupo", "asignatura", "parcial"]
+CAMPOS_MEDIDAS = ["total", "media", "mediana", "moda", "varianza", "rango", "q1", "q2", "q3", "min", "max"]
+CAMPOS = CAMPOS_CLAVE + CAMPOS_MEDIDAS
+
+
+def particiones(excel=RUTA_EXCEL, almacen=None, plantel=None, semestre=None):
+    # (plantel, acumuladores) de cada partición. Del libro sale una sola, con las capturas
+    # aplicadas (lo mismo que ve la app); del almacén, una por plantel y semestre
+    if almacen is None:
+        yield nombre_plantel(excel), estado_incremental(excel).acumuladores
+        return
+    for nombre in planteles(almacen):
+        if plantel is not None and nombre != plantel:
+            continue
+        for numero in semestres_plantel(nombre, almacen):
+            if semestre is not None and str(numero) != str(semestre):
+                continue
+            df = leer_plantel(nombre, numero, destino=almacen)
+            yield nombre, construir_acumuladores(df, descubrir_parciales(df.columns))
+
+
+def _coincide(clave, filtros):
+    return all(valor is None or str(clave[i]) == str(valor) for i, valor in enumerate(filtros))
+
+
+def _resumenes(acumuladores, nivel, filtros):
+    # (prefijo, acumuladores con ese prefijo como único grupo) de los grupos que pasan los
+    # filtros, juntados al nivel pedido; en nivel grupo se leen tal cual
+    if nivel == "grupo":
+        for clave in sorted(acumuladores.posicion):
+            if _coincide(clave, filtros):
+                yield clave, acumuladores
+        return
+    largo = NIVELES[nivel]
+    grupos = {}
+    for clave, g in acumuladores.posicion.items():
+        if _coincide(clave, filtros):
+            grupos.setdefault(tuple(clave[:largo]), []).append(g)
+    for prefijo in sorted(grupos):
+        yield prefijo, combinar(acumuladores, np.array(grupos[prefijo], dtype=np.int64), prefijo)
+
+
+def _filas(plantel, nivel, prefijo, acumuladores):
+    clave = list(prefijo) + [None] * (len(COLUMNAS_CLAVE) - len(prefijo))
+    for parcial, medidas in estadisticas_acumuladas(acumuladores, prefijo).items():
+        fila = dict(zip(CAMPOS_CLAVE, [plantel, nivel, *map(a_python, clave), parcial]))
+        fila.update({medida: a_python(medidas[medida]) for medida in CAMPOS_MEDIDAS})
+        yield fila
+
+
+def estadisticas(excel=RUTA_EXCEL, almacen=None, nivel="grupo", plantel=None, semestre=None, carrera=None,
+                 grupo=None, asignatura=None):
+    # Genera una fila por (grupo o nivel, parcial), partición por partición
+    filtros = (semestre, carrera, grupo, asignatura)
+    totales = {}   # Nivel plantel: un plantel puede venir en varias particiones (una por semestre)
+    for nombre, acumuladores in particiones(excel, almacen, plantel, semestre):
+        for prefijo, resumen in _resumenes(acumuladores, nivel, filtros):
+            if nivel == "plantel":
+                totales[nombre] = sumar(totales.get(nombre), resumen)
+            else:
+                yield from _filas(nombre, nivel, prefijo, resumen)
+    for nombre, resumen in totales.items():
+        yield from _filas(nombre, nivel, (), resumen)
+
+
+def escribir(filas, salida, formato):
+    if formato == "csv":
+        escritor = csv.DictWriter(salida, fieldnames=CAMPOS)
+        escritor.writeheader()
+        for fila in filas:
+            escritor.writerow(fila)
+    else:
+        for fila in filas:
+            salida.write(json.dumps(fila, ensure_ascii=False) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta las estadísticas por grupo o nivel como JSON Lines o CSV")
+    parser.add_argument("--excel", default=RUTA_EXCEL, help="Libro de calificaciones (si no se usa --almacen)")
+    parser.add_argument("--almacen", help="Carpeta del almacén particionado (python -m calificaciones.almacen)")
+    parser.add_argument("--nivel", choices=list(NIVELES), default="grupo")
+    parser.add_argument("--formato", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("--salida", help="Archivo de salida (por omisión, la salida estándar)")
+    parser.add_argument("--plantel", help="Solo este plantel (con --almacen)")
+    parser.add_argument("--semestre", help="Solo este semestre")
+    parser.add_argument("--carrera", help="Solo esta carrera")
+    parser.add_argument("--grupo", help="Solo este grupo")
+    parser.add_argument("--asignatura", help="Solo esta asignatura")
+    args = parser.parse_args(argv)
+
+    filas = estadisticas(args.excel, args.almacen, args.nivel, args.plantel, args.semestre, args.carrera,
+                         args.grupo, args.asignatura)
+    if args.salida is None:
+        try:
+            escribir(filas, sys.stdout, args.formato)
+        except BrokenPipeError:
+            # Se cerró la tubería (p. ej. `| head`): no es un error, solo ya no hay quien lea
+            sys.stdout = open(os.devnull, "w")
+    else:
+        with open(args.salida, "w", encoding="utf-8", newline="") as salida:
+            escribir(filas, salida, args.formato)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
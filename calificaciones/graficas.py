@@ -0,0 +1,307 @@
+import io
+import os
+import struct
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from calificaciones.esquema import a_decimal
+from calificaciones.rangos import datos_pastel
+
+# matplotlib y seaborn se importan dentro de cada figura_*: importar este módulo (caché de
+# imágenes, colores) no los carga, y en modo navegador o con las imágenes ya en caché nunca
+# se cargan. Las figuras son sueltas (matplotlib.figure.Figure): no se registran en pyplot,
+# así no se acumulan en el proceso
+
+# Color de cada parcial en el boxplot (P1 rojo, P2 verde como siempre; los demás siguen la paleta)
+COLORES_PARCIALES = ['#ff073a', '#00ff00', '#00ffd5', '#ff9f1c', '#bf5fff', '#ffe066']
+
+
+# Puntos individuales del boxplot: hasta MAX_PUNTOS calificaciones por parcial se dibujan
+# todas (stripplot, como siempre); arriba de eso se cambia solo a un enjambre por casillas
+# con a lo más ~MAX_PUNTOS puntos por parcial (ver enjambre)
+MAX_PUNTOS = int(os.environ.get("CALIFICACIONES_MAX_PUNTOS", "300"))
+
+
+def colores_parciales(parciales):
+    return [COLORES_PARCIALES[i % len(COLORES_PARCIALES)] for i in range(len(parciales))]
+
+
+# Una gráfica ya renderizada: los bytes del PNG y sus dimensiones reales
+Imagen = namedtuple("Imagen", ["png", "ancho_px", "alto_px", "dpi"])
+
+
+# Misma resolución que usaba st.pyplot, así la página se ve igual que antes
+DPI_GRAFICAS = 200
+
+# Caché LRU de imágenes ya renderizadas, compartido entre sesiones del proceso.
+# Clave: (tipo de gráfica, versión de datos, clave del grupo)
+MAX_IMAGENES = int(os.environ.get("CALIFICACIONES_MAX_IMAGENES", "120"))
+_imagenes = OrderedDict()
+_candado = threading.Lock()
+_metricas = {"aciertos": 0, "fallos": 0}
+
+
+def figura_a_png(fig, dpi=DPI_GRAFICAS):
+    # Renderiza a un buffer en memoria; el tamaño se lee del encabezado IHDR del propio PNG
+    # (con bbox_inches='tight' no coincide con el tamaño de la figura)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, bbox_inches='tight', facecolor=fig.get_facecolor())
+    png = buffer.getvalue()
+    ancho_px, alto_px = struct.unpack(">II", png[16:24])
+    return Imagen(png, ancho_px, alto_px, dpi)
+
+
+def renderizar(construir):
+    # Construye la figura, la convierte a PNG y la libera en el acto.
+    # construir() puede regresar None (p. ej. boxplot sin datos)
+    fig = construir()
+    if fig is None:
+        return None
+    try:
+        return figura_a_png(fig)
+    finally:
+        fig.clear()
+
+
+def imagen_grafica(tipo, version, clave, construir):
+    # Regresa la imagen del caché o la renderiza una vez; volver a un grupo ya visto no
+    # toca matplotlib. Se renderiza fuera del candado para no bloquear a otras sesiones.
+    llave = (tipo, version, tuple(clave))
+    with _candado:
+        if llave in _imagenes:
+            _imagenes.move_to_end(llave)
+            _metricas["aciertos"] += 1
+            return _imagenes[llave]
+
+    imagen = renderizar(construir)
+
+    with _candado:
+        _metricas["fallos"] += 1
+        _imagenes[llave] = imagen
+        _imagenes.move_to_end(llave)
+        while len(_imagenes) > MAX_IMAGENES:
+            _imagenes.popitem(last=False)  # Sale la menos usada recientemente
+    return imagen
+
+
+def metricas_imagenes():
+    with _candado:
+        return dict(_metricas, imagenes_en_cache=len(_imagenes))
+
+
+def figura_histograma(conteos_dict, rangos):
+    # Un subplot por parcial, en el orden de conteos_dict ({parcial: conteo por rango o None})
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(7 * len(conteos_dict), 6))
+    axes = fig.subplots(1, len(conteos_dict), squeeze=False)[0]
+    fig.patch.set_facecolor('#121212')  # fondo oscuro
+
+    for idx, (parcial, conteo) in enumerate(conteos_dict.items()):
+        if conteo is None:
+            axes[idx].set_title(f'{parcial} - Sin datos', color='white')
+            axes[idx].axis('off')
+            continue
+
+        # Los mismos rangos (y el mismo "Fuera de rango") que el pastel y el PDF
+        colores, etiquetas, porcentajes = datos_pastel(conteo, rangos)
+        frecuencias = conteo[[rangos.etiquetas.index(etiqueta) for etiqueta in etiquetas]]
+
+        axes[idx].set_facecolor('#121212')  # fondo oscuro subplot
+        barras = axes[idx].bar(etiquetas, frecuencias, color=colores)
+
+        # Porcentajes encima de cada barra
+        for bar, pct in zip(barras, porcentajes):
+            height = bar.get_height()
+            axes[idx].text(bar.get_x() + bar.get_width()/2, height + 0.3,
+                           f'{pct:.1f}%', ha='center', color='white', fontsize=10, fontweight='bold')
+
+        axes[idx].set_title(f'Histograma {parcial}', color='white', fontsize=16, fontweight='bold')
+        axes[idx].set_xlabel('Rango', color='white', fontsize=12)
+        axes[idx].set_ylabel('Frecuencia', color='white', fontsize=12)
+        axes[idx].tick_params(colors='white')  # ticks blancos
+
+    fig.tight_layout()
+    return fig
+
+
+def figura_pastel(conteos_dict, rangos):
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(6 * len(conteos_dict), 6), facecolor='#121212')
+    axes = fig.subplots(1, len(conteos_dict), squeeze=False)[0]
+    for ax in axes:
+        ax.set_facecolor('#121212')  # fondo oscuro
+
+    for idx, (parcial, conteo) in enumerate(conteos_dict.items()):
+        if conteo is None:
+            axes[idx].set_title(f'{parcial} - Sin datos', color='white')
+            axes[idx].axis('off')
+            continue
+
+        colores, _, porcentajes = datos_pastel(conteo, rangos)
+
+        # Gráfica pastel limpia
+        axes[idx].pie(
+            porcentajes,
+            labels=None,
+            autopct=None,
+            startangle=90,
+            colors=colores,
+            wedgeprops={'edgecolor': '#121212', 'linewidth': 2}
+        )
+        axes[idx].set_title(f'Pastel {parcial}', color='white', fontsize=16, fontweight='bold')
+
+    fig.tight_layout()
+    return fig
+
+
+def enjambre(valores, maximo=MAX_PUNTOS, ancho=0.35, pasos=10):
+    # Enjambre determinista por casillas para muchos puntos: las calificaciones se juntan por
+    # valor (décimas) y cada valor dibuja una cantidad de puntos proporcional a su frecuencia
+    # (al menos uno, para que no se pierdan los extremos), repartidos parejo a lo ancho de
+    # una franja que crece con la frecuencia, como un violín hecho de puntos.
+    # Regresa (desplazamientos en x, valores en y); a lo más maximo + un punto por valor distinto
+    x = a_decimal(valores)
+    x = x[~np.isnan(x)]
+    if len(x) == 0:
+        return np.empty(0), np.empty(0)
+    casillas, frecuencias = np.unique(np.rint(x * pasos).astype(np.int64), return_counts=True)
+    dibujados = np.maximum(1, frecuencias * maximo // len(x))
+    semiancho = ancho * frecuencias / frecuencias.max()
+
+    inicios = np.r_[0, np.cumsum(dibujados)[:-1]]
+    posicion = np.arange(dibujados.sum()) - np.repeat(inicios, dibujados)
+    fraccion = (posicion + 0.5) / np.repeat(dibujados, dibujados)
+    desplazamientos = (2 * fraccion - 1) * np.repeat(semiancho, dibujados)
+    return desplazamientos, np.repeat(casillas / pasos, dibujados)
+
+
+def _cajas_resumidas(ax, grupo_df, parciales):
+    # Las mismas cajas que sns.boxplot (mismos cuartiles y bigotes, mismo estilo: colores al
+    # 75% de saturación y líneas gris oscuro) con ax.bxp, sin pasarle las filas a seaborn
+    import colorsys
+
+    from matplotlib.colors import to_rgb
+
+    from calificaciones.estadisticas import resumen_boxplot
+    gris = (0.3, 0.3, 0.3)
+    for j, (parcial, color) in enumerate(zip(parciales, colores_parciales(parciales))):
+        resumen = resumen_boxplot(grupo_df[parcial].to_numpy())
+        if resumen is None:
+            continue
+        h, l, s = colorsys.rgb_to_hls(*to_rgb(color))
+        ax.bxp([{"med": resumen["mediana"], "q1": resumen["q1"], "q3": resumen["q3"],
+                 "whislo": resumen["bigote_inf"], "whishi": resumen["bigote_sup"], "fliers": []}],
+               positions=[j], widths=0.4, capwidths=0.2, patch_artist=True, manage_ticks=False,
+               boxprops={"facecolor": colorsys.hls_to_rgb(h, l, s * 0.75), "edgecolor": gris, "linewidth": 2.5},
+               medianprops={"color": gris, "linewidth": 2.5}, whiskerprops={"color": gris, "linewidth": 2.5},
+               capprops={"color": gris, "linewidth": 2.5})
+    ax.set_xticks(range(len(parciales)), parciales)
+    ax.set_xlim(-0.5, len(parciales) - 0.5)
+
+
+def figura_boxplot(grupo_df, parciales, max_puntos=MAX_PUNTOS):
+    # None si no hay ninguna calificación que graficar
+    if grupo_df[parciales].dropna(how='all').empty:
+        return None
+
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(max(7, 2.5 * len(parciales)), 5), facecolor='#121212')
+    ax = fig.subplots()
+    fig.patch.set_facecolor('#121212')
+
+    if grupo_df[parciales].count().max() <= max_puntos:
+        import seaborn as sns
+
+        # Boxplot detalles
+        sns.boxplot(
+            data=grupo_df[parciales],
+            palette=colores_parciales(parciales),
+            width=0.4,
+            linewidth=2.5,
+            fliersize=0,
+            ax=ax
+        )
+
+        # Puntos individuales los de color blanco
+        sns.stripplot(
+            data=grupo_df[parciales],
+            jitter=True,
+            dodge=True,
+            size=6,
+            color='white',
+            alpha=0.6,
+            ax=ax
+        )
+    else:
+        # Selección grande (una carrera, un semestre...): las cajas salen de resumen_boxplot
+        # y los puntos del enjambre por casillas, así el dibujo cuesta lo mismo con 300 que
+        # con 300,000 calificaciones y se sigue viendo la forma de la distribución
+        _cajas_resumidas(ax, grupo_df, parciales)
+        for j, parcial in enumerate(parciales):
+            desplazamientos, valores = enjambre(grupo_df[parcial].to_numpy(), max_puntos)
+            ax.scatter(j + desplazamientos, valores, s=10, color='white', alpha=0.6, linewidths=0, zorder=3)
+
+    # Fondo y ejes
+    ax.set_facecolor('#121212')
+    ax.tick_params(colors='white', labelsize=12)
+    ax.set_ylabel('Calificación', color='white', fontsize=13)
+    ax.set_xlabel('', color='white')
+
+    # Bordes blancos 
+    for spine in ax.spines.values():
+        spine.set_color('white')
+        spine.set_linewidth(1.5)
+
+    # Grid discreto en eje Y
+    ax.yaxis.grid(True, linestyle='--', linewidth=0.7, color='gray', alpha=0.3)
+    ax.set_axisbelow(True)
+    return fig
+
+
+def figura_comparacion(comparacion):
+    # Cajas lado a lado de cada grupo (o carrera, o semestre) con ax.bxp a partir de los
+    # cuartiles y bigotes ya calculados: dibujar 40 grupos cuesta lo mismo sin importar
+    # cuántos alumnos tenga cada uno. None si ninguna caja tiene calificaciones
+    cajas = comparacion.cajas
+    if not (cajas["total"] > 0).any():
+        return None
+
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Patch
+    parciales, etiquetas = comparacion.parciales, comparacion.etiquetas
+    colores = colores_parciales(parciales)
+    ancho = 0.8 / len(parciales)
+    fig = Figure(figsize=(min(40, max(8, 0.5 * len(etiquetas) * len(parciales) + 2)), 5), facecolor='#121212')
+    ax = fig.subplots()
+
+    for j, (parcial, color) in enumerate(zip(parciales, colores)):
+        con_datos = [i for i in range(len(etiquetas)) if cajas["total"][i, j] > 0]
+        estadisticos = [{
+            "med": cajas["mediana"][i, j], "q1": cajas["q1"][i, j], "q3": cajas["q3"][i, j],
+            "whislo": cajas["bigote_inf"][i, j], "whishi": cajas["bigote_sup"][i, j], "fliers": [],
+        } for i in con_datos]
+        posiciones = [i + (j - (len(parciales) - 1) / 2) * ancho for i in con_datos]
+        ax.bxp(estadisticos, positions=posiciones, widths=ancho * 0.8, patch_artist=True, manage_ticks=False,
+               boxprops={"facecolor": color, "edgecolor": "#444", "linewidth": 1.5},
+               medianprops={"color": "#121212", "linewidth": 2},
+               whiskerprops={"color": "#888", "linewidth": 1.5}, capprops={"color": "#888", "linewidth": 1.5})
+
+    ax.set_xticks(range(len(etiquetas)), etiquetas, rotation=45 if len(etiquetas) > 8 else 0,
+                  ha="right" if len(etiquetas) > 8 else "center")
+    ax.set_xlim(-0.6, len(etiquetas) - 0.4)
+    ax.legend(handles=[Patch(facecolor=c, label=p) for p, c in zip(parciales, colores)],
+              loc="lower center", bbox_to_anchor=(0.5, 1.0), ncol=len(parciales), frameon=False,
+              labelcolor='white')
+
+    ax.set_facecolor('#121212')
+    ax.tick_params(colors='white', labelsize=11)
+    ax.set_ylabel('Calificación', color='white', fontsize=13)
+    ax.set_xlabel(" · ".join(comparacion.columnas), color='white', fontsize=12)
+    for spine in ax.spines.values():
+        spine.set_color('white')
+    ax.yaxis.grid(True, linestyle='--', linewidth=0.7, color='gray', alpha=0.3)
+    ax.set_axisbelow(True)
+    fig.tight_layout()
+    return fig
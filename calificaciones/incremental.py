@@ -0,0 +1,436 @@
+# Ingesta incremental de capturas: archivos con filas nuevas o corregidas (P1, P2, ...) que
+# se aplican sobre el Excel base sin volver a parsearlo ni recalcular todos los grupos.
+#   python -m calificaciones.incremental      -> aplica las capturas pendientes y muestra el resumen
+#
+# Por cada (grupo, parcial) se guardan acumuladores que se pueden sumar y restar:
+#   - total, suma y suma de cuadrados (en décimas, enteros exactos) -> conteo, media y varianza
+#   - histograma exacto sobre el dominio discreto de calificaciones (0.0, 0.1, ..., 10.0)
+#     -> mediana, cuartiles, moda, mínimo y máximo
+# Una corrección resta el valor anterior y suma el nuevo, así que actualizar cuesta lo
+# proporcional a la captura y no al archivo completo (más copiar los arreglos de resúmenes:
+# cada versión del estado es inmutable, porque otras sesiones y los memos la siguen leyendo).
+#
+# Las capturas solo aceptan calificaciones del dominio. El Excel base se toma como viene: lo
+# que trae fuera del dominio (7.25, 11...) se guarda aparte, tal cual, y entra exacto en las
+# estadísticas y en "Fuera de rango" en lugar de tumbar la carga.
+import glob
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from calificaciones.carga import RUTA_EXCEL, cargar_calificaciones, descubrir_parciales
+from calificaciones.esquema import TIPO_CALIFICACION, a_decimal, categorizar
+from calificaciones.estadisticas import MEDIDAS, cuantil
+from calificaciones.indice import COLUMNA_ALUMNO, COLUMNAS_CLAVE, filas_prefijo
+from calificaciones.rangos import asignar_rangos
+
+# Una fila de calificaciones se identifica por su grupo y el número de control del alumno
+COLUMNAS_FILA = COLUMNAS_CLAVE + [COLUMNA_ALUMNO]
+
+# Dominio de calificaciones: de 0 a MAXIMO en pasos de 1/PASOS (décimas)
+PASOS = 10
+MAXIMO = 10
+
+# posicion:  (semestre, carrera, grupo, asignatura) -> primer índice de los arreglos
+# histograma (grupos, parciales, casillas), total/suma/suma_cuadrados (grupos, parciales)
+# revision:  cuántas veces ha cambiado cada grupo (sirve de versión para cachés por grupo)
+# fuera:     {(grupo, parcial): calificaciones ordenadas} del Excel base que no caben en el
+#            histograma; no cuentan en total, suma ni suma_cuadrados
+Acumuladores = namedtuple("Acumuladores", ["parciales", "pasos", "maximo", "posicion", "histograma",
+                                           "total", "suma", "suma_cuadrados", "revision", "fuera"])
+
+# df:        filas base con las columnas de la clave (sin los parciales)
+# valores:   calificación vigente de cada fila y parcial (filas, parciales); NaN = sin capturar
+# filas:     (semestre, carrera, grupo, asignatura, número de control) -> fila de df/valores
+# version:   (versión del Excel, capturas aplicadas) para memoizar lo que dependa de los datos
+# aplicadas: versión de cada captura ya aplicada, en orden
+Estado = namedtuple("Estado", ["df", "valores", "filas", "acumuladores", "version", "aplicadas"])
+
+
+def _casillas(valores, pasos, maximo):
+    # 7.3 -> 73, y cuáles no caen exacto en el dominio (esas no se redondean a ninguna casilla)
+    escalados = a_decimal(valores) * pasos
+    casillas = np.rint(escalados)
+    fuera = ~(np.abs(escalados - casillas) <= 1e-6) | (casillas < 0) | (casillas > maximo * pasos)
+    return np.where(fuera, 0, casillas).astype(np.int64), fuera
+
+
+def _a_casillas(valores, pasos, maximo):
+    # En una captura, lo que no cae exacto en el dominio es un error de captura
+    casillas, fuera = _casillas(valores, pasos, maximo)
+    if fuera.any():
+        raise ValueError(f"Calificaciones fuera del dominio 0-{maximo} en pasos de {1 / pasos:g}: "
+                         f"{np.asarray(valores)[fuera][:5].tolist()}")
+    return casillas
+
+
+def _agrupar_fuera(celdas, valores, n_parciales):
+    # {(grupo, parcial): calificaciones ordenadas} a partir de la celda de cada calificación
+    orden = np.lexsort((valores, celdas))
+    fuera = {}
+    for celda, valor in zip(celdas[orden].tolist(), valores[orden]):
+        fuera.setdefault(divmod(celda, n_parciales), []).append(valor)
+    return {llave: np.array(lista) for llave, lista in fuera.items()}
+
+
+def _retirar_fuera(fuera, grupos, parcial, valores):
+    # Copia de fuera sin una aparición de cada valor (lo corrigió una captura)
+    fuera = dict(fuera)
+    for g, valor in zip(grupos.tolist(), valores):
+        actuales = fuera[(g, parcial)]
+        restantes = np.delete(actuales, np.flatnonzero(actuales == valor)[0])
+        if len(restantes):
+            fuera[(g, parcial)] = restantes
+        else:
+            del fuera[(g, parcial)]
+    return fuera
+
+
+def construir_acumuladores(df, parciales, pasos=PASOS, maximo=MAXIMO):
+    # Un solo bincount para todos los grupos y parciales
+    agrupado = df.groupby(COLUMNAS_CLAVE, sort=True)
+    codigos = agrupado.ngroup().to_numpy()
+    claves = agrupado.size().index
+    n_grupos, n_parciales, n_casillas = len(claves), len(parciales), maximo * pasos + 1
+
+    valores = a_decimal(df[parciales].to_numpy())
+    validos = (codigos[:, None] >= 0) & ~np.isnan(valores)
+    celdas = (codigos[:, None] * n_parciales + np.arange(n_parciales))[validos]
+    casillas, fuera = _casillas(valores[validos], pasos, maximo)
+    indices = celdas[~fuera] * n_casillas + casillas[~fuera]
+
+    histograma = np.bincount(indices, minlength=n_grupos * n_parciales * n_casillas)
+    histograma = histograma.reshape(n_grupos, n_parciales, n_casillas).astype(np.int64)
+    casillas = np.arange(n_casillas, dtype=np.int64)
+    return Acumuladores(
+        list(parciales), pasos, maximo,
+        {clave: i for i, clave in enumerate(claves)},
+        histograma,
+        histograma.sum(axis=2),
+        histograma @ casillas,
+        histograma @ (casillas * casillas),
+        np.zeros(n_grupos, dtype=np.int64),
+        _agrupar_fuera(celdas[fuera], valores[validos][fuera], n_parciales),
+    )
+
+
+def _agregar_grupos(acumuladores, claves):
+    # Grupos que aparecen por primera vez en una captura (raro: solo altas de grupos)
+    nuevas = [clave for clave in dict.fromkeys(claves) if clave not in acumuladores.posicion]
+    if not nuevas:
+        return acumuladores
+    n = len(nuevas)
+    posicion = dict(acumuladores.posicion)
+    for clave in nuevas:
+        posicion[clave] = len(posicion)
+
+    def crecer(arreglo):
+        return np.concatenate([arreglo, np.zeros((n,) + arreglo.shape[1:], dtype=arreglo.dtype)])
+
+    return acumuladores._replace(
+        posicion=posicion,
+        histograma=crecer(acumuladores.histograma),
+        total=crecer(acumuladores.total),
+        suma=crecer(acumuladores.suma),
+        suma_cuadrados=crecer(acumuladores.suma_cuadrados),
+        revision=crecer(acumuladores.revision),
+    )
+
+
+def _acumular(acumuladores, grupos, parcial, valores, signo):
+    # Suma (signo=+1) o retira (signo=-1) calificaciones de los acumuladores, en su lugar: solo
+    # se llama sobre la copia que arma aplicar_captura.
+    # Solo al retirar puede haber valores fuera del dominio (los del Excel base): salen de fuera
+    casillas, fuera = _casillas(valores, acumuladores.pasos, acumuladores.maximo)
+    if fuera.any():
+        acumuladores = acumuladores._replace(
+            fuera=_retirar_fuera(acumuladores.fuera, grupos[fuera], parcial, a_decimal(valores[fuera])))
+        grupos, casillas = grupos[~fuera], casillas[~fuera]
+    np.add.at(acumuladores.histograma, (grupos, parcial, casillas), signo)
+    np.add.at(acumuladores.total, (grupos, parcial), signo)
+    np.add.at(acumuladores.suma, (grupos, parcial), signo * casillas)
+    np.add.at(acumuladores.suma_cuadrados, (grupos, parcial), signo * casillas * casillas)
+    return acumuladores
+
+
+def estado_inicial(df, version, parciales):
+    # Punto de partida: el Excel completo, una sola vez por versión del archivo
+    acumuladores = construir_acumuladores(df, parciales)
+    base = df.drop(columns=parciales).reset_index(drop=True)
+    filas = {fila: i for i, fila in enumerate(zip(*(base[c] for c in COLUMNAS_FILA)))}
+    valores = df[parciales].to_numpy(dtype=TIPO_CALIFICACION, copy=True)
+    return Estado(base, valores, filas, acumuladores, (version, ()), ())
+
+
+def aplicar_captura(estado, captura, version_captura=None):
+    # Aplica una captura (DataFrame con las columnas de la fila y algunos parciales) y regresa
+    # el estado nuevo y un resumen. Un NaN en la captura significa "sin cambio".
+    inicio = time.perf_counter()
+    acumuladores = estado.acumuladores
+    faltan = [c for c in COLUMNAS_FILA if c not in captura.columns]
+    if faltan:
+        raise ValueError(f"A la captura le faltan columnas: {', '.join(faltan)}")
+    parciales = [p for p in acumuladores.parciales if p in captura.columns]
+
+    # Mismos tipos que el archivo base para que las claves coincidan (Semestre 2 y no "2"); las
+    # claves categóricas pasan por el diccionario compartido, que agrega los valores nuevos
+    categoricas = [c for c in COLUMNAS_FILA if isinstance(estado.df[c].dtype, pd.CategoricalDtype)]
+    captura = captura.astype({c: estado.df[c].dtype for c in COLUMNAS_FILA if c not in categoricas})
+    for columna in categoricas:
+        captura[columna] = categorizar(captura[columna], columna)
+    captura = captura.drop_duplicates(subset=COLUMNAS_FILA, keep="last").reset_index(drop=True)
+    claves_fila = list(zip(*(captura[c] for c in COLUMNAS_FILA)))
+    posiciones = np.array([estado.filas.get(fila, -1) for fila in claves_fila], dtype=np.int64)
+
+    # Todas las calificaciones se validan antes de copiar nada: una captura con un error no
+    # cuesta más que leerla
+    capturados = {}
+    for parcial in parciales:
+        capturados[parcial] = captura[parcial].to_numpy(dtype=estado.valores.dtype)
+        _a_casillas(capturados[parcial][~np.isnan(capturados[parcial])], acumuladores.pasos, acumuladores.maximo)
+
+    # Copia al escribir: el estado anterior no se toca, sigue siendo válido para quien lo tenga
+    # (otra sesión a media lectura, los memos de su versión)
+    acumuladores = acumuladores._replace(
+        histograma=acumuladores.histograma.copy(),
+        total=acumuladores.total.copy(),
+        suma=acumuladores.suma.copy(),
+        suma_cuadrados=acumuladores.suma_cuadrados.copy(),
+        revision=acumuladores.revision.copy(),
+    )
+    valores = estado.valores.copy()
+
+    # Altas: filas que no existían; se agregan al final con todos los parciales vacíos
+    df, filas = estado.df, estado.filas
+    altas = np.flatnonzero(posiciones < 0)
+    if len(altas):
+        nuevas = captura.iloc[altas].reindex(columns=df.columns)
+        # Mismo diccionario de los dos lados (si no, concat regresa cadenas); como el
+        # diccionario solo crece, los códigos de las filas viejas no cambian
+        tipos = {c: captura[c].dtype for c in categoricas}
+        df = pd.concat([df.astype(tipos), nuevas.astype(tipos)], ignore_index=True)
+        valores = np.vstack([valores, np.full((len(altas), valores.shape[1]), np.nan, dtype=valores.dtype)])
+        filas = dict(filas)
+        for fila, posicion in zip((claves_fila[i] for i in altas), range(len(estado.df), len(df))):
+            filas[fila] = posicion
+        posiciones[altas] = np.arange(len(estado.df), len(df))
+
+    acumuladores = _agregar_grupos(acumuladores, [fila[:len(COLUMNAS_CLAVE)] for fila in claves_fila])
+    grupos = np.array([acumuladores.posicion[fila[:len(COLUMNAS_CLAVE)]] for fila in claves_fila], dtype=np.int64)
+
+    correcciones = capturadas = 0
+    tocados = np.zeros(len(captura), dtype=bool)
+    for parcial in parciales:
+        j = acumuladores.parciales.index(parcial)
+        nuevos = capturados[parcial]
+        anteriores = valores[posiciones, j]
+        cambia = ~np.isnan(nuevos) & (anteriores != nuevos)  # NaN != x también cuenta como cambio
+        retirar = cambia & ~np.isnan(anteriores)
+
+        acumuladores = _acumular(acumuladores, grupos[retirar], j, anteriores[retirar], -1)
+        acumuladores = _acumular(acumuladores, grupos[cambia], j, nuevos[cambia], +1)
+        valores[posiciones[cambia], j] = nuevos[cambia]
+
+        correcciones += int(retirar.sum())
+        capturadas += int((cambia & ~retirar).sum())
+        tocados |= cambia
+
+    np.add.at(acumuladores.revision, np.unique(grupos[tocados]), 1)
+
+    aplicadas = estado.aplicadas + ((version_captura,) if version_captura is not None else ())
+    nuevo = Estado(df, valores, filas, acumuladores, (estado.version[0], aplicadas), aplicadas)
+    resumen = {
+        "filas": len(captura),
+        "altas": int(len(altas)),
+        "capturadas": capturadas,
+        "correcciones": correcciones,
+        "grupos_tocados": int(len(np.unique(grupos[tocados]))),
+        "segundos": time.perf_counter() - inicio,
+    }
+    return nuevo, resumen
+
+
+def distribucion(histograma, fuera, pasos=PASOS):
+    # (valores, cuántas calificaciones tiene cada uno), ordenados por valor: las casillas de un
+    # histograma más, si las hay, las calificaciones fuera del dominio
+    dominio = np.arange(len(histograma)) / pasos
+    if fuera is None or len(fuera) == 0:
+        return dominio, histograma
+    unicos, cuantos = np.unique(fuera, return_counts=True)
+    valores = np.concatenate([dominio, unicos])
+    orden = np.argsort(valores, kind="stable")
+    return valores[orden], np.concatenate([histograma, cuantos])[orden]
+
+
+def estadisticas_acumuladas(acumuladores, clave):
+    # estadisticas_dict del grupo ({parcial: {medida: valor}}) leído de sus acumuladores; los
+    # parciales sin calificaciones no aparecen
+    g = acumuladores.posicion.get(tuple(clave))
+    if g is None:
+        return {}
+    pasos = acumuladores.pasos
+    estadisticas_dict = {}
+    for j, parcial in enumerate(acumuladores.parciales):
+        fuera = acumuladores.fuera.get((g, j), ())
+        n = int(acumuladores.total[g, j]) + len(fuera)
+        if n == 0:
+            continue
+        valores, pesos = distribucion(acumuladores.histograma[g, j], fuera, pasos)
+        acumulado = np.cumsum(pesos)
+        s, ss = int(acumuladores.suma[g, j]), int(acumuladores.suma_cuadrados[g, j])
+        if len(fuera) == 0:
+            media = s / n / pasos
+            # Varianza muestral con enteros exactos: (n·Σx² − (Σx)²) / (n(n−1))
+            varianza = (n * ss - s * s) / (n * (n - 1)) / (pasos * pasos) if n > 1 else np.nan
+        else:
+            # Con calificaciones fuera del dominio las sumas en décimas ya no alcanzan
+            media = float(valores @ pesos) / n
+            varianza = float(pesos @ (valores - media) ** 2) / (n - 1) if n > 1 else np.nan
+        ocupadas = np.flatnonzero(pesos)
+        minimo, maximo = valores[ocupadas[0]], valores[ocupadas[-1]]
+        q1, q2, q3 = (float(cuantil(acumulado, valores, q)) for q in (0.25, 0.50, 0.75))
+        medidas = {
+            "media": media,
+            "varianza": varianza,
+            "mediana": q2,
+            "moda": valores[np.argmax(pesos)],  # en empate, el valor más chico
+            "q1": q1,
+            "q2": q2,
+            "q3": q3,
+            "max": maximo,
+            "min": minimo,
+            "rango": maximo - minimo,
+            "total": n,
+        }
+        estadisticas_dict[parcial] = {medida: medidas[medida] for medida in MEDIDAS}
+    return estadisticas_dict
+
+
+def conteos_acumulados(acumuladores, clave, rangos):
+    # {parcial: conteo por rango} del grupo, sumando las casillas del histograma (y las
+    # calificaciones fuera del dominio, que suelen caer en "Fuera de rango"); None para los
+    # parciales sin calificaciones
+    g = acumuladores.posicion.get(tuple(clave))
+    dominio = np.arange(acumuladores.histograma.shape[2]) / acumuladores.pasos
+    rango_de_casilla = asignar_rangos(dominio, rangos.bordes)
+    resultado = {}
+    for j, parcial in enumerate(acumuladores.parciales):
+        fuera = acumuladores.fuera.get((g, j), ()) if g is not None else ()
+        if g is None or acumuladores.total[g, j] + len(fuera) == 0:
+            resultado[parcial] = None
+            continue
+        conteo = np.bincount(rango_de_casilla, weights=acumuladores.histograma[g, j],
+                             minlength=len(rangos.etiquetas)).astype(np.int64)
+        if len(fuera):
+            conteo += np.bincount(asignar_rangos(fuera, rangos.bordes), minlength=len(rangos.etiquetas))
+        resultado[parcial] = conteo
+    return resultado
+
+
+def revision_grupo(acumuladores, clave):
+    g = acumuladores.posicion.get(tuple(clave))
+    return int(acumuladores.revision[g]) if g is not None else 0
+
+
+def filas_actuales(estado, indice, clave):
+    # Filas del grupo (o de todo un nivel, si clave es un prefijo) con sus calificaciones
+    # vigentes (las de las capturas ya aplicadas)
+    posiciones = filas_prefijo(indice, clave)
+    grupo_df = estado.df.take(posiciones)
+    valores = estado.valores[posiciones]
+    for j, parcial in enumerate(estado.acumuladores.parciales):
+        grupo_df[parcial] = valores[:, j]
+    return grupo_df
+
+
+# ------------------ Capturas en disco -------------------
+# Las capturas se dejan en una carpeta junto al Excel ("<archivo>.capturas/") como .xlsx o
+# .csv con las mismas columnas que el archivo base; se aplican en orden de nombre.
+
+def carpeta_capturas(ruta_excel):
+    return os.environ.get("CALIFICACIONES_CAPTURAS") or os.path.splitext(ruta_excel)[0] + ".capturas"
+
+
+def leer_captura(ruta):
+    if ruta.lower().endswith(".csv"):
+        return pd.read_csv(ruta)
+    return pd.read_excel(ruta)
+
+
+def _capturas_en_disco(carpeta):
+    rutas = sorted(glob.glob(os.path.join(carpeta, "*.xlsx")) + glob.glob(os.path.join(carpeta, "*.csv")))
+    versiones = []
+    for ruta in rutas:
+        info = os.stat(ruta)
+        versiones.append((os.path.basename(ruta), info.st_mtime_ns, info.st_size))
+    return rutas, versiones
+
+
+# Estado vigente por archivo base, compartido entre sesiones como el caché de carga
+_estados = {}                      # ruta absoluta -> Estado
+_errores = {}                      # ruta absoluta -> (captura, mensaje) de la que no se pudo aplicar
+_candado = threading.Lock()
+_metricas = {"capturas_aplicadas": 0, "reconstrucciones": 0, "segundos_ultima_captura": 0.0}
+
+
+def estado_incremental(ruta_excel=RUTA_EXCEL):
+    # Estado con todas las capturas de la carpeta aplicadas. Solo se aplican las nuevas; si el
+    # Excel cambió o una captura ya aplicada se modificó o borró, se reconstruye desde el Excel.
+    carga = cargar_calificaciones(ruta_excel)
+    rutas, versiones = _capturas_en_disco(carpeta_capturas(ruta_excel))
+
+    with _candado:
+        estado = _estados.get(carga.version[0])
+        vigente = (estado is not None and estado.version[0] == carga.version
+                   and tuple(versiones[:len(estado.aplicadas)]) == estado.aplicadas)
+        if not vigente:
+            estado = estado_inicial(carga.df, carga.version, descubrir_parciales(carga.df.columns))
+            _metricas["reconstrucciones"] += 1
+
+        _estados[carga.version[0]] = estado
+        # Cada captura aplicada queda guardada en el acto; si una falla (columnas que faltan,
+        # una calificación fuera del dominio...) se detiene ahí, sin aplicar las siguientes,
+        # y no se vuelve a leer hasta que el archivo cambie. La app muestra el error
+        fallida = _errores.pop(carga.version[0], None)
+        for ruta, version in list(zip(rutas, versiones))[len(estado.aplicadas):]:
+            if fallida is not None and fallida[2] == version:
+                _errores[carga.version[0]] = fallida
+                break
+            try:
+                estado, resumen = aplicar_captura(estado, leer_captura(ruta), version)
+            except Exception as error:
+                _errores[carga.version[0]] = (os.path.basename(ruta), str(error), version)
+                break
+            _estados[carga.version[0]] = estado
+            _metricas["capturas_aplicadas"] += 1
+            _metricas["segundos_ultima_captura"] = resumen["segundos"]
+        return estado
+
+
+def error_captura(ruta_excel=RUTA_EXCEL):
+    # (archivo, mensaje) de la captura que no se pudo aplicar en la última actualización, o None
+    with _candado:
+        fallida = _errores.get(os.path.abspath(ruta_excel))
+    return fallida[:2] if fallida is not None else None
+
+
+def metricas_incremental():
+    with _candado:
+        return dict(_metricas)
+
+
+if __name__ == "__main__":
+    ruta = sys.argv[1] if len(sys.argv) > 1 else RUTA_EXCEL
+    carga = cargar_calificaciones(ruta)
+    estado = estado_inicial(carga.df, carga.version, descubrir_parciales(carga.df.columns))
+    rutas, versiones = _capturas_en_disco(carpeta_capturas(ruta))
+    for ruta_captura, version in zip(rutas, versiones):
+        estado, resumen = aplicar_captura(estado, leer_captura(ruta_captura), version)
+        print(f"{os.path.basename(ruta_captura)}: {resumen}")
+    if not rutas:
+        print(f"No hay capturas en {carpeta_capturas(ruta)}")
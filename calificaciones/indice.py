@@ -0,0 +1,72 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Orden de la cascada de filtros del sidebar
+COLUMNAS_CLAVE = ["Semestre", "Carrera", "Grupo", "Asignatura"]
+
+# Identifica al alumno dentro de un grupo (las capturas incrementales lo usan para corregir filas)
+COLUMNA_ALUMNO = "Número de control"
+
+# opciones: prefijo de la cascada (tupla) -> lista ordenada de valores del siguiente nivel
+#           ()                          -> semestres
+#           (semestre,)                 -> carreras
+#           (semestre, carrera)         -> grupos
+#           (semestre, carrera, grupo)  -> asignaturas
+# filas:    (semestre, carrera, grupo, asignatura) -> posiciones de fila en el DataFrame
+Indice = namedtuple("Indice", ["opciones", "filas"])
+
+
+def _filas_por_codigos(df):
+    # Con las claves categóricas (esquema.py) se agrupa solo con enteros: los 4 códigos de
+    # cada fila se combinan en uno y un ordenamiento estable junta las filas de cada grupo.
+    # Las cadenas se tocan una vez por grupo, no una vez por fila
+    codigos = [df[c].cat.codes.to_numpy().astype(np.int64) for c in COLUMNAS_CLAVE]
+    categorias = [df[c].cat.categories for c in COLUMNAS_CLAVE]
+    combinado = np.zeros(len(df), dtype=np.int64)
+    for codigo, lista in zip(codigos, categorias):
+        combinado = combinado * len(lista) + codigo
+    validas = np.flatnonzero(np.all([codigo >= 0 for codigo in codigos], axis=0))
+    orden = validas[np.argsort(combinado[validas], kind="stable")]
+    cortes = np.flatnonzero(np.diff(combinado[orden])) + 1
+    filas = {}
+    for posiciones in np.split(orden, cortes) if len(orden) else []:
+        primera = posiciones[0]
+        clave = tuple(lista[codigo[primera]] for codigo, lista in zip(codigos, categorias))
+        filas[tuple(v.item() if isinstance(v, np.generic) else v for v in clave)] = posiciones
+    return filas
+
+
+def construir_indice(df):
+    # Un solo agrupamiento sobre las 4 columnas; las filas con algún valor vacío se descartan
+    # igual que hacía el dropna() de cada selectbox
+    if all(isinstance(df[c].dtype, pd.CategoricalDtype) for c in COLUMNAS_CLAVE):
+        filas = _filas_por_codigos(df)
+    else:
+        filas = df.groupby(COLUMNAS_CLAVE, sort=False).indices
+    claves = sorted(filas)
+
+    opciones = {}
+    for clave in claves:
+        # Como las claves van ordenadas, los valores repetidos de cada nivel quedan juntos
+        for nivel in range(len(COLUMNAS_CLAVE)):
+            lista = opciones.setdefault(clave[:nivel], [])
+            if not lista or lista[-1] != clave[nivel]:
+                lista.append(clave[nivel])
+
+    return Indice(opciones, {clave: np.asarray(pos) for clave, pos in filas.items()})
+
+
+def opciones(indice, *prefijo):
+    return indice.opciones.get(tuple(prefijo), [])
+
+
+def filas_prefijo(indice, prefijo):
+    # Posiciones de las filas de todos los grupos que empiezan con prefijo (plantel = prefijo
+    # vacío), en el orden del DataFrame
+    prefijo = tuple(prefijo)
+    if len(prefijo) == len(COLUMNAS_CLAVE):
+        return indice.filas.get(prefijo, np.empty(0, dtype=np.int64))
+    partes = [pos for clave, pos in indice.filas.items() if clave[:len(prefijo)] == prefijo]
+    return np.sort(np.concatenate(partes)) if partes else np.empty(0, dtype=np.int64)
@@ -0,0 +1,136 @@
+# Generación de todos los reportes PDF (uno por grupo y asignatura) sin Streamlit, con las
+# capturas ya aplicadas igual que en la app:
+#   python -m calificaciones.lote --salida reportes/ --procesos 8
+import argparse
+import os
+import re
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+os.environ.setdefault("MPLBACKEND", "Agg")  # Sin pantalla: matplotlib solo renderiza a archivos
+
+from calificaciones.carga import RUTA_EXCEL
+from calificaciones.incremental import filas_actuales
+from calificaciones.nucleo import abrir, analizar
+from calificaciones.rangos import datos_pastel, definir_rangos
+
+# Estado de cada proceso trabajador: se carga una vez en el inicializador y no viaja en cada tarea
+_datos = _rangos = None
+
+
+def nombre_reporte(clave):
+    # Nombre determinista y seguro para el sistema de archivos:
+    # (2, "Diseño Gráfico Digital", "A", "Ciencias Sociales II") -> "2_Diseno-Grafico-Digital_A_Ciencias-Sociales-II.pdf"
+    partes = []
+    for valor in clave:
+        texto = unicodedata.normalize("NFKD", str(valor)).encode("ascii", "ignore").decode("ascii")
+        partes.append(re.sub(r"[^A-Za-z0-9]+", "-", texto).strip("-"))
+    return "_".join(partes) + ".pdf"
+
+
+def _iniciar_trabajador(ruta_excel):
+    # Los mismos datos que ve la app: el libro con las capturas ya aplicadas
+    global _datos, _rangos
+    _datos = abrir(ruta_excel)
+    _rangos = definir_rangos()
+
+
+def generar_reporte_grupo(datos, clave, ruta_pdf, rangos):
+    # Arma exactamente lo mismo que el botón de la app para un grupo y lo escribe en ruta_pdf
+    from calificaciones.graficas import figura_boxplot, figura_histograma, figura_pastel, renderizar
+    from calificaciones.reporte import generar_pdf
+
+    semestre, carrera, grupo, asignatura = clave
+    parciales = datos.parciales
+    grupo_df = filas_actuales(datos.estado, datos.indice, clave)
+    analisis = analizar(datos, clave, rangos)
+    conteos_dict = analisis.conteos
+
+    pies = [datos_pastel(conteo, rangos) if conteo is not None else ([], [], [])
+            for conteo in conteos_dict.values()]
+
+    imagenes = [renderizar(lambda: figura_histograma(conteos_dict, rangos)),
+                renderizar(lambda: figura_pastel(conteos_dict, rangos)),
+                renderizar(lambda: figura_boxplot(grupo_df, parciales))]
+
+    pdf_bytes = generar_pdf(
+        estadisticas_dict=analisis.estadisticas,
+        carrera=carrera,
+        grupo=grupo,
+        asignatura=asignatura,
+        semestre=semestre,
+        imagenes=[imagen for imagen in imagenes if imagen is not None],
+        colores_pies=[pie[0] for pie in pies],
+        etiquetas_pies=[pie[1] for pie in pies],
+        porcentajes_pies=[pie[2] for pie in pies],
+    )
+    with open(ruta_pdf, "wb") as archivo:
+        archivo.write(pdf_bytes)
+    return ruta_pdf
+
+
+def _tarea(clave, carpeta):
+    inicio = time.perf_counter()
+    ruta_pdf = os.path.join(carpeta, nombre_reporte(clave))
+    try:
+        generar_reporte_grupo(_datos, clave, ruta_pdf, _rangos)
+        return clave, ruta_pdf, time.perf_counter() - inicio, None
+    except Exception as error:  # Un grupo con problemas no debe tumbar todo el lote
+        return clave, ruta_pdf, time.perf_counter() - inicio, f"{type(error).__name__}: {error}"
+
+
+def generar_lote(ruta_excel=RUTA_EXCEL, carpeta="reportes", procesos=None, filtro=None):
+    os.makedirs(carpeta, exist_ok=True)
+
+    # Las claves se sacan en el proceso principal; los trabajadores cargan sus propios datos
+    # (desde el sidecar Parquet si existe, más las capturas) para no mandar el DataFrame en
+    # cada tarea
+    indice = abrir(ruta_excel).indice
+    claves = [clave for clave in sorted(indice.filas) if filtro is None or filtro(clave)]
+
+    inicio = time.perf_counter()
+    generados, fallidos = [], []
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador, initargs=(ruta_excel,)) as pool:
+        futuros = [pool.submit(_tarea, clave, carpeta) for clave in claves]
+        for futuro in as_completed(futuros):
+            clave, ruta_pdf, segundos, error = futuro.result()
+            if error is None:
+                generados.append(ruta_pdf)
+            else:
+                fallidos.append((clave, error))
+    segundos = time.perf_counter() - inicio
+
+    return {
+        "reportes": len(generados),
+        "fallidos": fallidos,
+        "segundos": segundos,
+        "reportes_por_segundo": len(generados) / segundos if segundos > 0 else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera el reporte PDF de cada grupo y asignatura")
+    parser.add_argument("--excel", default=RUTA_EXCEL, help="Archivo de calificaciones")
+    parser.add_argument("--salida", default="reportes", help="Carpeta donde se escriben los PDF")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos en paralelo (por defecto, uno por núcleo)")
+    parser.add_argument("--semestre", help="Solo este semestre")
+    parser.add_argument("--carrera", help="Solo esta carrera")
+    args = parser.parse_args(argv)
+
+    def filtro(clave):
+        semestre, carrera, _, _ = clave
+        return (args.semestre is None or str(semestre) == args.semestre) and \
+               (args.carrera is None or carrera == args.carrera)
+
+    resumen = generar_lote(args.excel, args.salida, args.procesos, filtro)
+    print(f"{resumen['reportes']} reportes en {resumen['segundos']:.1f} s "
+          f"({resumen['reportes_por_segundo']:.2f} reportes/s) -> {args.salida}")
+    for clave, error in resumen["fallidos"]:
+        print(f"❌ {clave}: {error}", file=sys.stderr)
+    return 1 if resumen["fallidos"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
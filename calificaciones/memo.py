@@ -0,0 +1,30 @@
+import threading
+
+# Memoización por versión de datos: cada estructura derivada (índices, niveles, trayectorias...)
+# se construye una vez por versión y se comparte entre sesiones del mismo proceso.
+# Solo se guarda la versión más reciente de cada nombre, así la vieja se libera sola.
+_memo = {}                 # nombre -> (version, valor)
+_candados = {}             # nombre -> Lock
+_candado_global = threading.Lock()
+_metricas = {"aciertos": 0, "fallos": 0}
+
+
+def memo_por_version(nombre, version, fabricar):
+    with _candado_global:
+        candado = _candados.setdefault(nombre, threading.Lock())
+    with candado:
+        guardado = _memo.get(nombre)
+        if guardado is not None and guardado[0] == version:
+            with _candado_global:
+                _metricas["aciertos"] += 1
+            return guardado[1]
+        valor = fabricar()
+        _memo[nombre] = (version, valor)
+    with _candado_global:
+        _metricas["fallos"] += 1
+    return valor
+
+
+def metricas_memo():
+    with _candado_global:
+        return dict(_metricas, estructuras=len(_memo))
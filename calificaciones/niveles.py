@@ -0,0 +1,119 @@
+# Estadísticas por nivel de la cascada (carrera, semestre o plantel completo) fusionando los
+# resúmenes de cada grupo: histogramas de conteos, sumas y sumas de cuadrados se suman, así
+# que el resultado es exacto sin volver a recorrer las filas.
+from collections import namedtuple
+
+import numpy as np
+
+from calificaciones.estadisticas import cajas
+from calificaciones.incremental import distribucion
+from calificaciones.indice import COLUMNAS_CLAVE
+
+# Nivel -> cuántas columnas de la cascada quedan fijas (las demás se juntan)
+NIVELES = {"grupo": 4, "carrera": 2, "semestre": 1, "plantel": 0}
+
+# Comparación de cada nivel: (posiciones de la clave que se fijan, posiciones que separan
+# una caja de otra). En grupo se compara la asignatura en todos sus grupos del semestre; en
+# carrera, sus grupos; en semestre, sus carreras; en el plantel, sus semestres
+COMPARACIONES = {
+    "grupo": ((0, 3), (1, 2)),
+    "carrera": ((0, 1), (2,)),
+    "semestre": ((0,), (1,)),
+    "plantel": ((), (0,)),
+}
+
+# fijas:     {columna: valor} de lo que tienen en común las cajas
+# columnas:  columnas de la cascada que distinguen una caja de otra
+# etiquetas: nombre de cada caja (solo con las columnas que cambian entre cajas)
+# cajas:     medida -> (cajas, parciales) con cuartiles, bigotes, total y atípicos
+Comparacion = namedtuple("Comparacion", ["nivel", "fijas", "columnas", "etiquetas", "parciales", "cajas"])
+
+
+def clave_nivel(clave_grupo, nivel):
+    # (2, "Diseño...", "A", "Inglés II") en nivel "carrera" -> (2, "Diseño...")
+    return tuple(clave_grupo[:NIVELES[nivel]])
+
+
+def grupos_de(acumuladores, prefijo):
+    # Índices de los grupos cuya clave empieza con prefijo (plantel = prefijo vacío)
+    largo = len(prefijo)
+    return np.array([g for clave, g in acumuladores.posicion.items() if clave[:largo] == prefijo], dtype=np.int64)
+
+
+def _juntar_fuera(fuera, grupos, caja_de=None):
+    # Las calificaciones fuera del dominio de grupos, juntas por caja (todas en la 0 si no se
+    # da caja_de): {(caja, parcial): calificaciones ordenadas}
+    caja = dict(zip(grupos.tolist(), [0] * len(grupos) if caja_de is None else caja_de.tolist()))
+    partes = {}
+    for (g, j), valores in fuera.items():
+        if g in caja:
+            partes.setdefault((caja[g], j), []).append(valores)
+    return {llave: np.sort(np.concatenate(valores)) for llave, valores in partes.items()}
+
+
+def combinar(acumuladores, grupos, clave):
+    # Un solo "grupo" con la suma de los resúmenes de grupos; se lee con las mismas funciones
+    # que un grupo normal (estadisticas_acumuladas, conteos_acumulados, revision_grupo)
+    return acumuladores._replace(
+        posicion={tuple(clave): 0},
+        histograma=acumuladores.histograma[grupos].sum(axis=0, keepdims=True),
+        total=acumuladores.total[grupos].sum(axis=0, keepdims=True),
+        suma=acumuladores.suma[grupos].sum(axis=0, keepdims=True),
+        suma_cuadrados=acumuladores.suma_cuadrados[grupos].sum(axis=0, keepdims=True),
+        # Cambia si cambia cualquiera de los grupos: sirve de versión para el caché de imágenes
+        revision=acumuladores.revision[grupos].sum(keepdims=True),
+        fuera=_juntar_fuera(acumuladores.fuera, grupos),
+    )
+
+
+def acumuladores_nivel(acumuladores, prefijo):
+    prefijo = tuple(prefijo)
+    if len(prefijo) == len(COLUMNAS_CLAVE):
+        return acumuladores  # nivel grupo: los acumuladores de siempre
+    return combinar(acumuladores, grupos_de(acumuladores, prefijo), prefijo)
+
+
+def sumar(a, b):
+    # Fusiona dos acumuladores de un solo grupo con los mismos parciales (p. ej. el mismo
+    # plantel leído por partes); a puede ser None para empezar la suma
+    if a is None:
+        return b
+    return a._replace(
+        histograma=a.histograma + b.histograma,
+        total=a.total + b.total,
+        suma=a.suma + b.suma,
+        suma_cuadrados=a.suma_cuadrados + b.suma_cuadrados,
+        revision=a.revision + b.revision,
+        fuera={llave: np.sort(np.concatenate([a.fuera.get(llave, []), b.fuera.get(llave, [])]))
+               for llave in a.fuera.keys() | b.fuera.keys()},
+    )
+
+
+def comparar(acumuladores, clave_grupo, nivel):
+    # Una caja por grupo (o carrera, o semestre) de la selección, fusionando los histogramas
+    # de sus grupos; los cuartiles y bigotes salen de los histogramas, no de las filas
+    fijas, separan = COMPARACIONES[nivel]
+    fijo = tuple(clave_grupo[i] for i in fijas)
+    grupos_caja = {}
+    for clave, g in acumuladores.posicion.items():
+        if tuple(clave[i] for i in fijas) == fijo:
+            grupos_caja.setdefault(tuple(clave[i] for i in separan), []).append(g)
+    llaves = sorted(grupos_caja)
+    grupos = np.array([g for llave in llaves for g in grupos_caja[llave]], dtype=np.int64)
+    caja_de = np.repeat(np.arange(len(llaves)), [len(grupos_caja[llave]) for llave in llaves])
+    histograma = np.zeros((len(llaves),) + acumuladores.histograma.shape[1:], dtype=np.int64)
+    np.add.at(histograma, caja_de, acumuladores.histograma[grupos])
+    cajas_dict = cajas(histograma, np.arange(histograma.shape[-1]) / acumuladores.pasos)
+    # Las pocas cajas con calificaciones fuera del dominio se recalculan con ellas incluidas
+    for (caja, j), fuera in _juntar_fuera(acumuladores.fuera, grupos, caja_de).items():
+        dominio, pesos = distribucion(histograma[caja, j], fuera, acumuladores.pasos)
+        for medida, valor in cajas(pesos, dominio).items():
+            cajas_dict[medida][caja, j] = valor
+
+    # La carrera solo aparece en la etiqueta si la asignatura se da en más de una
+    variables = [k for k in range(len(separan)) if len(separan) == 1 or len({llave[k] for llave in llaves}) > 1]
+    variables = variables or [len(separan) - 1]
+    etiquetas = [" · ".join(str(llave[k]) for k in variables) for llave in llaves]
+    return Comparacion(nivel, {COLUMNAS_CLAVE[i]: valor for i, valor in zip(fijas, fijo)},
+                       [COLUMNAS_CLAVE[separan[k]] for k in variables], etiquetas, list(acumuladores.parciales),
+                       cajas_dict)
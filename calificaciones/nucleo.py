@@ -0,0 +1,63 @@
+# Núcleo de análisis para usar fuera de la app (scripts, línea de comandos, servicios):
+# cargar un libro, recorrer la cascada y leer estadísticas y conteos por rango de cualquier
+# grupo o nivel, sin Streamlit, matplotlib ni fpdf. La app usa estas mismas dos funciones.
+#
+#   datos = abrir("Calificaciones ... Plantel X.xlsx")
+#   analisis = analizar(datos, (2, "Programación", "A", "Inglés"))   # o un prefijo: (2,)
+#   analisis.estadisticas["P1"]["media"]
+#   trayectorias(datos).en_riesgo           # seguimiento por alumno (calificaciones.alumnos)
+#   comparacion(datos, clave, "grupo")      # cajas de la asignatura en todos sus grupos
+from collections import namedtuple
+
+from calificaciones.alumnos import trayectorias_estado
+from calificaciones.carga import RUTA_EXCEL, cargar_calificaciones, descubrir_parciales
+from calificaciones.incremental import conteos_acumulados, estadisticas_acumuladas, estado_incremental
+from calificaciones.indice import construir_indice
+from calificaciones.memo import memo_por_version
+from calificaciones.niveles import COMPARACIONES, acumuladores_nivel, comparar
+from calificaciones.rangos import definir_rangos
+
+# Un libro listo para consultar: su carga, parciales, estado incremental (capturas aplicadas)
+# e índice de la cascada
+Datos = namedtuple("Datos", ["ruta", "carga", "parciales", "estado", "indice"])
+
+# Resultado de un grupo o nivel: sus acumuladores, {parcial: medidas} y {parcial: conteo}
+Analisis = namedtuple("Analisis", ["clave", "acumuladores", "estadisticas", "conteos"])
+
+
+def abrir(ruta=RUTA_EXCEL):
+    # Todo sale de cachés por versión: volver a abrir el mismo libro sin cambios es casi gratis
+    carga = cargar_calificaciones(ruta)
+    parciales = descubrir_parciales(carga.df.columns)
+    estado = estado_incremental(ruta)
+    # El índice sigue a la versión del estado: cambia con el libro y con cada captura aplicada
+    indice = memo_por_version(("indice", ruta), estado.version,
+                              lambda: construir_indice(estado.df))
+    return Datos(ruta, carga, parciales, estado, indice)
+
+
+def analizar(datos, clave, rangos=None):
+    # clave: grupo completo (semestre, carrera, grupo, asignatura) o un prefijo de la cascada
+    # (carrera, semestre, plantel = ()); los acumuladores de un prefijo se fusionan una vez
+    # por versión de datos
+    clave = tuple(clave)
+    rangos = rangos if rangos is not None else definir_rangos()
+    acumuladores = memo_por_version(("nivel", datos.ruta, clave), datos.estado.version,
+                                    lambda: acumuladores_nivel(datos.estado.acumuladores, clave))
+    return Analisis(clave, acumuladores, estadisticas_acumuladas(acumuladores, clave),
+                    conteos_acumulados(acumuladores, clave, rangos))
+
+
+def trayectorias(datos):
+    # Arreglo alumno × asignatura × parcial del libro completo y sus indicadores por alumno;
+    # se arma una vez por versión de datos y cada grupo solo toma sus alumnos
+    return memo_por_version(("trayectorias", datos.ruta), datos.estado.version,
+                            lambda: trayectorias_estado(datos.estado))
+
+
+def comparacion(datos, clave_grupo, nivel):
+    # Cuartiles y bigotes de cada grupo (o carrera, o semestre) comparable con la selección;
+    # se guarda por lo que tienen en común (p. ej. semestre y asignatura), no por grupo
+    fijas = tuple(clave_grupo[i] for i in COMPARACIONES[nivel][0])
+    return memo_por_version(("comparacion", datos.ruta, nivel, fijas), datos.estado.version,
+                            lambda: comparar(datos.estado.acumuladores, clave_grupo, nivel))
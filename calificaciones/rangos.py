@@ -0,0 +1,46 @@
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from calificaciones.esquema import a_decimal
+
+# Rangos de calificación compartidos por el histograma, el pastel, sus tablas y el PDF.
+# Bordes explícitos: cada rango es [inicio, fin) salvo el último, que es [inicio, fin]
+# (así el 10 cae en 9-10). Lo que queda fuera de [mínimo, máximo] va a "Fuera de rango".
+Rangos = namedtuple("Rangos", ["bordes", "etiquetas", "colores"])
+
+FUERA_DE_RANGO = "Fuera de rango"
+COLOR_FUERA = '#888888'
+
+# Paleta neón original, de rojo (bajo) a verde brillante (alto)
+_PALETA = ['#ff073a', '#ff9f1c', '#ffe066', '#3cee54', '#00FF00']
+
+
+def definir_rangos(minimo=5, maximo=10, cantidad=None):
+    # cantidad=None toma CALIFICACIONES_NUM_RANGOS (por omisión 5: 5-6, 6-7, ..., 9-10)
+    if cantidad is None:
+        cantidad = int(os.environ.get("CALIFICACIONES_NUM_RANGOS", "5"))
+    bordes = np.linspace(minimo, maximo, cantidad + 1)
+    etiquetas = [f"{a:g}-{b:g}" for a, b in zip(bordes[:-1], bordes[1:])]
+    # Con 5 rangos salen exactamente los colores de siempre; con otra cantidad se reparte la paleta
+    colores = [_PALETA[i] for i in np.linspace(0, len(_PALETA) - 1, cantidad).round().astype(int)]
+    return Rangos(bordes, etiquetas + [FUERA_DE_RANGO], colores + [COLOR_FUERA])
+
+
+def asignar_rangos(valores, bordes):
+    # Índice de rango de cada valor; len(bordes) - 1 es "Fuera de rango"
+    valores = a_decimal(valores)
+    cantidad = len(bordes) - 1
+    indices = np.searchsorted(bordes, valores, side='right') - 1
+    indices[valores == bordes[-1]] = cantidad - 1  # el máximo entra en el último rango
+    indices[(valores < bordes[0]) | (valores > bordes[-1])] = cantidad
+    return indices
+
+
+def datos_pastel(conteo, rangos):
+    # Colores, etiquetas y porcentajes por rango para el pastel, su tabla y las leyendas del PDF.
+    # "Fuera de rango" solo aparece si tiene calificaciones.
+    visibles = [i for i in range(len(rangos.etiquetas)) if i < len(rangos.etiquetas) - 1 or conteo[i] > 0]
+    porcentajes = conteo[visibles] / conteo.sum() * 100
+    return [rangos.colores[i] for i in visibles], [rangos.etiquetas[i] for i in visibles], porcentajes
@@ -0,0 +1,156 @@
+import io                    # Buffers en memoria para pasar las imágenes al PDF sin tocar disco
+
+# fpdf2 (y PIL, que él usa para las imágenes) se importa hasta que se pide un PDF
+
+
+#--------------Creación del PDF sin errores de emoji----------------
+# imagenes: lista de graficas.Imagen (PNG ya renderizado + dimensiones) en el orden
+# histograma, pastel, boxplot. Regresa el PDF como bytes, sin archivos temporales.
+def generar_pdf(estadisticas_dict, carrera, grupo, asignatura, semestre, imagenes,
+                colores_pies=None, etiquetas_pies=None, porcentajes_pies=None):
+    from fpdf import FPDF    # Generar documentos PDF desde Python, agregar texto e imágenes (fpdf2)
+    from fpdf.enums import XPos, YPos
+
+    pdf = FPDF(orientation='P', unit='mm', format='A4')
+    
+    def poner_fondo_negro():
+        pdf.set_fill_color(0, 0, 0)
+        pdf.rect(0, 0, 210, 297, 'F')
+
+    def quitar_emojis(texto):
+        return texto.encode('ascii', 'ignore').decode('ascii')
+
+    # Primera página - encabezado y estadísticas
+    pdf.add_page()
+    poner_fondo_negro()
+    pdf.set_text_color(0, 255, 213)
+    pdf.set_font("Helvetica", 'B', 14)
+    pdf.cell(0, 10, quitar_emojis("Reporte de Calificaciones"), new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
+
+    pdf.set_text_color(255, 255, 255)
+    pdf.set_font("Helvetica", '', 12)
+    pdf.ln(5)
+    encabezado = f"Carrera: {carrera} | Asignatura: {asignatura} | Grupo: {grupo} | Semestre: {semestre}"
+    pdf.cell(0, 10, quitar_emojis(encabezado), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+    # Las estadísticas vienen de los acumuladores, no se vuelven a calcular aquí
+    for parcial, medidas in estadisticas_dict.items():
+        pdf.set_text_color(0, 255, 213)
+        pdf.set_font("Helvetica", 'B', 12)
+        pdf.ln(8)
+        pdf.cell(0, 10, quitar_emojis(f"Estadísticas de {parcial}"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.set_text_color(255, 255, 255)
+        pdf.set_font("Helvetica", '', 11)
+
+        pdf.cell(0, 8, f"Media: {medidas['media']:.2f}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.cell(0, 8, f"Mediana: {medidas['mediana']:.2f}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.cell(0, 8, f"Moda: {medidas['moda']:.2f}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.cell(0, 8, f"Varianza: {medidas['varianza']:.2f}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.cell(0, 8, f"Rango: {medidas['rango']:.2f}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+    def tamano_mm(imagen):
+        # Las dimensiones salen del propio render, no hace falta reabrir la imagen
+        return (imagen.ancho_px / imagen.dpi) * 25.4, (imagen.alto_px / imagen.dpi) * 25.4
+
+    # Intentar poner las primeras 2 gráficas juntas en una sola página, verticalmente
+    if len(imagenes) >= 2:
+        pdf.add_page()
+        poner_fondo_negro()
+        pdf.set_text_color(255, 255, 255)
+        pdf.set_font("Helvetica", 'B', 14)
+        pdf.cell(0, 10, "Gráficas 1 y 2", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
+
+        max_width = 180  # casi el ancho total con margen
+        max_height = 120  # la mitad aprox. de la página menos márgenes
+
+        y_positions = [25, 25 + max_height + 10]  # arriba y abajo con separación de 10mm
+        x_position = 15  # margen lateral fijo
+
+        for i in range(2):
+            width_mm, height_mm = tamano_mm(imagenes[i])
+
+            scale = min(max_width / width_mm, max_height / height_mm, 1)
+
+            final_width = width_mm * scale
+            final_height = height_mm * scale
+
+            pdf.image(io.BytesIO(imagenes[i].png), x=x_position, y=y_positions[i], w=final_width, h=final_height)
+
+    # Ahora la gráfica 3 (boxplot) en página nueva
+    if len(imagenes) >= 3:
+        pdf.add_page()
+        poner_fondo_negro()
+        pdf.set_text_color(255, 255, 255)
+        pdf.set_font("Helvetica", 'B', 14)
+        pdf.cell(0, 10, "Gráfica 3 - Boxplot", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
+
+        width_mm, height_mm = tamano_mm(imagenes[2])
+
+        # Escalar para que quepa casi toda la página con margen
+        max_width = 180
+        max_height = 250
+
+        scale = min(max_width / width_mm, max_height / height_mm, 1)
+
+        final_width = width_mm * scale
+        final_height = height_mm * scale
+
+        pdf.image(io.BytesIO(imagenes[2].png), x=15, y=25, w=final_width, h=final_height)
+        
+        # Luego de las gráficas, pon leyendas si existen: debajo del boxplot mientras quepan y,
+        # si no, en páginas nuevas. El fondo negro de cada página va antes que su texto
+        if colores_pies and etiquetas_pies and porcentajes_pies:
+            def hacer_espacio(alto):
+                # Página nueva (con su fondo) si lo que sigue no cabe en la actual
+                if pdf.get_y() + alto > pdf.h - pdf.b_margin:
+                    pdf.add_page()
+                    poner_fondo_negro()
+
+            ancho_cuadro = 8
+            alto_cuadro = 8
+            alto_renglon = 10
+
+            pdf.set_xy(10, 25 + final_height + 5)
+            hacer_espacio(3 * alto_renglon)  # "Leyendas:" no se queda solo al final de la página
+            pdf.set_text_color(255, 255, 255)
+            pdf.set_font("Helvetica", 'B', 12)
+            pdf.cell(0, alto_renglon, "Leyendas:", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+            # Leyendas para las gráficas de pastel (una por parcial)
+            for i in range(len(colores_pies)):
+                colores = list(colores_pies[i])
+                etiquetas = list(etiquetas_pies[i])
+                porcentajes = list(porcentajes_pies[i])
+
+                hacer_espacio(2 * alto_renglon)
+                pdf.set_text_color(255, 255, 255)
+                pdf.set_font("Helvetica", 'B', 12)
+                pdf.cell(0, alto_renglon, f"Datos Grafica {i + 1}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+                pdf.set_font("Helvetica", '', 11)
+
+                for c, etiqueta, porcentaje in zip(colores, etiquetas, porcentajes):
+                    hacer_espacio(alto_renglon + 2)
+                    x = 10
+                    y = pdf.get_y() + 2
+
+                    r, g, b = tuple(int(c.strip('#')[j:j+2], 16) for j in (0, 2, 4))
+                    pdf.set_fill_color(r, g, b)
+                    pdf.rect(x, y, ancho_cuadro, alto_cuadro, 'F')
+                    pdf.set_xy(x + ancho_cuadro + 2, y - 2)
+                    pdf.set_text_color(255, 255, 255)
+                    pdf.cell(60, alto_renglon, etiqueta)
+                    pdf.cell(20, alto_renglon, f"{porcentaje:.1f}%", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+                pdf.ln(5)
+    else:
+        # Si hay menos de 2 gráficas o no caben juntas, cada una en página individual
+        for i, imagen in enumerate(imagenes):
+            pdf.add_page()
+            poner_fondo_negro()
+            pdf.set_text_color(255, 255, 255)
+            pdf.set_font("Helvetica", 'B', 14)
+            pdf.cell(0, 10, quitar_emojis(f"Grafica {i + 1}"), new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
+            pdf.image(io.BytesIO(imagen.png), x=10, y=25, w=190)
+
+    # El PDF se arma en memoria; cada llamada tiene su propio resultado
+    return bytes(pdf.output())
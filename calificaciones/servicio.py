@@ -0,0 +1,218 @@
+# Servicio HTTP local de solo lectura con las estadísticas y los conteos por rango de cualquier
+# grupo o nivel, para otras herramientas (tutorías, portal de padres) sin pasar por Streamlit:
+#   python -m calificaciones.servicio --puerto 8765 --hilos 8
+#   curl "http://127.0.0.1:8765/stats?semestre=2&carrera=Programación&grupo=A&asignatura=Inglés II"
+#
+# Los parámetros son la cascada de la app: semestre, carrera, grupo y asignatura, en ese orden
+# y sin saltarse ninguno; con menos parámetros se responde el nivel correspondiente, con los
+# mismos niveles que la app (los cuatro = grupo, semestre y carrera = carrera, solo semestre =
+# semestre, ninguno = plantel).
+#
+# Las respuestas ya serializadas se guardan en un caché LRU acotado; la clave incluye la
+# versión de los datos (archivo + capturas aplicadas), así que una captura nueva o un Excel
+# nuevo dejan de servir las respuestas viejas sin tener que limpiar nada a mano. El Excel y la
+# carpeta de capturas se revisan a lo más cada REVISAR_CADA segundos; entre revisiones una
+# respuesta en caché no toca el disco ni espera el candado de las capturas.
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from calificaciones.carga import RUTA_EXCEL
+from calificaciones.esquema import a_python
+from calificaciones.indice import COLUMNAS_CLAVE
+from calificaciones.niveles import NIVELES
+from calificaciones.nucleo import abrir, analizar
+from calificaciones.rangos import definir_rangos
+
+PARAMETROS = ["semestre", "carrera", "grupo", "asignatura"]   # Mismo orden que COLUMNAS_CLAVE
+NIVELES_POR_LARGO = {largo: nivel for nivel, largo in NIVELES.items()}
+
+MAX_RESPUESTAS = int(os.environ.get("CALIFICACIONES_MAX_RESPUESTAS", "1024"))
+REVISAR_CADA = float(os.environ.get("CALIFICACIONES_REVISAR_CADA", "2"))   # segundos
+_respuestas = OrderedDict()     # (versión de datos, ruta, clave) -> (estado HTTP, cuerpo JSON)
+_vigentes = {}                  # ruta -> (time.monotonic() de la última revisión, Datos)
+_candado = threading.Lock()
+_metricas = {"aciertos": 0, "fallos": 0, "revisiones": 0}
+
+
+class ErrorConsulta(Exception):
+    # Consulta que no se puede responder: lleva el estado HTTP que le corresponde
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+def _clave_consulta(indice, consulta):
+    # Los valores llegan como texto; se buscan entre las opciones de la cascada para usar el
+    # valor real de la clave (Semestre 2 y no "2")
+    dados = [nombre for nombre in PARAMETROS if consulta.get(nombre)]
+    if dados != PARAMETROS[:len(dados)]:
+        raise ErrorConsulta(400, f"Los parámetros van en cascada ({', '.join(PARAMETROS)}) sin saltarse ninguno")
+    if len(dados) not in NIVELES_POR_LARGO:
+        raise ErrorConsulta(400, f"Con {PARAMETROS[len(dados) - 1]} hace falta {PARAMETROS[len(dados)]}: "
+                                 f"los niveles son {', '.join(NIVELES)}")
+    clave = []
+    for nombre in dados:
+        valores = {str(valor): valor for valor in indice.opciones.get(tuple(clave), [])}
+        if consulta[nombre] not in valores:
+            raise ErrorConsulta(404, f"No hay {nombre} '{consulta[nombre]}' en esa selección")
+        clave.append(valores[consulta[nombre]])
+    return tuple(clave)
+
+
+def _cuerpo(datos, clave):
+    rangos = definir_rangos()
+    analisis = analizar(datos, clave, rangos)
+    parciales = {}
+    for parcial, medidas in analisis.estadisticas.items():
+        conteo = analisis.conteos[parcial]   # Uno por etiqueta; el último es "Fuera de rango"
+        parciales[parcial] = {
+            "medidas": {medida: a_python(valor) for medida, valor in medidas.items()},
+            "conteos": dict(zip(rangos.etiquetas, map(int, conteo))),
+        }
+    return {
+        "nivel": NIVELES_POR_LARGO[len(clave)],
+        "clave": {columna.lower(): a_python(valor) for columna, valor in zip(COLUMNAS_CLAVE, clave)},
+        "rangos": list(rangos.etiquetas),
+        "parciales": parciales,
+    }
+
+
+def _datos(ruta):
+    # Los datos del libro, volviendo a abrir (Excel y carpeta de capturas) a lo más cada
+    # REVISAR_CADA segundos. El primer hilo que encuentra la revisión vencida la hace; los
+    # demás siguen respondiendo con los datos que ya había mientras tanto
+    ahora = time.monotonic()
+    with _candado:
+        vigente = _vigentes.get(ruta)
+        if vigente is not None:
+            if ahora - vigente[0] < REVISAR_CADA:
+                return vigente[1]
+            _vigentes[ruta] = (ahora, vigente[1])
+    datos = abrir(ruta)
+    with _candado:
+        _vigentes[ruta] = (time.monotonic(), datos)
+        _metricas["revisiones"] += 1
+    return datos
+
+
+def respuesta_stats(consulta, ruta=RUTA_EXCEL):
+    # (estado HTTP, cuerpo JSON en bytes) para /stats; consulta = {parámetro: texto}
+    datos = _datos(ruta)
+    version = datos.estado.version
+    llave = (version, ruta, tuple(consulta.get(nombre) or None for nombre in PARAMETROS))
+    with _candado:
+        if llave in _respuestas:
+            _respuestas.move_to_end(llave)
+            _metricas["aciertos"] += 1
+            return _respuestas[llave]
+
+    try:
+        # Una selección que existe pero sin calificaciones responde 200 con "parciales" vacío,
+        # como la app, que muestra "No disponibles" en lugar de un error
+        cuerpo = _cuerpo(datos, _clave_consulta(datos.indice, consulta))
+        respuesta = (200, json.dumps(cuerpo, ensure_ascii=False).encode("utf-8"))
+    except ErrorConsulta as error:
+        respuesta = (error.estado, json.dumps({"error": str(error)}, ensure_ascii=False).encode("utf-8"))
+
+    with _candado:
+        _metricas["fallos"] += 1
+        _respuestas[llave] = respuesta
+        _respuestas.move_to_end(llave)
+        while len(_respuestas) > MAX_RESPUESTAS:
+            _respuestas.popitem(last=False)  # Sale la menos usada; las de versiones viejas ya no se piden
+    return respuesta
+
+
+def metricas_servicio():
+    with _candado:
+        return dict(_metricas, respuestas_en_cache=len(_respuestas))
+
+
+class Manejador(BaseHTTPRequestHandler):
+    # Solo GET; cualquier otro método responde 405 (el servicio es de solo lectura)
+    def do_GET(self):
+        partes = urlsplit(self.path)
+        if partes.path == "/stats":
+            consulta = {nombre: valores[-1] for nombre, valores in parse_qs(partes.query).items()}
+            estado, cuerpo = respuesta_stats(consulta, self.server.ruta_excel)
+        elif partes.path == "/metricas":
+            estado, cuerpo = 200, json.dumps(metricas_servicio()).encode("utf-8")
+        else:
+            estado, cuerpo = 404, b'{"error": "Ruta desconocida; usa /stats"}'
+        self._enviar(estado, cuerpo)
+
+    def do_POST(self):
+        self._enviar(405, b'{"error": "Servicio de solo lectura"}')
+
+    do_PUT = do_DELETE = do_PATCH = do_POST
+
+    def _enviar(self, estado, cuerpo):
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        if self.server.registrar:
+            super().log_message(formato, *args)
+
+
+class Servidor(HTTPServer):
+    # Un número fijo de hilos atiende las conexiones; las que lleguen de más esperan en la cola
+    # en lugar de abrir un hilo nuevo cada una (como haría ThreadingHTTPServer)
+    daemon_threads = True
+
+    def __init__(self, direccion, ruta_excel=RUTA_EXCEL, hilos=8, registrar=False):
+        super().__init__(direccion, Manejador)
+        self.ruta_excel = ruta_excel
+        self.registrar = registrar
+        self.pool = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="servicio")
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._atender, request, client_address)
+
+    def _atender(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio HTTP local con las estadísticas por grupo")
+    parser.add_argument("--excel", default=RUTA_EXCEL, help="Libro de calificaciones")
+    parser.add_argument("--host", default="127.0.0.1", help="Por omisión solo escucha en esta máquina")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--hilos", type=int, default=8, help="Hilos que atienden peticiones a la vez")
+    parser.add_argument("--registrar", action="store_true", help="Escribir cada petición en stderr")
+    args = parser.parse_args(argv)
+
+    _datos(args.excel)   # Carga e índice antes de aceptar la primera petición
+    servidor = Servidor((args.host, args.puerto), args.excel, args.hilos, args.registrar)
+    print(f"Escuchando en http://{args.host}:{servidor.server_address[1]}/stats", file=sys.stderr)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+# Reportes PDF en segundo plano: el botón de la app solo encarga el trabajo a un pool acotado
+# de hilos y la página muestra su avance; el rerun de la sesión no se queda esperando.
+#
+# - Un PDF terminado se guarda en un caché LRU acotado cuya llave incluye el grupo y la
+#   versión de sus datos, así que volver a descargarlo es inmediato y una captura que toca
+#   el grupo deja de servir el PDF viejo sin limpiar nada a mano.
+# - Si varias sesiones piden el mismo reporte mientras se genera, todas esperan el mismo
+#   trabajo en lugar de generarlo cada una.
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+HILOS_PDF = int(os.environ.get("CALIFICACIONES_HILOS_PDF", "2"))
+MAX_PDFS = int(os.environ.get("CALIFICACIONES_MAX_PDFS", "32"))
+
+_pool = None
+_en_curso = {}               # llave -> Trabajo que todavía no termina
+_terminados = OrderedDict()  # llave -> Trabajo terminado con éxito (LRU)
+_candado = threading.Lock()
+_metricas = {"aciertos": 0, "compartidos": 0, "fallos": 0, "errores": 0}
+
+
+class Trabajo:
+    # Un reporte pedido: lo genera un hilo del pool y lo pueden esperar varias sesiones.
+    # progreso (0 a 1) y etapa los actualiza generar() con avanzar()
+    def __init__(self, llave):
+        self.llave = llave
+        self.progreso = 0.0
+        self.etapa = "En espera de un hilo libre"
+        self.futuro = None
+        self.segundos = None
+
+    def avanzar(self, progreso, etapa):
+        self.progreso, self.etapa = progreso, etapa
+
+    @property
+    def listo(self):
+        return self.futuro.done()
+
+    def resultado(self):
+        # Los bytes del PDF; vuelve a lanzar la excepción si la generación falló
+        return self.futuro.result()
+
+
+def _obtener_pool():
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=HILOS_PDF, thread_name_prefix="pdf")
+    return _pool
+
+
+def _ejecutar(trabajo, generar):
+    inicio = time.perf_counter()
+    try:
+        return generar(trabajo.avanzar)
+    finally:
+        trabajo.segundos = time.perf_counter() - inicio
+
+
+def _al_terminar(trabajo):
+    # Corre en el hilo que terminó: pasa el trabajo al caché (o lo descarta si falló, para
+    # que el siguiente clic lo intente de nuevo)
+    with _candado:
+        _en_curso.pop(trabajo.llave, None)
+        if trabajo.futuro.exception() is not None:
+            _metricas["errores"] += 1
+            return
+        trabajo.avanzar(1.0, "Listo")
+        _terminados[trabajo.llave] = trabajo
+        _terminados.move_to_end(trabajo.llave)
+        while len(_terminados) > MAX_PDFS:
+            _terminados.popitem(last=False)  # Sale el menos usado recientemente
+
+
+def consultar(llave):
+    # El trabajo de llave si ya está terminado o en curso; None si nadie lo ha pedido
+    with _candado:
+        if llave in _terminados:
+            _terminados.move_to_end(llave)
+            return _terminados[llave]
+        return _en_curso.get(llave)
+
+
+def pedir(llave, generar):
+    # generar(avanzar) regresa los bytes del PDF y llama avanzar(progreso, etapa) entre
+    # etapas. Corre en otro hilo, así que no puede usar st.*
+    with _candado:
+        if llave in _terminados:
+            _terminados.move_to_end(llave)
+            _metricas["aciertos"] += 1
+            return _terminados[llave]
+        if llave in _en_curso:
+            _metricas["compartidos"] += 1
+            return _en_curso[llave]
+        trabajo = _en_curso[llave] = Trabajo(llave)
+        _metricas["fallos"] += 1
+        trabajo.futuro = _obtener_pool().submit(_ejecutar, trabajo, generar)
+    trabajo.futuro.add_done_callback(lambda _: _al_terminar(trabajo))
+    return trabajo
+
+
+def metricas_trabajos():
+    with _candado:
+        return dict(_metricas, en_curso=len(_en_curso), pdfs_en_cache=len(_terminados))
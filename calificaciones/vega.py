@@ -0,0 +1,185 @@
+# Especificaciones Vega-Lite para dibujar las gráficas en el navegador.
+# El servidor solo manda números ya agregados (conteos por rango, cuartiles, bigotes y una
+# muestra acotada de puntos); el dibujo corre en el cliente.
+import numpy as np
+
+from calificaciones.esquema import a_decimal
+from calificaciones.estadisticas import resumen_boxplot
+from calificaciones.graficas import MAX_PUNTOS, colores_parciales
+from calificaciones.rangos import datos_pastel
+
+# Mismo look oscuro que las gráficas de matplotlib
+_CONFIG = {
+    "background": "#121212",
+    "view": {"stroke": None},
+    "axis": {"labelColor": "white", "titleColor": "white", "gridColor": "#333", "domainColor": "white", "tickColor": "white"},
+    "header": {"labelColor": "white", "labelFontSize": 16, "labelFontWeight": "bold"},
+    "legend": {"labelColor": "white", "titleColor": "white"},
+}
+
+
+
+def _escala_rangos(rangos):
+    return {"domain": rangos.etiquetas, "range": rangos.colores}
+
+
+def spec_histograma(conteos_dict, rangos):
+    filas = []
+    for parcial, conteo in conteos_dict.items():
+        if conteo is None:
+            continue
+        _, etiquetas, porcentajes = datos_pastel(conteo, rangos)
+        for rango, pct in zip(etiquetas, porcentajes):
+            filas.append({"parcial": f"Histograma {parcial}", "rango": rango,
+                          "frecuencia": int(conteo[rangos.etiquetas.index(rango)]), "porcentaje": f"{pct:.1f}%"})
+
+    barra = {
+        "mark": {"type": "bar"},
+        "encoding": {
+            "x": {"field": "rango", "type": "ordinal", "sort": rangos.etiquetas, "title": "Rango",
+                  "axis": {"labelAngle": 0}},
+            "y": {"field": "frecuencia", "type": "quantitative", "title": "Frecuencia"},
+            "color": {"field": "rango", "type": "nominal", "scale": _escala_rangos(rangos), "legend": None},
+        },
+    }
+    texto = {
+        "mark": {"type": "text", "dy": -8, "color": "white", "fontWeight": "bold"},
+        "encoding": {
+            "x": {"field": "rango", "type": "ordinal", "sort": rangos.etiquetas},
+            "y": {"field": "frecuencia", "type": "quantitative"},
+            "text": {"field": "porcentaje"},
+        },
+    }
+    return {
+        "data": {"values": filas},
+        "facet": {"column": {"field": "parcial", "type": "nominal", "title": None}},
+        "spec": {"layer": [barra, texto], "width": 320, "height": 280},
+        "config": _CONFIG,
+    }
+
+
+def spec_pastel(conteos_dict, rangos):
+    filas = []
+    for parcial, conteo in conteos_dict.items():
+        if conteo is None:
+            continue
+        _, etiquetas, porcentajes = datos_pastel(conteo, rangos)
+        for rango, pct in zip(etiquetas, porcentajes):
+            filas.append({"parcial": f"Pastel {parcial}", "rango": rango, "orden": rangos.etiquetas.index(rango),
+                          "porcentaje": round(float(pct), 1)})
+
+    return {
+        "data": {"values": filas},
+        "facet": {"column": {"field": "parcial", "type": "nominal", "title": None}},
+        "spec": {
+            "mark": {"type": "arc", "stroke": "#121212", "strokeWidth": 2},
+            "encoding": {
+                "theta": {"field": "porcentaje", "type": "quantitative", "stack": True},
+                "color": {"field": "rango", "type": "nominal", "scale": _escala_rangos(rangos), "title": "Rango"},
+                "order": {"field": "orden", "sort": "ascending"},
+                "tooltip": [{"field": "rango"}, {"field": "porcentaje", "title": "%"}],
+            },
+            "width": 260,
+            "height": 260,
+        },
+        "config": _CONFIG,
+    }
+
+
+def _muestra_estratificada(valores, maximo):
+    # Muestra determinista que conserva la forma de la distribución: estadísticos de orden
+    # equiespaciados de los valores ordenados
+    x = np.sort(a_decimal(valores))
+    if len(x) <= maximo:
+        return x
+    return x[np.linspace(0, len(x) - 1, maximo).round().astype(int)]
+
+
+def spec_boxplot(grupo_df, parciales):
+    cajas, puntos = [], []
+    for parcial, color in zip(parciales, colores_parciales(parciales)):
+        resumen = resumen_boxplot(grupo_df[parcial].dropna())
+        if resumen is None:
+            continue
+        cajas.append(dict(resumen, parcial=parcial, color=color))
+        puntos += [{"parcial": parcial, "valor": float(v)}
+                   for v in _muestra_estratificada(grupo_df[parcial].dropna(), MAX_PUNTOS)]
+
+    x = {"field": "parcial", "type": "nominal", "title": None, "axis": {"labelAngle": 0}}
+    escala_y = {"zero": False}
+    return {
+        "layer": [
+            {
+                "data": {"values": cajas},
+                "mark": {"type": "rule", "color": "#555", "strokeWidth": 2.5},
+                "encoding": {"x": x, "y": {"field": "bigote_inf", "type": "quantitative", "scale": escala_y,
+                                           "title": "Calificación"},
+                             "y2": {"field": "bigote_sup"}},
+            },
+            {
+                "data": {"values": cajas},
+                "mark": {"type": "bar", "size": 60, "stroke": "#444", "strokeWidth": 2.5},
+                "encoding": {"x": x, "y": {"field": "q1", "type": "quantitative"}, "y2": {"field": "q3"},
+                             "color": {"field": "color", "type": "nominal", "scale": None}},
+            },
+            {
+                "data": {"values": cajas},
+                "mark": {"type": "tick", "size": 60, "color": "#444", "thickness": 2.5},
+                "encoding": {"x": x, "y": {"field": "mediana", "type": "quantitative"}},
+            },
+            {
+                "data": {"values": puntos},
+                # Desplazamiento aleatorio dentro del 40% central de la banda de cada parcial
+                "transform": [{"calculate": "0.3 + random() * 0.4", "as": "jitter"}],
+                "mark": {"type": "circle", "color": "white", "opacity": 0.6, "size": 36},
+                "encoding": {"x": x, "xOffset": {"field": "jitter", "type": "quantitative", "scale": {"domain": [0, 1]}},
+                             "y": {"field": "valor", "type": "quantitative"}},
+            },
+        ],
+        "width": 420,
+        "height": 320,
+        "config": _CONFIG,
+    }
+
+
+def spec_comparacion(comparacion):
+    # Las mismas cajas que figura_comparacion, con los cuartiles y bigotes ya calculados;
+    # los parciales de cada grupo van lado a lado dentro de su banda
+    cajas = []
+    for i, etiqueta in enumerate(comparacion.etiquetas):
+        for j, (parcial, color) in enumerate(zip(comparacion.parciales, colores_parciales(comparacion.parciales))):
+            if comparacion.cajas["total"][i, j] == 0:
+                continue
+            caja = {medida: float(valores[i, j]) for medida, valores in comparacion.cajas.items()}
+            cajas.append(dict(caja, total=int(caja["total"]), grupo=str(etiqueta), parcial=parcial, color=color))
+
+    x = {"field": "grupo", "type": "nominal", "sort": [str(e) for e in comparacion.etiquetas],
+         "title": " · ".join(comparacion.columnas), "axis": {"labelAngle": 0 if len(comparacion.etiquetas) <= 8 else -45}}
+    desplazamiento = {"field": "parcial", "type": "nominal", "sort": comparacion.parciales}
+    tooltip = [{"field": "grupo", "title": " · ".join(comparacion.columnas)}, {"field": "parcial"},
+               {"field": "mediana"}, {"field": "q1"}, {"field": "q3"}, {"field": "total", "title": "Alumnos"}]
+    return {
+        "data": {"values": cajas},
+        "layer": [
+            {
+                "mark": {"type": "rule", "color": "#888", "strokeWidth": 1.5},
+                "encoding": {"x": x, "xOffset": desplazamiento,
+                             "y": {"field": "bigote_inf", "type": "quantitative", "scale": {"zero": False},
+                                   "title": "Calificación"},
+                             "y2": {"field": "bigote_sup"}},
+            },
+            {
+                "mark": {"type": "bar", "stroke": "#444", "strokeWidth": 1.5},
+                "encoding": {"x": x, "xOffset": desplazamiento, "y": {"field": "q1", "type": "quantitative"},
+                             "y2": {"field": "q3"}, "color": {"field": "color", "type": "nominal", "scale": None},
+                             "tooltip": tooltip},
+            },
+            {
+                "mark": {"type": "tick", "color": "#121212", "thickness": 2},
+                "encoding": {"x": x, "xOffset": desplazamiento, "y": {"field": "mediana", "type": "quantitative"}},
+            },
+        ],
+        "width": max(420, 40 * len(cajas)),
+        "height": 320,
+        "config": _CONFIG,
+    }
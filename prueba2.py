@@ -1,50 +1,124 @@
-import pandas as pd          # Manejo y análisis de datos en estructuras tipo tabla (DataFrames)
-import matplotlib.pyplot as plt  # Creación de gráficos estáticos (barras, pasteles, boxplots, etc.)
-import seaborn as sns        # Visualización estadística avanzada y gráfica más estética sobre matplotlib
-import numpy as np           # Cálculos numéricos y operaciones con arreglos, estadística básica
+import os                    # Variables de entorno para la configuración
+import time                  # Para medir cuánto tarda cada rerun y cada sección
 import streamlit as st       # Framework para crear aplicaciones web interactivas fácilmente
-from scipy import stats      # Funciones estadísticas avanzadas como moda, pruebas, etc.
-from fpdf import FPDF        # Generar documentos PDF desde Python, agregar texto e imágenes
-import tempfile              # Crear archivos temporales para guardar imágenes o datos temporales
-import os                    # Manejo de sistema de archivos (eliminar archivos temporales, rutas, etc.)
-import re                    # Expresiones regulares para manipular y limpiar texto (ej. quitar emojis)
-from PIL import Image        # Biblioteca Pillow para abrir y manejar imágenes (dimensiones, formatos)
-
-# Cargar archivo Excel
-df = pd.read_excel("Calificaciones 1 y 2 parcial Plantel Xonacatlán.xlsx")
+import pandas as pd          # Tabla de medianas de la comparación entre grupos
+from calificaciones.almacen import descubrir_libros
+from calificaciones.alumnos import RIESGO_CAIDA, RIESGO_REPROBADAS, alumnos_prefijo, asignaturas_alumno, tabla_alumnos
+from calificaciones.carga import RUTA_EXCEL, metricas_cache
+from calificaciones.diagnostico import ACTIVO, iniciar_rerun, marcar, perfil_pstats, tabla_etapas, terminar_rerun
+from calificaciones.edubot import responder
+from calificaciones.estadisticas import comparar_parciales
+from calificaciones.graficas import (figura_boxplot, figura_comparacion, figura_histograma, figura_pastel,
+                                     imagen_grafica)
+from calificaciones.incremental import error_captura, filas_actuales, metricas_incremental, revision_grupo
+from calificaciones.indice import COLUMNA_ALUMNO, opciones
+from calificaciones.niveles import NIVELES, clave_nivel
+from calificaciones.nucleo import abrir, analizar, comparacion, trayectorias
+from calificaciones.rangos import datos_pastel, definir_rangos
+from calificaciones.reporte import generar_pdf
+from calificaciones.trabajos import consultar, pedir
+from calificaciones.vega import spec_boxplot, spec_comparacion, spec_histograma, spec_pastel
+
+inicio_rerun = time.perf_counter()
 
 # Configurar Streamlit
 st.set_page_config(layout="wide", page_title="Análisis de Calificaciones")
 st.title("📊 Análisis de Calificaciones por Asignatura")
 
+# Diagnóstico por etapas (apagado salvo CALIFICACIONES_DIAGNOSTICO=1 o ?diagnostico=1); el
+# perfil con cProfile se pide desde el panel y cubre solo el rerun siguiente
+diagnostico = iniciar_rerun(ACTIVO or st.query_params.get("diagnostico") == "1",
+                            perfilar=st.session_state.pop("perfilar_rerun", False))
+marcar(diagnostico, "carga")
+
+
+def registrar_latencia(seccion, inicio):
+    # Última duración de cada sección en esta sesión (la usa benchmarks/bench_fragmentos.py)
+    st.session_state.setdefault("latencias", {})[seccion] = time.perf_counter() - inicio
+
+
+# Un libro por plantel en la carpeta de datos; con más de uno se elige en el sidebar
+libros = descubrir_libros()
+if len(libros) > 1:
+    plantel_seleccionado = st.sidebar.selectbox("Selecciona un plantel", list(libros))
+    ruta_excel = libros[plantel_seleccionado]
+else:
+    ruta_excel = next(iter(libros.values()), RUTA_EXCEL)
+
+# Cargar archivo Excel (se parsea una vez por versión del archivo y se comparte entre sesiones),
+# con sus parciales (P1, P2, P3..., y la calificación final si existe), las capturas nuevas o
+# corregidas de "<archivo>.capturas/" ya aplicadas a los acumuladores y el índice de la
+# cascada Semestre -> Carrera -> Grupo -> Asignatura
+datos = abrir(ruta_excel)
+carga, parciales, estado, indice = datos.carga, datos.parciales, datos.estado, datos.indice
+
+metricas = metricas_cache()
+if carga.desde_cache:
+    st.sidebar.caption(f"⚡ Datos en caché (parseo original: {carga.segundos:.2f} s · aciertos: {metricas['aciertos']})")
+else:
+    st.sidebar.caption(f"📂 Datos leídos de {carga.origen} en {carga.segundos:.2f} s")
+if estado.aplicadas:
+    st.sidebar.caption(f"🧩 {len(estado.aplicadas)} capturas aplicadas "
+                       f"(última: {metricas_incremental()['segundos_ultima_captura'] * 1000:.1f} ms)")
+captura_fallida = error_captura(ruta_excel)
+if captura_fallida is not None:
+    # La captura con error (y las que van después) no se aplica; lo demás se ve normal
+    st.sidebar.error(f"❌ No se pudo aplicar la captura {captura_fallida[0]}: {captura_fallida[1]}")
+
+marcar(diagnostico, "filtros")
+
+# Nivel de análisis: un grupo y asignatura (como siempre) o todo lo de una carrera, un
+# semestre o el plantel completo; los filtros que no aplican al nivel se desactivan
+NIVELES_VISTA = {
+    "grupo": "👥 Grupo y asignatura",
+    "carrera": "🎓 Carrera",
+    "semestre": "🗓️ Semestre",
+    "plantel": "🏫 Plantel completo",
+}
+nivel = st.sidebar.selectbox("Nivel de análisis", list(NIVELES_VISTA), format_func=NIVELES_VISTA.get)
+fijas = NIVELES[nivel]
+
 # Filtro de semestre
-semestres = df["Semestre"].dropna().unique()
-semestre_seleccionado = st.sidebar.selectbox("Selecciona un semestre", sorted(semestres))
+semestre_seleccionado = st.sidebar.selectbox("Selecciona un semestre", opciones(indice), disabled=fijas < 1)
 
 # Filtro de carrera dinámico según semestre
-carreras_filtradas = df[df["Semestre"] == semestre_seleccionado]["Carrera"].dropna().unique()
-carrera_seleccionada = st.sidebar.selectbox("Selecciona una carrera", sorted(carreras_filtradas))
+carrera_seleccionada = st.sidebar.selectbox("Selecciona una carrera", opciones(indice, semestre_seleccionado),
+                                            disabled=fijas < 2)
 
 # Filtro de grupo dinámico según semestre y carrera
-grupos_filtrados = df[
-    (df["Semestre"] == semestre_seleccionado) &
-    (df["Carrera"] == carrera_seleccionada)
-]["Grupo"].dropna().unique()
-grupo_seleccionado = st.sidebar.selectbox("Selecciona un grupo", sorted(grupos_filtrados))
-
-# Filtrar el DataFrame base según todos los filtros
-df_filtrado = df[
-    (df["Semestre"] == semestre_seleccionado) &
-    (df["Carrera"] == carrera_seleccionada) &
-    (df["Grupo"] == grupo_seleccionado)
-]
+grupo_seleccionado = st.sidebar.selectbox(
+    "Selecciona un grupo", opciones(indice, semestre_seleccionado, carrera_seleccionada), disabled=fijas < 3
+)
 
 # Filtro de asignatura
-todas_asignaturas = df_filtrado["Asignatura"].dropna().unique()
-asignatura_seleccionada = st.sidebar.selectbox("Selecciona una asignatura", sorted(todas_asignaturas))
-
-# Filtrado final
-grupo_df = df_filtrado[df_filtrado["Asignatura"] == asignatura_seleccionada]
+asignatura_seleccionada = st.sidebar.selectbox(
+    "Selecciona una asignatura",
+    opciones(indice, semestre_seleccionado, carrera_seleccionada, grupo_seleccionado),
+    disabled=fijas < 4
+)
+
+# Filtrado final: búsqueda en el índice, sin máscaras sobre todo el DataFrame. En niveles
+# más altos la "clave" es el prefijo de la cascada y se juntan las filas de sus grupos
+clave_grupo = clave_nivel(
+    (semestre_seleccionado, carrera_seleccionada, grupo_seleccionado, asignatura_seleccionada), nivel
+)
+grupo_df = filas_actuales(estado, indice, clave_grupo)
+
+# Lo que queda fuera del nivel se muestra como "Todos" en el encabezado y el PDF
+semestre_vista = semestre_seleccionado if fijas >= 1 else "Todos"
+carrera_vista = carrera_seleccionada if fijas >= 2 else "Todas"
+grupo_vista = grupo_seleccionado if fijas >= 3 else "Todos"
+asignatura_vista = asignatura_seleccionada if fijas >= 4 else "Todas"
+
+# Modo de gráficas: en el servidor con matplotlib (como siempre) o en el navegador con
+# Vega-Lite, donde el servidor solo manda los números ya agregados
+MODOS_GRAFICAS = {"servidor": "🖥️ Servidor (matplotlib)", "navegador": "🌐 Navegador (Vega-Lite)"}
+modo_inicial = os.environ.get("CALIFICACIONES_MODO_GRAFICAS", "servidor")
+modo_graficas = st.sidebar.radio(
+    "Modo de gráficas", list(MODOS_GRAFICAS),
+    index=list(MODOS_GRAFICAS).index(modo_inicial) if modo_inicial in MODOS_GRAFICAS else 0,
+    format_func=MODOS_GRAFICAS.get
+)
 
 # Encabezado personalizado con estilo moderno
 st.markdown(f"""
@@ -65,66 +139,47 @@ st.markdown(f"""
 </style>
 
 <div class="encabezado-box">
-    <h4>🎓 Carrera: <span style='color:white'>{carrera_seleccionada}</span></h4>
-    <h4>📘 Asignatura: <span style='color:white'>{asignatura_seleccionada}</span></h4>
-    <h4>👥 Grupo: <span style='color:white'>{grupo_seleccionado}</span> | 🗓️ Semestre: <span style='color:white'>{semestre_seleccionado}</span></h4>
+    <h4>🎓 Carrera: <span style='color:white'>{carrera_vista}</span></h4>
+    <h4>📘 Asignatura: <span style='color:white'>{asignatura_vista}</span></h4>
+    <h4>👥 Grupo: <span style='color:white'>{grupo_vista}</span> | 🗓️ Semestre: <span style='color:white'>{semestre_vista}</span></h4>
 </div>
 """, unsafe_allow_html=True)
 
-# Colores para rangos
-rango_colores = {
-    '5-6': '#ff073a',  # rojo neón
-    '6-7': '#ff9f1c',  # naranja neón
-    '7-8': '#ffe066',  # amarillo neón
-    '8-9': '#3cee54',  # verde neón
-    '9-10': '#00FF00'  # verde brillante neón
-}
-rango_bins = [5, 6, 7, 8, 9, 10.1]
-rango_labels = ['5-6', '6-7', '7-8', '8-9', '9-10']
+marcar(diagnostico, "estadisticas")
 
-calificaciones_dict = {}
-estadisticas_dict = {}
+# Estadísticas del grupo leídas de sus acumuladores (histograma exacto + sumas); las
+# capturas los mantienen al día sin recalcular los demás grupos. En carrera, semestre o
+# plantel se fusionan los acumuladores de sus grupos (uno por nivel y versión de datos).
+# El conteo por rango sale del mismo histograma; histograma, pastel, sus tablas y el PDF
+# leen el mismo resultado
+rangos = definir_rangos()
+analisis = analizar(datos, clave_grupo, rangos)
+estadisticas_dict = analisis.estadisticas
+conteos_dict = analisis.conteos
 
-cols = st.columns(2)  # Dividimos en 2 columnas horizontales
+# La versión del estado (libro más capturas aplicadas) distingue una captura editada y
+# vuelta a aplicar desde cero, cuyas revisiones por grupo se repiten
+version_graficas = (estado.version, tuple(rangos.etiquetas), revision_grupo(analisis.acumuladores, clave_grupo))
 
-for idx, parcial in enumerate(['P1', 'P2']):
-    calificaciones = grupo_df[parcial].dropna()
-    calificaciones_dict[parcial] = calificaciones
-    
+cols = st.columns(len(parciales))  # Una columna por parcial
 
-    if calificaciones.empty:
+for idx, parcial in enumerate(parciales):
+    if parcial not in estadisticas_dict:
         cols[idx].warning(f"⚠️ Estadísticas de {parcial}: No disponibles")
         continue   
 
-    # Cálculos principales
-    media = calificaciones.mean()
-    mediana = calificaciones.median()
-    moda = stats.mode(calificaciones, nan_policy='omit', keepdims=True)[0][0]
-    varianza = calificaciones.var()
-    q1 = calificaciones.quantile(0.25)
-    q2 = calificaciones.quantile(0.50)
-    q3 = calificaciones.quantile(0.75)
-
-    # Cálculos adicionales por que yo lo digo jaja xd 
-    maximo = calificaciones.max()
-    minimo = calificaciones.min()
-    rango = maximo - minimo
-    total = calificaciones.count()
-
-     # ✅ Luego de lso calculos los guardamos en el diccionario
-    estadisticas_dict[parcial] = {
-        "media": media,
-        "mediana": mediana,
-        "moda": moda,
-        "varianza": varianza,
-        "q1": q1,
-        "q2": q2,
-        "q3": q3,
-        "max": maximo,
-        "min": minimo,
-        "rango": rango,
-        "total": total
-    }
+    # Valores ya calculados en los acumuladores
+    medidas = estadisticas_dict[parcial]
+    media = medidas["media"]
+    mediana = medidas["mediana"]
+    moda = medidas["moda"]
+    varianza = medidas["varianza"]
+    q1 = medidas["q1"]
+    q2 = medidas["q2"]
+    q3 = medidas["q3"]
+    rango = medidas["rango"]
+    total = medidas["total"]
+
     # HTML con estilos para las tablas
     tabla_html = f"""
     <style>
@@ -176,6 +231,13 @@ for idx, parcial in enumerate(['P1', 'P2']):
     # Mostrar la tabla en su columna correspondiente
     cols[idx].markdown(tabla_html, unsafe_allow_html=True)
 
+# Todas las medidas de todos los parciales y sus cambios entre parciales consecutivos en una
+# sola operación; las conclusiones comparan el último parcial con datos contra el anterior
+tabla_parciales, deltas_parciales = comparar_parciales(estadisticas_dict, parciales)
+parciales_con_datos = list(tabla_parciales.index)
+anterior, ultimo = parciales_con_datos[-2:] if len(parciales_con_datos) >= 2 else (None, None)
+cambio = deltas_parciales.iloc[-1] if len(deltas_parciales) else None
+
 # --- CONTENEDOR VISUAL DEL BOT ---
 st.sidebar.markdown("---")
 st.sidebar.markdown("""
@@ -190,268 +252,118 @@ st.sidebar.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Activar el bot
-bot_activado = st.sidebar.checkbox("💬 Mostrar Bot de Ayuda")
-
-if bot_activado:
-    st.sidebar.markdown("### ✏️ Escribe tu duda o elige una sugerencia:")
-
-    # --- Pregunta rápida por botones ---
-    pregunta = ""
-    col1, col2 = st.sidebar.columns(2)
-    with col1:
-        if st.button("📊 Media"):
-            pregunta = "media"
-        elif st.button("📈 Mediana"):
-            pregunta = "mediana"
-        elif st.button("📦 Boxplot"):
-            pregunta = "boxplot"
-    with col2:
-        if st.button("📌 Moda"):
-            pregunta = "moda"
-        elif st.button("📉 Varianza"):
-            pregunta = "varianza"
-
-    # Campo para escribir texto libre
-    if pregunta == "":
-        pregunta = st.sidebar.text_input("O escribe tu pregunta:", key="input_pregunta")
-
-    # --- RESPUESTAS DETALLADAS DEL BOT ---
-    if pregunta:
-        pregunta = pregunta.lower()
-
-        with st.sidebar:
-            with st.spinner("Pensando en una respuesta... 🤔"):
-                import time
-                time.sleep(1)  # Simulación realista
-
-        if "media" in pregunta:
-            p1 = estadisticas_dict['P1']['media']
-            p2 = estadisticas_dict['P2']['media']
-            
-            st.sidebar.markdown("📊 **Media**")
-            st.sidebar.info("La media es el promedio de todas las calificaciones. Nos ayuda a identificar el rendimiento general.")
-            st.sidebar.success(f"🟢 P1: {p1:.2f}  \n🔵 P2: {p2:.2f}")
-            
-            if p2 > p1:
-                st.sidebar.markdown("📈 **Conclusión:** La media subió, los valores más frecuentes fueron más altos en P2.")
-            elif p2 < p1:
-                st.sidebar.markdown("📉 **Conclusión:** La media bajó, los valores más repetidos fueron más bajos en P2.")
+# El bot es un fragmento: marcar la casilla, escribir o usar una sugerencia solo vuelve a
+# ejecutar esta sección, no la carga, las estadísticas ni las gráficas
+@st.fragment
+def seccion_edubot(estadisticas_dict, parciales_con_datos, diagnostico):
+    inicio = time.perf_counter()
+    marcar(diagnostico, "edubot")
+
+    # Activar el bot
+    bot_activado = st.checkbox("💬 Mostrar Bot de Ayuda")
+
+    if bot_activado:
+        st.markdown("### ✏️ Escribe tu duda o elige una sugerencia:")
+
+        # --- Pregunta rápida por botones ---
+        pregunta = ""
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("📊 Media"):
+                pregunta = "media"
+            elif st.button("📈 Mediana"):
+                pregunta = "mediana"
+            elif st.button("📦 Boxplot"):
+                pregunta = "boxplot"
+        with col2:
+            if st.button("📌 Moda"):
+                pregunta = "moda"
+            elif st.button("📉 Varianza"):
+                pregunta = "varianza"
+
+        # Campo para escribir texto libre
+        if pregunta == "":
+            pregunta = st.text_input("O escribe tu pregunta:", key="input_pregunta")
+
+        # --- RESPUESTAS DETALLADAS DEL BOT ---
+        # Respuesta inmediata: intención por índice de palabras clave y plantillas con las
+        # estadísticas ya calculadas del grupo
+        if pregunta:
+            respuesta = responder(pregunta, estadisticas_dict, parciales_con_datos)
+
+            if respuesta.aviso:
+                st.warning(respuesta.aviso)
             else:
-                st.sidebar.markdown("➖ **Conclusión:** La media se mantuvo igual en ambos parciales.")
+                if respuesta.titulo:
+                    st.markdown(respuesta.titulo)
+                st.info(respuesta.explicacion)
+                if respuesta.valores:
+                    st.success(respuesta.valores)
+                if respuesta.conclusion:
+                    st.markdown(respuesta.conclusion)
+            st.caption(f"⏱️ Respondido en {respuesta.segundos * 1000:.2f} ms")
 
-        elif "moda" in pregunta:
-            p1 = estadisticas_dict['P1']['moda']
-            p2 = estadisticas_dict['P2']['moda']
-            
-            st.sidebar.markdown("📌 **Moda**")
-            st.sidebar.info("La moda es el valor que más se repite. Si cambia entre parciales, indica un cambio en las calificaciones más comunes.")
-            st.sidebar.success(f"🟢 **P1:** {p1:.2f}  \n🔵 **P2:** {p2:.2f}")
-            
-            if p2 > p1:
-                st.sidebar.markdown("📈 **Conclusión:** La moda subió, los valores más frecuentes fueron más altos en P2.")
-            elif p2 < p1:
-                st.sidebar.markdown("📉 **Conclusión:** La moda bajó, los valores más repetidos fueron más bajos en P2.")
-            else:
-                st.sidebar.markdown("➖ **Conclusión:** La moda se mantuvo igual en ambos parciales.")
-
-        elif "mediana" in pregunta:
-            p1 = estadisticas_dict['P1']['mediana']
-            p2 = estadisticas_dict['P2']['mediana']
-            
-            st.sidebar.markdown("📈 **Mediana**")
-            st.sidebar.info("Divide los datos ordenados por la mitad. Menos sensible a extremos que la media.")
-            st.sidebar.success(f"🟢 P1: {p1:.2f}  \n🔵 P2: {p2:.2f}")
-            
-            if p2 > p1:
-                st.sidebar.markdown("📈 **Conclusión:** La mediana subió, los valores más frecuentes fueron más altos en P2.")
-            elif p2 < p1:
-                st.sidebar.markdown("📉 **Conclusión:** La mediana bajó, los valores más repetidos fueron más bajos en P2.")
-            else:
-                st.sidebar.markdown("➖ **Conclusión:** La mediana se mantuvo igual en ambos parciales.")
-
-        elif "varianza" in pregunta:
-            p1 = estadisticas_dict['P1']['varianza']
-            p2 = estadisticas_dict['P2']['varianza']
-            
-            st.sidebar.markdown("📉 **Varianza**")
-            st.sidebar.info("Mide qué tanto se alejan los datos de la media. Alta varianza = calificaciones más dispersas.")
-            st.sidebar.success(f"🟢 P1: {p1:.2f}  \n🔵 P2: {p2:.2f}")
-            
-            if p2 > p1:
-                st.sidebar.markdown("📈 **Conclusión:** La varianza aumentó en P2, lo que indica mayor variación entre las calificaciones del grupo.")
-            elif p2 < p1:
-                st.sidebar.markdown("📉 **Conclusión:** La varianza disminuyó, lo que sugiere que las calificaciones estuvieron más agrupadas en P2.")
-            else:
-                st.sidebar.markdown("➖ **Conclusión:** La varianza se mantuvo igual, no hubo cambio en la dispersión del rendimiento entre parciales.")
-
-        elif "rango" in pregunta:
-            p1 = estadisticas_dict['P1']['rango']
-            p2 = estadisticas_dict['P2']['rango']
-
-            st.sidebar.markdown("📏 **Rango (Máx - Mín)**")
-            st.sidebar.info("El rango muestra qué tan dispersas están las calificaciones, comparando la más alta con la más baja.")
-            st.sidebar.success(f"🟢 P1: {p1:.2f}  \n🔵 P2: {p2:.2f}")
-
-            if p2 > p1:
-                st.sidebar.markdown("📈 **Conclusión:** Aumentó el rango en P2, lo que indica mayor variabilidad entre los alumnos.")
-            elif p2 < p1:
-                st.sidebar.markdown("📉 **Conclusión:** Disminuyó el rango en P2, lo que sugiere que las calificaciones fueron más homogéneas.")
-            else:
-                st.sidebar.markdown("➖ **Conclusión:** El rango se mantuvo igual, la dispersión fue la misma en ambos parciales.")
-
-        elif "q1" in pregunta or "cuartil 1" in pregunta:
-            p1 = estadisticas_dict['P1']['q1']
-            p2 = estadisticas_dict['P2']['q1']
-
-            st.sidebar.markdown("🟪 **Q1 (Primer Cuartil - 25%)**")
-            st.sidebar.info("Indica que el 25% de las calificaciones están por debajo de este valor. Es útil para ver cómo está el rendimiento más bajo.")
-            st.sidebar.success(f"🟢 P1: {p1:.2f}  \n🔵 P2: {p2:.2f}")
-
-            if p2 > p1:
-                st.sidebar.markdown("📈 **Conclusión:** El Q1 subió en P2, los alumnos con menor rendimiento mejoraron.")
-            elif p2 < p1:
-                st.sidebar.markdown("📉 **Conclusión:** El Q1 bajó, indicando un desempeño más bajo en el 25% inferior.")
-            else:
-                st.sidebar.markdown("➖ **Conclusión:** No hubo cambio en el Q1, el rendimiento inferior se mantuvo igual.")
-
-        elif "q2" in pregunta or "cuartil 2" in pregunta:
-            p1 = estadisticas_dict['P1']['q2']
-            p2 = estadisticas_dict['P2']['q2']
-            
-            st.sidebar.markdown("🔵 **Q2 (Mediana 50%)**")
-            st.sidebar.info("Mitad de alumnos sacó menos y mitad más que este valor.")
-            st.sidebar.success(f"🟢 P1: {p1:.2f}  \n🔵 P2: {p2:.2f}")
-            
-            if p2 > p1:
-                st.sidebar.markdown("📈 **Conclusión:** El Q2 subió en P2, los alumnos con menor rendimiento mejoraron.")
-            elif p2 < p1:
-                st.sidebar.markdown("📉 **Conclusión:** El Q2 bajó, indicando un desempeño más bajo en el 50% inferior.")
-            else:
-                st.sidebar.markdown("➖ **Conclusión:** No hubo cambio en el Q2, el rendimiento inferior se mantuvo igual.")
-
-        elif "q3" in pregunta or "cuartil 3" in pregunta:
-            p1 = estadisticas_dict['P1']['q3']
-            p2 = estadisticas_dict['P2']['q3']
-            
-            st.sidebar.markdown("🟥 **Q3 (75%)**")
-            st.sidebar.info("El 75% de los alumnos sacó menos o igual que este valor.")
-            st.sidebar.success(f"🟢 P1: {p1:.2f}  \n🔵 P2: {p2:.2f}")
-            
-            if p2 > p1:
-                st.sidebar.markdown("📈 **Conclusión:** El Q3 subió en P2, los alumnos con menor rendimiento mejoraron.")
-            elif p2 < p1:
-                st.sidebar.markdown("📉 **Conclusión:** El Q3 bajó, indicando un desempeño más bajo en el 75% inferior.")
-            else:
-                st.sidebar.markdown("➖ **Conclusión:** No hubo cambio en el Q3, el rendimiento inferior se mantuvo igual.")
+    marcar(diagnostico, None)
+    registrar_latencia("edubot", inicio)
 
-        elif "total" in pregunta or "alumnos" in pregunta:
-            p1 = estadisticas_dict['P1']['total']
-            p2 = estadisticas_dict['P2']['total']
 
-            st.sidebar.markdown("👥 **Total de alumnos con calificación registrada**")
-            st.sidebar.info("Refleja cuántos estudiantes fueron evaluados en cada parcial. Las diferencias pueden deberse a inasistencias, faltas de entrega o errores en captura de datos.")
-            st.sidebar.success(f"🟢 P1: {p1}  \n🔵 P2: {p2}")
+# Los fragmentos no pueden escribir en st.sidebar desde adentro; se llaman dentro de él
+with st.sidebar:
+    seccion_edubot(estadisticas_dict, parciales_con_datos, diagnostico)
 
-            if p2 > p1:
-                st.sidebar.markdown("📈 **Conclusión:** Más alumnos fueron evaluados en el segundo parcial.")
-            elif p2 < p1:
-                st.sidebar.markdown("📉 **Conclusión:** Menos alumnos tienen calificación en P2. Puede indicar ausencias o datos faltantes.")
-            else:
-                st.sidebar.markdown("➖ **Conclusión:** El número de alumnos evaluados se mantuvo igual en ambos parciales.")
-
-        elif "pdf" in pregunta or "descargar" in pregunta:
-            st.sidebar.info("📄 Puedes generar un PDF con las gráficas y estadísticas actuales usando el botón en la parte del final de las graficas.")
-        else:
-            st.sidebar.warning("❓ No encontré una respuesta. Intenta con: media, varianza, PDF, boxplot, etc.")
-            
 # ----------- Histograma  ------------------
+marcar(diagnostico, "histograma")
 st.markdown("## 📊 Histograma Calificaciones")
 
-fig, axes = plt.subplots(1, 2, figsize=(14, 6))
-fig.patch.set_facecolor('#121212')  # fondo oscuro
-
-for idx, parcial in enumerate(['P1', 'P2']):
-    calificaciones = calificaciones_dict[parcial]
-    if calificaciones.empty:
-        axes[idx].set_title(f'{parcial} - Sin datos', color='white')
-        axes[idx].axis('off')
-        continue
-
-    conteo, _ = np.histogram(calificaciones, bins=rango_bins)
-    total = len(calificaciones)
-    porcentajes = (conteo / total) * 100
+# En modo servidor las gráficas se renderizan una vez por grupo y versión de datos; las
+# mismas imágenes se usan en la página y en el PDF
+constructores_graficas = {
+    "histograma": lambda: figura_histograma(conteos_dict, rangos),
+    "pastel": lambda: figura_pastel(conteos_dict, rangos),
+    "boxplot": lambda: figura_boxplot(grupo_df, parciales),
+}
 
-    axes[idx].set_facecolor('#121212')  # fondo oscuro subplot
-    barras = axes[idx].bar(rango_labels, conteo, color=[rango_colores[label] for label in rango_labels])
 
-    # Porcentajes encima de cada barra
-    for bar, pct in zip(barras, porcentajes):
-        height = bar.get_height()
-        axes[idx].text(bar.get_x() + bar.get_width()/2, height + 0.3,
-                       f'{pct:.1f}%', ha='center', color='white', fontsize=10, fontweight='bold')
+def imagen_de(tipo):
+    return imagen_grafica(tipo, version_graficas, clave_grupo, constructores_graficas[tipo])
 
-    axes[idx].set_title(f'Histograma {parcial}', color='white', fontsize=16, fontweight='bold')
-    axes[idx].set_xlabel('Rango', color='white', fontsize=12)
-    axes[idx].set_ylabel('Frecuencia', color='white', fontsize=12)
-    axes[idx].tick_params(colors='white')  # ticks blancos
 
-plt.tight_layout()
-st.pyplot(fig)
+if modo_graficas == "navegador":
+    st.vega_lite_chart(spec_histograma(conteos_dict, rangos), theme=None)
+else:
+    st.image(imagen_de("histograma").png, width="stretch")
 
 # Aquí agregas la explicación/comparativa abajo de la gráfica
-st.markdown("""
+st.markdown(f"""
 ### 📋 Análisis del Histograma
-- El histograma nos muestra la frecuencia de calificaciones por rango para ambos parciales.
-- Puedes observar cómo se distribuyen las calificaciones en P1 y P2, y si hubo cambios en la concentración o dispersión.
+- El histograma nos muestra la frecuencia de calificaciones por rango para cada parcial.
+- Puedes observar cómo se distribuyen las calificaciones en {", ".join(parciales)}, y si hubo cambios en la concentración o dispersión.
 """)
 
 # Ejemplo conclusión simple con media para agregar info extra:
-p1_media = estadisticas_dict['P1']['media']
-p2_media = estadisticas_dict['P2']['media']
-
-if p2_media > p1_media:
-    st.success("✅ La media en P2 aumentó, lo que indica una mejora general en las calificaciones.")
-elif p2_media < p1_media:
-    st.warning("⚠️ La media en P2 disminuyó, lo que podría indicar un rendimiento más bajo.")
+if cambio is None:
+    st.info("➖ Se necesitan al menos dos parciales con datos para comparar.")
+elif cambio["media"] > 0:
+    st.success(f"✅ La media en {ultimo} aumentó, lo que indica una mejora general en las calificaciones.")
+elif cambio["media"] < 0:
+    st.warning(f"⚠️ La media en {ultimo} disminuyó, lo que podría indicar un rendimiento más bajo.")
 else:
-    st.info("➖ La media se mantuvo estable entre ambos parciales.")
+    st.info(f"➖ La media se mantuvo estable entre {anterior} y {ultimo}.")
 
 
 # ------------------ Gráfica de pastel -------------------
+marcar(diagnostico, "pastel")
 st.markdown("## 🥧 Gráficas de Pastel Calificaciones")
-fig, axes = plt.subplots(1, 2, figsize=(12, 6), facecolor='#121212')
-for ax in axes:
-    ax.set_facecolor('#121212')  # fondo oscuro
 
-tablas_html = []  # Para guardar las dos tablas y mostrarlas después
+tablas_html = []  # Para guardar una tabla por parcial y mostrarlas después
 
-for idx, parcial in enumerate(['P1', 'P2']):
-    calificaciones = calificaciones_dict[parcial]
-    if calificaciones.empty:
-        axes[idx].set_title(f'{parcial} - Sin datos', color='white')
-        axes[idx].axis('off')
+for idx, parcial in enumerate(parciales):
+    conteo = conteos_dict[parcial]
+    if conteo is None:
         tablas_html.append("")  # Para mantener índice
         continue
 
-    ranges = pd.cut(calificaciones, bins=rango_bins, labels=rango_labels, right=False)
-    conteo = ranges.value_counts(sort=False)
-    valores = conteo.values
-    etiquetas = conteo.index.tolist()
-    colores = [rango_colores[label] for label in etiquetas]
-    total = valores.sum()
-    porcentajes = valores / total * 100
-
-    # Gráfica pastel limpia
-    wedges = axes[idx].pie(
-        valores,
-        labels=None,
-        autopct=None,
-        startangle=90,
-        colors=colores,
-        wedgeprops={'edgecolor': '#121212', 'linewidth': 2}
-    )
-    axes[idx].set_title(f'Pastel {parcial}', color='white', fontsize=16, fontweight='bold')
+    colores, etiquetas, porcentajes = datos_pastel(conteo, rangos)
 
     # Tabla HTML para guardar
     tabla = "<table style='color:white; font-weight:bold;'>"
@@ -466,130 +378,76 @@ for idx, parcial in enumerate(['P1', 'P2']):
     tablas_html.append(tabla)
 
 # Mostrar gráficas
-plt.tight_layout()
-st.pyplot(fig)
+if modo_graficas == "navegador":
+    st.vega_lite_chart(spec_pastel(conteos_dict, rangos), theme=None)
+else:
+    st.image(imagen_de("pastel").png, width="stretch")
 
 st.markdown("### 📋 Análisis de la Gráfica de Pastel")
-st.markdown("""
-- Las gráficas de pastel muestran la proporción de alumnos en cada rango de calificación para P1 y P2.
+st.markdown(f"""
+- Las gráficas de pastel muestran la proporción de alumnos en cada rango de calificación para {", ".join(parciales)}.
 - Permiten visualizar fácilmente qué porcentaje de alumnos está en rangos altos, medios o bajos.
-- Sirven para comparar la distribución de calificaciones entre ambos parciales y detectar mejoras o retrocesos.
+- Sirven para comparar la distribución de calificaciones entre parciales y detectar mejoras o retrocesos.
 """)
 
-# Ejemplo conclusión simple basada en la proporción de aprobados (>= 60)
-p1_aprobados = calificaciones_dict['P1'][calificaciones_dict['P1'] >= 60].count()
-p2_aprobados = calificaciones_dict['P2'][calificaciones_dict['P2'] >= 60].count()
-total_p1 = estadisticas_dict['P1']['total']
-total_p2 = estadisticas_dict['P2']['total']
-
-porc_aprobados_p1 = (p1_aprobados / total_p1)*100 if total_p1 > 0 else 0
-porc_aprobados_p2 = (p2_aprobados / total_p2)*100 if total_p2 > 0 else 0
-
-if porc_aprobados_p2 > porc_aprobados_p1:
-    st.success(f"✅ La proporción de alumnos aprobados aumentó de {porc_aprobados_p1:.1f}% en P1 a {porc_aprobados_p2:.1f}% en P2.")
-elif porc_aprobados_p2 < porc_aprobados_p1:
-    st.warning(f"⚠️ La proporción de alumnos aprobados disminuyó de {porc_aprobados_p1:.1f}% en P1 a {porc_aprobados_p2:.1f}% en P2.")
+# Ejemplo conclusión simple basada en la proporción de aprobados (>= 60), para todos los
+# parciales a la vez
+aprobados = (grupo_df[parciales] >= 60).sum()
+totales = tabla_parciales["total"].reindex(parciales)
+porc_aprobados = (aprobados / totales * 100).fillna(0)
+
+if cambio is None:
+    st.info("➖ Se necesitan al menos dos parciales con datos para comparar.")
+elif porc_aprobados[ultimo] > porc_aprobados[anterior]:
+    st.success(f"✅ La proporción de alumnos aprobados aumentó de {porc_aprobados[anterior]:.1f}% en {anterior} a {porc_aprobados[ultimo]:.1f}% en {ultimo}.")
+elif porc_aprobados[ultimo] < porc_aprobados[anterior]:
+    st.warning(f"⚠️ La proporción de alumnos aprobados disminuyó de {porc_aprobados[anterior]:.1f}% en {anterior} a {porc_aprobados[ultimo]:.1f}% en {ultimo}.")
 else:
-    st.info(f"➖ La proporción de alumnos aprobados se mantuvo estable en {porc_aprobados_p1:.1f}%.")
+    st.info(f"➖ La proporción de alumnos aprobados se mantuvo estable en {porc_aprobados[anterior]:.1f}%.")
     
 # ------------------ Tablas -------------------
-col1, col2 = st.columns(2)
-col1.markdown("#### P1")
-col1.markdown(tablas_html[0], unsafe_allow_html=True)
-col2.markdown("#### P2")
-col2.markdown(tablas_html[1], unsafe_allow_html=True)
-
-# Guardar las variables para el PDF
-colores_pie1 = [rango_colores[label] for label in pd.cut(calificaciones_dict['P1'], bins=rango_bins, labels=rango_labels, right=False).value_counts(sort=False).index.tolist()]
-etiquetas_pie1 = rango_labels
-valores1 = pd.cut(calificaciones_dict['P1'], bins=rango_bins, labels=rango_labels, right=False).value_counts(sort=False).values
-porcentajes_pie1 = valores1 / valores1.sum() * 100
-
-colores_pie2 = [rango_colores[label] for label in pd.cut(calificaciones_dict['P2'], bins=rango_bins, labels=rango_labels, right=False).value_counts(sort=False).index.tolist()]
-etiquetas_pie2 = rango_labels
-valores2 = pd.cut(calificaciones_dict['P2'], bins=rango_bins, labels=rango_labels, right=False).value_counts(sort=False).values
-porcentajes_pie2 = valores2 / valores2.sum() * 100
+for col, parcial, tabla in zip(st.columns(len(parciales)), parciales, tablas_html):
+    col.markdown(f"#### {parcial}")
+    col.markdown(tabla, unsafe_allow_html=True)
 
 
 # ----------- Boxplot ------------------
+marcar(diagnostico, "boxplot")
 st.markdown("## 📦 Boxplot Calificaciones")
 
-if not grupo_df[['P1', 'P2']].dropna(how='all').empty:
-    fig, ax = plt.subplots(figsize=(7, 5), facecolor='#121212')
-    fig.patch.set_facecolor('#121212')
-
-    # Boxplot detalles
-    sns.boxplot(
-        data=grupo_df[['P1', 'P2']],
-        palette=['#ff073a', '#00ff00'],
-        width=0.4,
-        linewidth=2.5,
-        fliersize=0,
-        ax=ax
-    )
-
-    # Puntos individuales los de color blanco
-    sns.stripplot(
-        data=grupo_df[['P1', 'P2']],
-        jitter=True,
-        dodge=True,
-        size=6,
-        color='white',
-        alpha=0.6,
-        ax=ax
-    )
-
-    # Fondo y ejes
-    ax.set_facecolor('#121212')
-    ax.tick_params(colors='white', labelsize=12)
-    ax.set_ylabel('Calificación', color='white', fontsize=13)
-    ax.set_xlabel('', color='white')
-
-    # Bordes blancos 
-    for spine in ax.spines.values():
-        spine.set_color('white')
-        spine.set_linewidth(1.5)
-
-    # Grid discreto en eje Y
-    ax.yaxis.grid(True, linestyle='--', linewidth=0.7, color='gray', alpha=0.3)
-    ax.set_axisbelow(True)
-
-    st.pyplot(fig)
+if not grupo_df[parciales].dropna(how='all').empty:
+    if modo_graficas == "navegador":
+        st.vega_lite_chart(spec_boxplot(grupo_df, parciales), theme=None)
+    else:
+        st.image(imagen_de("boxplot").png, width="stretch")
 
     st.markdown("### 📋 Análisis del Boxplot")
     st.markdown("""
     - El boxplot resume la distribución de las calificaciones, mostrando la mediana, dispersión y posibles valores atípicos.
     - La caja indica dónde está el 50% central de las calificaciones (entre Q1 y Q3).
-    - Si la caja o los bigotes cambian entre P1 y P2, significa cambios en la variabilidad o concentración de calificaciones.
+    - Si la caja o los bigotes cambian entre parciales, significa cambios en la variabilidad o concentración de calificaciones.
     """)
 
-    # Datos relevantes para conclusión
-    p1_q1 = estadisticas_dict['P1']['q1']
-    p1_q3 = estadisticas_dict['P1']['q3']
-    p2_q1 = estadisticas_dict['P2']['q1']
-    p2_q3 = estadisticas_dict['P2']['q3']
-
-    # Comparación simple de rango intercuartílico (IQR)
-    iqr_p1 = p1_q3 - p1_q1
-    iqr_p2 = p2_q3 - p2_q1
-
-    if iqr_p2 < iqr_p1:
-        st.success("✅ La dispersión (IQR) disminuyó en P2, indicando que las calificaciones se concentraron más alrededor de la mediana.")
-    elif iqr_p2 > iqr_p1:
-        st.warning("⚠️ La dispersión (IQR) aumentó en P2, lo que indica mayor variabilidad en las calificaciones.")
+    if cambio is None:
+        st.info("➖ Se necesitan al menos dos parciales con datos para comparar.")
     else:
-        st.info("➖ La dispersión (IQR) se mantuvo estable entre ambos parciales.")
+        # Comparación simple de rango intercuartílico (IQR): el cambio del IQR es el cambio de Q3 menos el de Q1
+        cambio_iqr = cambio["q3"] - cambio["q1"]
 
-    # Comparar medianas
-    p1_mediana = estadisticas_dict['P1']['mediana']
-    p2_mediana = estadisticas_dict['P2']['mediana']
+        if cambio_iqr < 0:
+            st.success(f"✅ La dispersión (IQR) disminuyó en {ultimo}, indicando que las calificaciones se concentraron más alrededor de la mediana.")
+        elif cambio_iqr > 0:
+            st.warning(f"⚠️ La dispersión (IQR) aumentó en {ultimo}, lo que indica mayor variabilidad en las calificaciones.")
+        else:
+            st.info(f"➖ La dispersión (IQR) se mantuvo estable entre {anterior} y {ultimo}.")
 
-    if p2_mediana > p1_mediana:
-        st.success("✅ La mediana aumentó en P2, sugiriendo una mejora general en el rendimiento.")
-    elif p2_mediana < p1_mediana:
-        st.warning("⚠️ La mediana disminuyó en P2, indicando posible bajo rendimiento.")
-    else:
-        st.info("➖ La mediana se mantuvo igual entre ambos parciales.")
+        # Comparar medianas
+        if cambio["mediana"] > 0:
+            st.success(f"✅ La mediana aumentó en {ultimo}, sugiriendo una mejora general en el rendimiento.")
+        elif cambio["mediana"] < 0:
+            st.warning(f"⚠️ La mediana disminuyó en {ultimo}, indicando posible bajo rendimiento.")
+        else:
+            st.info(f"➖ La mediana se mantuvo igual entre {anterior} y {ultimo}.")
 
     # leyenda descriptiva
     with st.expander("📌 ¿Qué muestra este boxplot?"):
@@ -702,225 +560,178 @@ if not grupo_df[['P1', 'P2']].dropna(how='all').empty:
             
 else:
     st.info("📉 No hay datos suficientes para mostrar el boxplot.")
-# Función para quitar emojis (¡clave para evitar errores!)
-def quitar_emojis(texto):
-    emoji_pattern = re.compile("["
-        u"\U0001F600-\U0001F64F"  # emoticonos
-        u"\U0001F300-\U0001F5FF"  # símbolos y pictogramas
-        u"\U0001F680-\U0001F6FF"  # transporte y mapas
-        u"\U0001F1E0-\U0001F1FF"  # banderas
-        u"\U00002700-\U000027BF"
-        u"\U0001F900-\U0001F9FF"
-        u"\U0001FA70-\U0001FAFF"
-        "]+", flags=re.UNICODE)
-    return emoji_pattern.sub(r'', texto)
-
-#--------------Creación del PDF sin errores de emoji----------------
-def generar_pdf(calificaciones_dict, carrera, grupo, asignatura, semestre,
-                colores_pies=None, etiquetas_pies=None, porcentajes_pies=None):
-
-    pdf = FPDF(orientation='P', unit='mm', format='A4')
-    
-    def poner_fondo_negro():
-        pdf.set_fill_color(0, 0, 0)
-        pdf.rect(0, 0, 210, 297, 'F')
-
-    def quitar_emojis(texto):
-        return texto.encode('ascii', 'ignore').decode('ascii')
-
-    # Primera página - encabezado y estadísticas
-    pdf.add_page()
-    poner_fondo_negro()
-    pdf.set_text_color(0, 255, 213)
-    pdf.set_font("Arial", 'B', 14)
-    pdf.cell(0, 10, quitar_emojis("Reporte de Calificaciones"), ln=True, align='C')
-
-    pdf.set_text_color(255, 255, 255)
-    pdf.set_font("Arial", '', 12)
-    pdf.ln(5)
-    encabezado = f"Carrera: {carrera} | Asignatura: {asignatura} | Grupo: {grupo} | Semestre: {semestre}"
-    pdf.cell(0, 10, quitar_emojis(encabezado), ln=True)
-
-    for parcial, calificaciones in calificaciones_dict.items():
-        if calificaciones.empty:
-            continue
-        pdf.set_text_color(0, 255, 213)
-        pdf.set_font("Arial", 'B', 12)
-        pdf.ln(8)
-        pdf.cell(0, 10, quitar_emojis(f"Estadísticas de {parcial}"), ln=True)
-        pdf.set_text_color(255, 255, 255)
-        pdf.set_font("Arial", '', 11)
-
-        moda_resultado = stats.mode(calificaciones, nan_policy='omit', keepdims=True)
-        moda_valor = moda_resultado.mode[0] if len(moda_resultado.mode) > 0 else np.nan
-
-        pdf.cell(0, 8, f"Media: {calificaciones.mean():.2f}", ln=True)
-        pdf.cell(0, 8, f"Mediana: {calificaciones.median():.2f}", ln=True)
-        pdf.cell(0, 8, f"Moda: {moda_valor:.2f}", ln=True)
-        pdf.cell(0, 8, f"Varianza: {calificaciones.var():.2f}", ln=True)
-        pdf.cell(0, 8, f"Rango: {calificaciones.max() - calificaciones.min():.2f}", ln=True)
-
-    # Guardar gráficas como imágenes temporales
-    img_paths = []
-    for fig_num in plt.get_fignums():
-        fig = plt.figure(fig_num)
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-        fig.savefig(temp_file.name, bbox_inches='tight')
-        img_paths.append(temp_file.name)
-
-    # Intentar poner las primeras 2 gráficas juntas en una sola página, verticalmente
-    if len(img_paths) >= 2:
-        pdf.add_page()
-        poner_fondo_negro()
-        pdf.set_text_color(255, 255, 255)
-        pdf.set_font("Arial", 'B', 14)
-        pdf.cell(0, 10, "Gráficas 1 y 2", ln=True, align='C')
-
-        max_width = 180  # casi el ancho total con margen
-        max_height = 120  # la mitad aprox. de la página menos márgenes
-
-        y_positions = [25, 25 + max_height + 10]  # arriba y abajo con separación de 10mm
-        x_position = 15  # margen lateral fijo
-
-        for i in range(2):
-            img_path = img_paths[i]
-            im = Image.open(img_path)
-            width_px, height_px = im.size
-            dpi = im.info.get('dpi', (72, 72))[0]
-
-            width_mm = (width_px / dpi) * 25.4
-            height_mm = (height_px / dpi) * 25.4
-
-            scale = min(max_width / width_mm, max_height / height_mm, 1)
-
-            final_width = width_mm * scale
-            final_height = height_mm * scale
-
-            pdf.image(img_path, x=x_position, y=y_positions[i], w=final_width, h=final_height)
-
-    # Ahora la gráfica 3 (boxplot) en página nueva
-    if len(img_paths) >= 3:
-        pdf.add_page()
-        poner_fondo_negro()
-        pdf.set_text_color(255, 255, 255)
-        pdf.set_font("Arial", 'B', 14)
-        pdf.cell(0, 10, "Gráfica 3 - Boxplot", ln=True, align='C')
-
-        img_path = img_paths[2]
-        im = Image.open(img_path)
-        width_px, height_px = im.size
-        dpi = im.info.get('dpi', (72, 72))[0]
-
-        width_mm = (width_px / dpi) * 25.4
-        height_mm = (height_px / dpi) * 25.4
-
-        # Escalar para que quepa casi toda la página con margen
-        max_width = 180
-        max_height = 250
-
-        scale = min(max_width / width_mm, max_height / height_mm, 1)
-
-        final_width = width_mm * scale
-        final_height = height_mm * scale
-
-        pdf.image(img_path, x=15, y=25, w=final_width, h=final_height)
-        
-        # Luego de las gráficas, pon leyendas si existen
-        if colores_pies and etiquetas_pies and porcentajes_pies:
-            pdf.set_xy(10, y_positions[1] + max_height + 5)
-            pdf.set_font("Arial", 'B', 12)
-            pdf.cell(0, 10, "Leyendas:", ln=True)
-            pdf.set_font("Arial", '', 11)
-            poner_fondo_negro()
-
-            y_leyenda = pdf.get_y()
-            ancho_cuadro = 8
-            alto_cuadro = 8
-
-            # Leyendas para las 2 gráficas
-            for i in range(2):
-                colores = list(colores_pies[i])
-                etiquetas = list(etiquetas_pies[i])
-                porcentajes = list(porcentajes_pies[i])
-
-                pdf.set_text_color(255, 255, 255)
-                pdf.set_font("Arial", 'B', 12)
-                pdf.cell(0, 10, f"Datos Grafica {i + 1}", ln=True)
-                pdf.set_font("Arial", '', 11)
-
-                for idx, (c, etiqueta, porcentaje) in enumerate(zip(colores, etiquetas, porcentajes)):
-                    x = 10
-                    y = pdf.get_y() + 2
-
-                    r, g, b = tuple(int(c.strip('#')[j:j+2], 16) for j in (0, 2, 4))
-                    pdf.set_fill_color(r, g, b)
-                    pdf.rect(x, y, ancho_cuadro, alto_cuadro, 'F')
-                    pdf.set_xy(x + ancho_cuadro + 2, y - 2)
-                    pdf.set_text_color(255, 255, 255)
-                    pdf.cell(60, 10, etiqueta, ln=0)
-                    pdf.cell(20, 10, f"{porcentaje:.1f}%", ln=1)
-
-                pdf.ln(5)
-    else:
-        # Si hay menos de 2 gráficas o no caben juntas, cada una en página individual
-        for i, img in enumerate(img_paths):
-            pdf.add_page()
-            poner_fondo_negro()
-            pdf.set_text_color(255, 255, 255)
-            pdf.set_font("Arial", 'B', 14)
-            pdf.cell(0, 10, quitar_emojis(f"Grafica {i + 1}"), ln=True, align='C')
-            pdf.image(img, x=10, y=25, w=190)
-
-    # Guardar y limpiar imágenes temporales
-    pdf_path = os.path.join(tempfile.gettempdir(), "reporte_calificaciones.pdf")
-    pdf.output(pdf_path)
-
-    for img in img_paths:
-        try:
-            os.remove(img)
-        except PermissionError:
-            pass
-
-    return pdf_path
-# ------------------ Extraer datos pastel para PDF -------------------
-colores1, etiquetas1, porcentajes1 = [], [], []
-colores2, etiquetas2, porcentajes2 = [], [], []
-
-for idx, parcial in enumerate(['P1', 'P2']):
-    calificaciones = calificaciones_dict[parcial]
-    if calificaciones.empty:
-        continue
 
-    ranges = pd.cut(calificaciones, bins=rango_bins, labels=rango_labels, right=False)
-    conteo = ranges.value_counts(sort=False)
-    valores = conteo.values
-    etiquetas = conteo.index.tolist()
-    colores = [rango_colores[label] for label in etiquetas]
-    total = valores.sum()
-    porcentajes = valores / total * 100
-
-    if parcial == 'P1':
-        colores1, etiquetas1, porcentajes1 = colores, etiquetas, porcentajes
+# ----------- Comparación entre grupos ------------------
+# Cajas lado a lado de todos los grupos de la asignatura (o de la carrera; en semestre y
+# plantel, de sus carreras o semestres), dibujadas con los cuartiles y bigotes que salen de
+# los acumuladores de cada grupo, sin volver a leer las filas
+marcar(diagnostico, "comparacion")
+comparacion_grupos = comparacion(datos, clave_grupo, nivel)
+titulos_comparacion = {"grupo": "grupo de la asignatura", "carrera": "grupo de la carrera",
+                       "semestre": "carrera del semestre", "plantel": "semestre del plantel"}
+st.markdown("## 🧮 Comparación entre grupos")
+st.caption(", ".join(f"{columna}: {valor}" for columna, valor in comparacion_grupos.fijas.items())
+           + f" · una caja por {titulos_comparacion[nivel]} ({len(comparacion_grupos.etiquetas)})")
+
+if comparacion_grupos.etiquetas:
+    if modo_graficas == "navegador":
+        st.vega_lite_chart(spec_comparacion(comparacion_grupos), theme=None)
     else:
-        colores2, etiquetas2, porcentajes2 = colores, etiquetas, porcentajes
+        # Depende de todos los grupos comparados, así que su versión es la de los datos completos
+        imagen = imagen_grafica("comparacion", (estado.version, nivel), tuple(comparacion_grupos.fijas.values()),
+                                lambda: figura_comparacion(comparacion_grupos))
+        if imagen is not None:
+            st.image(imagen.png, width="stretch")
+
+    medianas = {f"Mediana {parcial}": comparacion_grupos.cajas["mediana"][:, j]
+                for j, parcial in enumerate(parciales)}
+    medianas.update({f"Alumnos {parcial}": comparacion_grupos.cajas["total"][:, j]
+                     for j, parcial in enumerate(parciales)})
+    st.dataframe(pd.DataFrame(medianas, index=pd.Index(comparacion_grupos.etiquetas,
+                                                        name=" · ".join(comparacion_grupos.columnas))),
+                 column_config={columna: st.column_config.NumberColumn(columna, format="%.2f")
+                                for columna in medianas if columna.startswith("Mediana")})
+
+# ----------- Seguimiento por alumno ------------------
+# Tabla de los alumnos del grupo (con todas sus asignaturas, no solo la seleccionada) leída
+# del arreglo alumno × asignatura × parcial del plantel, que se arma una vez por versión de
+# datos. Es un fragmento: filtrar o ver el detalle de un alumno no vuelve a correr lo demás
+@st.fragment
+def seccion_alumnos(datos, clave_grupo, diagnostico):
+    inicio = time.perf_counter()
+    marcar(diagnostico, "alumnos")
+    st.markdown("## 🧑‍🎓 Seguimiento por alumno")
+
+    seguimiento = trayectorias(datos)
+    seleccion = alumnos_prefijo(seguimiento, datos.indice, clave_grupo)
+    en_riesgo = int(seguimiento.en_riesgo[seleccion].sum())
+    st.caption(f"⚠️ {en_riesgo} de {len(seleccion)} alumnos en riesgo: reprueban {RIESGO_REPROBADAS} o más asignaturas en "
+               f"su último parcial o su promedio bajó {RIESGO_CAIDA:g} o más puntos. Haz clic en una columna para ordenar.")
+    if st.checkbox("Solo alumnos en riesgo"):
+        seleccion = seleccion[seguimiento.en_riesgo[seleccion]]
+
+    tabla = tabla_alumnos(seguimiento, seleccion)
+    formatos = {columna: st.column_config.NumberColumn(columna, format="%.2f")
+                for columna in tabla.columns if columna.startswith(("Promedio", "Δ"))}
+    st.dataframe(tabla, hide_index=True, column_config={
+        COLUMNA_ALUMNO: st.column_config.NumberColumn(COLUMNA_ALUMNO, format="%d"),
+        "En riesgo": st.column_config.CheckboxColumn("En riesgo"),
+        **formatos,
+    })
+
+    alumno = st.selectbox("Ver las asignaturas de un alumno", tabla[COLUMNA_ALUMNO], index=None,
+                          placeholder="Número de control")
+    if alumno is not None:
+        st.dataframe(asignaturas_alumno(seguimiento, alumno), hide_index=True)
+
+    marcar(diagnostico, None)
+    registrar_latencia("alumnos", inicio)
+
+
+seccion_alumnos(datos, clave_grupo, diagnostico)
+
+# ------------------ Extraer datos pastel para PDF -------------------
+# Una entrada por parcial (vacía si el parcial no tiene calificaciones)
+pies = [datos_pastel(conteo, rangos) if conteo is not None else ([], [], [])
+        for conteo in conteos_dict.values()]
 
 # ------------ Botón que se encarga de generar y descargar el PDF -----------------
-if st.button("📥 Generar reporte PDF"):
-    pdf_file = generar_pdf(
-        calificaciones_dict=calificaciones_dict,
-        carrera=carrera_seleccionada,
-        grupo=grupo_seleccionado,
-        asignatura=asignatura_seleccionada,
-        semestre=semestre_seleccionado,
-        colores_pies=[colores1, colores2],         # ✅ Correcto
-        etiquetas_pies=[etiquetas1, etiquetas2],   # ✅ Correcto
-        porcentajes_pies=[porcentajes1, porcentajes2]  # ✅ Correcto
+# El PDF se genera en segundo plano (calificaciones/trabajos.py): el botón solo encarga el
+# trabajo y la página muestra su avance. Un PDF ya generado para este grupo y versión de
+# datos (estado.version: libro más capturas aplicadas) se descarga al instante, y si otra
+# sesión ya lo está generando se espera ese mismo
+llave_pdf = (ruta_excel, estado.version, version_graficas, clave_grupo)
+
+
+def generar_reporte(avanzar, imagen_de=imagen_de, estadisticas_dict=estadisticas_dict, carrera=carrera_vista,
+                    grupo=grupo_vista, asignatura=asignatura_vista, semestre=semestre_vista, pies=pies):
+    # Corre en un hilo del pool, no en el rerun: no puede usar st.*. Las mismas imágenes
+    # que se muestran en la página (ya en caché en modo servidor; en modo navegador se
+    # renderizan aquí una sola vez)
+    imagenes = []
+    for i, tipo in enumerate(("histograma", "pastel", "boxplot")):
+        avanzar(i / 4, f"Gráfica: {tipo}")
+        imagenes.append(imagen_de(tipo))
+    avanzar(0.75, "Armando el PDF")
+    return generar_pdf(
+        estadisticas_dict=estadisticas_dict,
+        carrera=carrera,
+        grupo=grupo,
+        asignatura=asignatura,
+        semestre=semestre,
+        imagenes=[imagen for imagen in imagenes if imagen is not None],
+        colores_pies=[pie[0] for pie in pies],
+        etiquetas_pies=[pie[1] for pie in pies],
+        porcentajes_pies=[pie[2] for pie in pies]
     )
 
-    with open(pdf_file, "rb") as f:
-        st.download_button(
-            label="📄 Descargar PDF",
-            data=f,
-            file_name="Reporte_Calificaciones.pdf",
-            mime="application/pdf"
-        )
+
+# Mientras el trabajo avanza, solo esta parte se vuelve a ejecutar cada medio segundo; al
+# terminar se vuelve a dibujar la página, ya con el botón de descarga
+@st.fragment(run_every=0.5)
+def avance_pdf(trabajo):
+    if trabajo.listo:
+        st.rerun()
+    st.progress(trabajo.progreso, text=f"⏳ {trabajo.etapa}...")
+
+
+# También es un fragmento: encargar el PDF solo vuelve a ejecutar esta sección, y la
+# descarga no provoca ningún rerun
+@st.fragment
+def seccion_pdf(llave_pdf, generar_reporte, diagnostico):
+    inicio = time.perf_counter()
+    marcar(diagnostico, "pdf")
+    # El trabajo de este grupo si ya existe (terminado o en curso, de esta u otra sesión);
+    # el último que pidió esta sesión se guarda para poder mostrar su error si falló
+    pedido = st.session_state.get("pdf_pedido")
+    trabajo = consultar(llave_pdf) or (pedido if pedido is not None and pedido.llave == llave_pdf else None)
+    fallo = trabajo is not None and trabajo.listo and trabajo.futuro.exception() is not None
+
+    if trabajo is None or fallo:
+        if fallo:
+            st.error(f"❌ No se pudo generar el PDF: {trabajo.futuro.exception()}")
+        if st.button("📥 Generar reporte PDF"):
+            trabajo = st.session_state["pdf_pedido"] = pedir(llave_pdf, generar_reporte)
+            fallo = False
+
+    if trabajo is not None and not fallo:
+        if not trabajo.listo:
+            avance_pdf(trabajo)
+        else:
+            st.download_button(
+                label="📄 Descargar PDF",
+                data=trabajo.resultado(),
+                file_name="Reporte_Calificaciones.pdf",
+                mime="application/pdf",
+                on_click="ignore"
+            )
+            st.caption(f"⚡ Generado en {trabajo.segundos:.2f} s; se guarda para este grupo mientras sus datos no cambien")
+    marcar(diagnostico, None)
+    registrar_latencia("pdf", inicio)
+
+
+seccion_pdf(llave_pdf, generar_reporte, diagnostico)
+
+terminar_rerun(diagnostico)
+registrar_latencia("script", inicio_rerun)
+
+# ------------ Panel de diagnóstico (solo si está activado) -----------------
+if diagnostico is not None:
+    with st.expander("🩺 Diagnóstico del rerun", expanded=False):
+        st.caption(f"Rerun {diagnostico['rerun']}: {diagnostico['total_ms']:.1f} ms en total")
+        st.dataframe(tabla_etapas(diagnostico), hide_index=True, column_config={
+            "nombre": "Etapa",
+            "ms": st.column_config.NumberColumn("ms", format="%.1f"),
+            "kb_netos": st.column_config.NumberColumn("KB netos", format="%.0f"),
+            "kb_pico": st.column_config.NumberColumn("KB pico", format="%.0f"),
+            "aciertos": "Aciertos de caché",
+            "fallos": "Fallos de caché",
+        })
+        st.button("🔬 Perfilar el siguiente rerun", on_click=lambda: st.session_state.update(perfilar_rerun=True))
+        perfil = perfil_pstats(diagnostico)
+        if perfil is not None:
+            perfil_bytes, perfil_texto = perfil
+            st.download_button("📄 Descargar perfil (.prof)", data=perfil_bytes,
+                               file_name=f"perfil_rerun_{diagnostico['rerun']}.prof",
+                               mime="application/octet-stream", on_click="ignore")
+            st.code(perfil_texto, language=None)